@@ -1,8 +1,26 @@
 #!/usr/bin/env python
 """Setuptools packaging script for the project"""
 import os
+import sys
 import ast
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py
+
+# Modules which use syntax only supported on Python 3.5 or newer. These are
+# left out when installing on older versions of Python, so they don't fail
+# to byte-compile.
+PY35_MODULES = [("pyjen", "aio")]
+
+
+class BuildPy(build_py):
+    """Build command which skips modules the current Python can't compile"""
+
+    def find_package_modules(self, package, package_dir):
+        modules = build_py.find_package_modules(self, package, package_dir)
+        if sys.version_info >= (3, 5):
+            return modules
+        return [cur_module for cur_module in modules
+                if cur_module[:2] not in PY35_MODULES]
 
 
 def load_console_scripts(project):
@@ -301,6 +319,7 @@ def main():
         author='Kevin S. Phillips',
         author_email='thefriendlycoder@gmail.com',
         packages=find_packages('src'),
+        cmdclass={'build_py': BuildPy},
         package_dir={'': 'src'},
         description=PROJECT["DESCRIPTION"],
         long_description=
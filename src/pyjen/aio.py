@@ -0,0 +1,245 @@
+"""Asyncio interfaces for querying the Jenkins REST API concurrently
+
+The APIs in this module are intended for high fan-out crawls of a Jenkins
+server, like auditing the builds of every job on the dashboard, where the
+total run time is dominated by network latency rather than processing.
+
+Requests are issued over the same pooled HTTP transport used by the rest of
+the PyJen library, from a bounded pool of worker threads, so the objects
+returned here are regular PyJen objects, like :class:`~.job.Job` and
+:class:`~.build.Build`, hydrated with the data loaded from the server.
+
+This module is an adapter running the blocking PyJen APIs off the event loop,
+not an asynchronous implementation of the REST API client. Only the
+top-level listings of the Jenkins master have dedicated awaitable
+counterparts here. Operations on the objects they return, like the builds of
+a job, are made awaitable by passing them to :meth:`AsyncJenkins.run` or
+:meth:`AsyncJenkins.map`.
+
+NOTE: This module requires Python 3.5 or newer. It is not installed on
+older versions of Python.
+
+**Example:** loading the recent builds of every job concurrently ::
+
+    import asyncio
+    from pyjen.aio import AsyncJenkins
+
+    async def main():
+        async with AsyncJenkins("http://localhost:8080") as jk:
+            jobs = await jk.jobs
+            builds = await jk.map(lambda job: job.recent_builds, jobs)
+
+    asyncio.run(main())
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from pyjen.jenkins import Jenkins
+from pyjen.utils.transport import Transport
+from pyjen.utils.jenkins_api import DEFAULT_MAX_DATA_AGE
+
+# Default number of REST API requests that may be in flight at one time
+DEFAULT_MAX_CONCURRENCY = 10
+
+# asyncio.get_running_loop was only introduced in Python 3.7
+_get_running_loop = getattr(  # pylint: disable=invalid-name
+    asyncio, "get_running_loop", asyncio.get_event_loop)
+
+
+class AsyncJenkins(object):
+    """Asynchronous counterpart of the :class:`~.jenkins.Jenkins` class
+
+    Blocking PyJen operations are run on a pool of worker threads, without
+    blocking the event loop. Instances of this class may be used from several
+    event loops, like one loop per thread, which then share the same worker
+    threads and the same `max_concurrency` limit.
+
+    :param str url: Full HTTP URL to the main Jenkins dashboard
+    :param tuple credentials:
+        Optional 2-tuple containing the username and password / api key to
+        authenticate with. See :class:`~.jenkins.Jenkins` for details.
+    :param ssl_cert:
+        Passed directly to the requests library when authenticating to the
+        remote server. See :class:`~.jenkins.Jenkins` for details.
+    :param int max_concurrency:
+        maximum number of REST API requests that may be in flight at any
+        one time
+    :param transport:
+        Optional pooled HTTP transport used for all communication with the
+        Jenkins REST API. If not provided, a transport sized to support
+        `max_concurrency` parallel requests will be created.
+    :type transport: :class:`~.utils.transport.Transport`
+    :param int max_data_age:
+        Number of seconds data used to hydrate objects remains valid.
+        See :class:`~.jenkins.Jenkins` for details.
+    :param float cache_ttl:
+        Optional number of seconds REST API data may be shared between
+        requests. See :class:`~.jenkins.Jenkins` for details.
+    :param build_store:
+        Optional persistent store for finished builds.
+        See :class:`~.jenkins.Jenkins` for details.
+    :type build_store: :class:`~.utils.build_store.BuildStore`
+    """
+
+    def __init__(self, url, credentials=None, ssl_cert=True,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY, transport=None,
+                 max_data_age=DEFAULT_MAX_DATA_AGE, cache_ttl=None,
+                 build_store=None):
+        super(AsyncJenkins, self).__init__()
+        if transport is None:
+            transport = Transport(pool_maxsize=max_concurrency)
+        self._jenkins = Jenkins(
+            url, credentials, ssl_cert, transport, max_data_age, cache_ttl,
+            build_store)
+        # The size of the worker pool bounds the number of operations
+        # running at once, across all event loops using this object
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Releases the worker threads used to run requests"""
+        self._executor.shutdown(wait=True)
+
+    @property
+    def jenkins(self):
+        """Synchronous interface to the same Jenkins server
+
+        Shares the connection pool and server context used by this object.
+
+        :rtype: :class:`~.jenkins.Jenkins`
+        """
+        return self._jenkins
+
+    async def run(self, func, *args, **kwargs):
+        """Runs a blocking PyJen operation without blocking the event loop
+
+        Any PyJen method or property accessor may be run this way. The
+        number of operations running concurrently is limited to the
+        `max_concurrency` given to the constructor.
+
+        **Example:** ::
+
+            result = await jk.run(lambda: job.last_build.result)
+
+        :param func: callable object to run
+        :param args: positional arguments to pass to the callable
+        :param kwargs: named arguments to pass to the callable
+        :returns: the value returned by the callable
+        """
+        return await _get_running_loop().run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs))
+
+    async def map(self, func, items):
+        """Runs a blocking PyJen operation on many objects concurrently
+
+        :param func:
+            callable object which accepts a single parameter: one element
+            from the list of items
+        :param list items: objects to pass to the callable, one at a time
+        :returns:
+            the values returned by the callable, in the same order as the
+            input items
+        :rtype: :class:`list`
+        """
+        return list(await asyncio.gather(
+            *[self.run(func, cur_item) for cur_item in items]))
+
+    @property
+    def version(self):
+        """awaitable returning the version of the Jenkins server
+
+        :rtype: :class:`tuple`
+        """
+        return self.run(lambda: self._jenkins.version)
+
+    @property
+    def jobs(self):
+        """awaitable returning all jobs managed by this Jenkins instance
+
+        :rtype: :class:`list` of :class:`~.job.Job`
+        """
+        return self.list_jobs()
+
+    @property
+    def all_jobs(self):
+        """awaitable returning all jobs managed by this instance, recursively
+
+        :rtype: :class:`list` of :class:`~.job.Job`
+        """
+        return self.run(lambda: self._jenkins.all_jobs)
+
+    @property
+    def views(self):
+        """awaitable returning all views directly managed by the dashboard
+
+        :rtype: :class:`list` of :class:`~.view.View`
+        """
+        return self.run(lambda: self._jenkins.views)
+
+    @property
+    def nodes(self):
+        """awaitable returning all nodes managed by this Jenkins master
+
+        :rtype: :class:`list` of :class:`~.node.Node`
+        """
+        return self.run(lambda: self._jenkins.nodes)
+
+    async def list_jobs(self, fields=None, start=None, end=None):
+        """Gets jobs managed by this Jenkins instance, with selected fields
+
+        See :meth:`~.jenkins.Jenkins.list_jobs` for details.
+
+        :rtype: :class:`list` of :class:`~.job.Job`
+        """
+        return await self.run(self._jenkins.list_jobs, fields, start, end)
+
+    async def list_builds(self, job, fields=None, start=None, end=None):
+        """Gets the most recent builds of a job, with selected fields
+
+        See :meth:`~.job.Job.list_builds` for details.
+
+        :param job: the job to load builds for
+        :type job: :class:`~.job.Job`
+        :rtype: :class:`list` of :class:`~.build.Build`
+        """
+        return await self.run(job.list_builds, fields, start, end)
+
+    async def find_job(self, job_name):
+        """Searches all jobs managed by this Jenkins instance for a specific job
+
+        See :meth:`~.jenkins.Jenkins.find_job` for details.
+
+        :rtype: :class:`~.job.Job`
+        """
+        return await self.run(self._jenkins.find_job, job_name)
+
+    async def find_view(self, view_name):
+        """Searches views for a specific one
+
+        See :meth:`~.jenkins.Jenkins.find_view` for details.
+
+        :rtype: :class:`~.view.View`
+        """
+        return await self.run(self._jenkins.find_view, view_name)
+
+    async def refresh(self, items):
+        """Reloads the state of many PyJen objects concurrently
+
+        Works with any PyJen object exposing a `refresh` method, like
+        :class:`~.job.Job`, :class:`~.view.View` and :class:`~.build.Build`.
+
+        :param list items: the objects to refresh
+        :returns: the same list of objects, now hydrated with fresh data
+        :rtype: :class:`list`
+        """
+        await self.map(lambda cur_item: cur_item.refresh(), items)
+        return items
+
+
+if __name__ == "__main__":  # pragma: no cover
+    pass
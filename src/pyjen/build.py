@@ -3,6 +3,21 @@ from datetime import datetime
 import logging
 from six.moves import urllib_parse
 from pyjen.changeset import Changeset
+from pyjen.utils.poller import get_default_poller
+
+# Fields loaded for each build in a listing when the caller doesn't request
+# specific ones. Covers the most commonly used build properties, so they can
+# be queried without hitting the REST API again.
+DEFAULT_BUILD_FIELDS = [
+    "id",
+    "number",
+    "result",
+    "building",
+    "timestamp",
+    "duration",
+    "estimatedDuration",
+    "description",
+]
 
 
 class Build(object):
@@ -23,6 +38,10 @@ class Build(object):
         self._api = api
         self._log = logging.getLogger(__name__)
 
+    def __repr__(self):
+        """Serialized representation of this object"""
+        return self._api.url
+
     def __eq__(self, obj):
         """Equality operator"""
         if not isinstance(obj, Build):
@@ -47,6 +66,39 @@ class Build(object):
         """Hashing function, allowing object to be serialized and compared"""
         return hash(self.id)
 
+    def refresh(self):
+        """Reloads the cached state of this build from the REST API
+
+        Builds created from the listings of parent objects, like
+        :py:attr:`pyjen.job.Job.recent_builds`, are pre-populated with the data
+        contained in those listings. That data is used until it goes stale,
+        or until this method is called.
+        """
+        self._api.refresh()
+
+    def _get_data(self, keys):
+        """Loads the REST API data describing this build
+
+        Data for builds that have finished running is loaded from the
+        persistent build store, if one is in use, and saved there the first
+        time it is loaded from the server. See
+        :class:`~.utils.build_store.BuildStore` for details.
+
+        :param list keys: names of the attributes the caller needs
+        :rtype: :class:`dict`
+        """
+        store = self._api.context.build_store
+        if store is None:
+            return self._api.get_api_data(keys=keys)
+
+        retval = store.get_data(self._api.url)
+        if retval is not None:
+            return retval
+
+        retval = self._api.get_api_data(keys=keys)
+        store.put_data(self._api.url, retval)
+        return retval
+
     @property
     def number(self):
         """Gets the sequence number of this build
@@ -55,7 +107,7 @@ class Build(object):
         :rtype: :class:`int`
         """
 
-        data = self._api.get_api_data()
+        data = self._get_data(["number"])
 
         return data['number']
 
@@ -68,7 +120,7 @@ class Build(object):
 
         """
 
-        data = self._api.get_api_data()
+        data = self._get_data(["timestamp"])
 
         time_in_seconds = data['timestamp'] * 0.001
 
@@ -81,7 +133,7 @@ class Build(object):
         :returns: True if the build is executing otherwise False
         :rtype: :class:`bool`
         """
-        data = self._api.get_api_data()
+        data = self._get_data(["building"])
         return data['building']
 
     @property
@@ -91,7 +143,21 @@ class Build(object):
         :returns: Raw console output from this build, in plain text format
         :rtype: :class:`str`
         """
-        return self._api.get_text("/consoleText")
+        store = self._api.context.build_store
+        if store is None:
+            return self._api.get_text("/consoleText")
+
+        retval = store.get_console(self._api.url)
+        if retval is not None:
+            return retval
+
+        # The build must have finished before loading the console output,
+        # otherwise we may store a partial log
+        finished = not self.is_building
+        retval = self._api.get_text("/consoleText")
+        if finished:
+            store.put_console(self._api.url, retval)
+        return retval
 
     @property
     def result(self):
@@ -108,7 +174,7 @@ class Build(object):
 
         :rtype: :class:`str`
         """
-        data = self._api.get_api_data()
+        data = self._get_data(["result"])
         return data['result']
 
     @property
@@ -119,7 +185,7 @@ class Build(object):
             0 or more SCM changesets associated with / included in this build.
         :rtype: :class:`~.changeset.Changeset`
         """
-        data = self._api.get_api_data()
+        data = self._get_data(["changeSet"])
 
         return Changeset(self._api, data['changeSet'])
 
@@ -131,7 +197,7 @@ class Build(object):
 
         :rtype: :class:`str`
         """
-        data = self._api.get_api_data()
+        data = self._get_data(["description"])
         retval = data["description"]
         if retval is None:
             return ""
@@ -143,7 +209,7 @@ class Build(object):
 
         :rtype: :class:`str`
         """
-        data = self._api.get_api_data()
+        data = self._get_data(["id"])
         return data["id"]
 
     @property
@@ -152,7 +218,7 @@ class Build(object):
 
         :rtype: :class:`list` of :class:`str`
         """
-        data = self._api.get_api_data()
+        data = self._get_data(["artifacts"])
         artifacts_node = data['artifacts']
         retval = []
 
@@ -168,7 +234,7 @@ class Build(object):
         
         :rtype: :class:`int`
         """
-        data = self._api.get_api_data()
+        data = self._get_data(["duration"])
         return data['duration']
     
     @property
@@ -177,9 +243,71 @@ class Build(object):
         
         :rtype: :class:`int`
         """
-        data = self._api.get_api_data()
+        data = self._get_data(["estimatedDuration"])
         return data['estimatedDuration']
 
+    def _poll_completion(self):
+        """Checks whether this build has finished running
+
+        Used as the check function when waiting for the build to complete.
+        See :meth:`~.utils.poller.Poller.submit` for details.
+
+        :rtype: :class:`tuple`
+        """
+        store = self._api.context.build_store
+        if store is not None and store.get_data(self._api.url) is not None:
+            return True, self
+
+        # Bypass any data we were hydrated with, which may predate the
+        # completion of the build
+        data = self._api.refresh()
+        if data.get("building", True):
+            return False, None
+        if store is not None:
+            store.put_data(self._api.url, data)
+        return True, self
+
+    def wait_for_completion_async(self, timeout=None, poller=None):
+        """Starts waiting, in the background, for this build to finish
+
+        The build is checked periodically, with the delay between checks
+        growing exponentially. Any number of waits can be serviced by the
+        same background thread.
+
+        :param float timeout:
+            maximum number of seconds to wait. If not provided, waits
+            indefinitely.
+        :param poller:
+            poller to service the wait. If not provided, the poller shared by
+            all waits is used.
+        :type poller: :class:`~.utils.poller.Poller`
+        :returns:
+            future which completes with this build once it has finished.
+            Fails with a :class:`~.exceptions.WaitTimeoutError` if the build
+            is still running after the timeout.
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        poller = poller or get_default_poller()
+        return poller.submit(self._poll_completion, timeout)
+
+    def wait_for_completion(self, timeout=None, poller=None):
+        """Blocks until this build finishes running
+
+        See :meth:`wait_for_completion_async` for details.
+
+        :param float timeout:
+            maximum number of seconds to wait. If not provided, waits
+            indefinitely.
+        :param poller:
+            poller to service the wait. If not provided, the poller shared by
+            all waits is used.
+        :type poller: :class:`~.utils.poller.Poller`
+        :returns: this build
+        :rtype: :class:`Build`
+        :raises: :class:`~.exceptions.WaitTimeoutError`
+        """
+        return self.wait_for_completion_async(timeout, poller).result()
+
     def abort(self):
         """Aborts this build before it completes"""
         self._api.post(self._api.url + "stop")
@@ -0,0 +1,398 @@
+"""Primitives for analyzing the upstream / downstream relationships of jobs"""
+from pyjen.job import Job, DEFAULT_INVENTORY_DEPTH
+from pyjen.exceptions import DependencyCycleError
+from pyjen.utils.bulk import DEFAULT_MAX_WORKERS
+
+# Fields loaded for each job when building a dependency graph. The jobs
+# returned by the graph are hydrated with this data, so the related jobs
+# are described well enough to instantiate them as well.
+DEPENDENCY_FIELDS = [
+    "name",
+    "upstreamProjects[_class,url,name]",
+    "downstreamProjects[_class,url,name]",
+]
+
+
+def _strongly_connected_components(successors):
+    """Finds the strongly connected components of a directed graph
+
+    Uses an iterative version of Tarjan's algorithm, so arbitrarily deep
+    dependency chains can be processed without hitting the recursion limit.
+
+    :param list successors:
+        adjacency array describing the graph. Element i lists the indices of
+        the nodes node i has edges to.
+    :returns:
+        the components, each a list of node indices. Components are listed
+        in reverse topological order: every component precedes the
+        components with edges leading to it.
+    :rtype: :class:`list` of :class:`list`
+    """
+    count = len(successors)
+    index = [None] * count
+    lowlink = [0] * count
+    on_stack = [False] * count
+    stack = list()
+    retval = list()
+    next_index = 0
+
+    for root in range(count):
+        if index[root] is not None:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, child = work.pop()
+            if child == 0:
+                index[node] = lowlink[node] = next_index
+                next_index += 1
+                stack.append(node)
+                on_stack[node] = True
+
+            recurse = False
+            for pos in range(child, len(successors[node])):
+                cur_succ = successors[node][pos]
+                if index[cur_succ] is None:
+                    work.append((node, pos + 1))
+                    work.append((cur_succ, 0))
+                    recurse = True
+                    break
+                if on_stack[cur_succ]:
+                    lowlink[node] = min(lowlink[node], index[cur_succ])
+            if recurse:
+                continue
+
+            if lowlink[node] == index[node]:
+                component = list()
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                retval.append(component)
+
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+    return retval
+
+
+class DependencyGraph(object):
+    """In-memory graph of the upstream / downstream relationships of jobs
+
+    The graph is loaded with a single crawl of the job hierarchy, which
+    includes the dependencies of every job. See
+    :meth:`~.job.Job.load_inventory_data`. All queries are then answered
+    from memory, without querying the REST API.
+
+    Jobs are identified by their position in an adjacency array. Cycles are
+    collapsed into single nodes on first use, and the transitive dependencies
+    of a job are then computed when first queried, by walking the collapsed
+    graph. They are remembered for the jobs that were queried only, reusing
+    those already known along the way, so memory use grows with the queries
+    made rather than with the square of the number of jobs.
+
+    Instances of this class are typically obtained from
+    :meth:`~.jenkins.Jenkins.dependency_graph`.
+
+    **Example:** ::
+
+        graph = jk.dependency_graph()
+        for cur_job in graph.all_downstream("folder/library"):
+            print(cur_job.name)
+
+    :param api:
+        Pre-initialized connection to the Jenkins REST API
+    :type api: :class:`~/utils/jenkins_api/JenkinsAPI`
+    :param dict inventory:
+        data describing all jobs to include in the graph, indexed by path, as
+        returned by :meth:`~.job.Job.load_inventory_data`. The data must
+        include the :data:`DEPENDENCY_FIELDS`.
+    """
+
+    def __init__(self, api, inventory):
+        super(DependencyGraph, self).__init__()
+        self._api = api
+        self._paths = list(inventory.keys())
+        self._data = list(inventory.values())
+        self._jobs = [None] * len(self._paths)
+        self._by_path = dict(
+            (path, pos) for pos, path in enumerate(self._paths))
+        self._by_url = dict(
+            (cur_data["url"], pos) for pos, cur_data in enumerate(self._data))
+
+        downstream = [set() for _ in self._paths]
+        for pos, cur_data in enumerate(self._data):
+            for cur_project in cur_data.get("downstreamProjects") or list():
+                target = self._by_url.get(cur_project["url"])
+                if target is not None:
+                    downstream[pos].add(target)
+            for cur_project in cur_data.get("upstreamProjects") or list():
+                source = self._by_url.get(cur_project["url"])
+                if source is not None:
+                    downstream[source].add(pos)
+
+        upstream = [set() for _ in self._paths]
+        for pos, targets in enumerate(downstream):
+            for target in targets:
+                upstream[target].add(pos)
+
+        self._downstream = [tuple(sorted(cur_set)) for cur_set in downstream]
+        self._upstream = [tuple(sorted(cur_set)) for cur_set in upstream]
+        self._components = None
+        self._owners = None
+        self._all_downstream = dict()
+        self._all_upstream = dict()
+
+    @staticmethod
+    def load(api, depth=DEFAULT_INVENTORY_DEPTH,
+             max_workers=DEFAULT_MAX_WORKERS):
+        """Loads the dependency graph of all jobs in an object, recursively
+
+        :param api:
+            PyJen REST API for the parent object which contains the jobs, like
+            the Jenkins master or a folder
+        :param int depth:
+            number of levels of nested jobs to load in each request
+        :param int max_workers:
+            maximum number of requests which may be in flight at one time when
+            expanding deeply nested containers
+        :rtype: :class:`DependencyGraph`
+        """
+        inventory = Job.load_inventory_data(
+            api, depth, DEPENDENCY_FIELDS, max_workers)
+        return DependencyGraph(api, inventory)
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __contains__(self, job):
+        return self._find(job) is not None
+
+    @property
+    def paths(self):
+        """paths of all jobs in the graph, as in "folder/subfolder/job"
+
+        :rtype: :class:`list` of :class:`str`
+        """
+        return list(self._paths)
+
+    def _find(self, job):
+        """Locates a job in the graph
+
+        :param job: the job, or the path to the job
+        :returns: position of the job in the graph, or None if not found
+        :rtype: :class:`int`
+        """
+        if isinstance(job, Job):
+            return self._by_url.get(repr(job))
+        return self._by_path.get(job)
+
+    def _position(self, job):
+        """Locates a job that must exist in the graph
+
+        :param job: the job, or the path to the job
+        :rtype: :class:`int`
+        :raises: :class:`KeyError` if the job isn't in the graph
+        """
+        retval = self._find(job)
+        if retval is None:
+            raise KeyError(job)
+        return retval
+
+    def _job(self, pos):
+        """Gets the job at a given position in the graph
+
+        Jobs are only instantiated the first time they are needed.
+
+        :param int pos: position of the job
+        :rtype: :class:`~.job.Job`
+        """
+        retval = self._jobs[pos]
+        if retval is None:
+            retval = Job.instantiate(self._data[pos], self._api)
+            self._jobs[pos] = retval
+        return retval
+
+    def _jobs_at(self, positions):
+        """Gets the jobs at several positions in the graph
+
+        :param positions: positions of the jobs
+        :rtype: :class:`list` of :class:`~.job.Job`
+        """
+        return [self._job(pos) for pos in positions]
+
+    def upstream(self, job):
+        """Gets the jobs which directly trigger a job
+
+        :param job: the job, or the path to the job
+        :rtype: :class:`list` of :class:`~.job.Job`
+        """
+        return self._jobs_at(self._upstream[self._position(job)])
+
+    def downstream(self, job):
+        """Gets the jobs which are directly triggered by a job
+
+        :param job: the job, or the path to the job
+        :rtype: :class:`list` of :class:`~.job.Job`
+        """
+        return self._jobs_at(self._downstream[self._position(job)])
+
+    def all_upstream(self, job):
+        """Gets all jobs a job depends on, directly or indirectly
+
+        The job itself is only included if it depends on itself through a
+        cycle.
+
+        :param job: the job, or the path to the job
+        :rtype: :class:`list` of :class:`~.job.Job`
+        """
+        return self._jobs_at(self._closure(
+            self._position(job), self._upstream, self._all_upstream))
+
+    def all_downstream(self, job):
+        """Gets all jobs that depend on a job, directly or indirectly
+
+        The job itself is only included if it depends on itself through a
+        cycle.
+
+        :param job: the job, or the path to the job
+        :rtype: :class:`list` of :class:`~.job.Job`
+        """
+        return self._jobs_at(self._closure(
+            self._position(job), self._downstream, self._all_downstream))
+
+    def depends_on(self, job, other):
+        """Checks to see whether a job depends on another, directly or not
+
+        :param job: the dependent job, or the path to the job
+        :param other: the job it may depend on, or the path to the job
+        :rtype: :class:`bool`
+        """
+        dependencies = self._closure(
+            self._position(job), self._upstream, self._all_upstream)
+        return self._position(other) in dependencies
+
+    def transitive_closure(self):
+        """Gets all jobs that depend on each job, directly or indirectly
+
+        :returns:
+            the path of each job in the graph, mapped to the paths of all jobs
+            which depend on it
+        :rtype: :class:`dict`
+        """
+        # Components are listed with downstream jobs first, so each one is
+        # merged from the closures of its neighbours without walking the
+        # graph. Those closures are only kept until the result is built.
+        closures = dict()
+        for cur_component in self._get_components():
+            self._closure(cur_component[0], self._downstream, closures)
+        owners = self._owners
+        return dict(
+            (path, [self._paths[cur_pos]
+                    for cur_pos in closures[owners[pos]]])
+            for pos, path in enumerate(self._paths))
+
+    @property
+    def cycles(self):
+        """groups of jobs which depend on each other cyclically
+
+        :returns: each cycle, as a list of the paths of the jobs involved
+        :rtype: :class:`list` of :class:`list`
+        """
+        return [sorted(self._paths[pos] for pos in cur_component)
+                for cur_component in self._get_components()
+                if self._is_cyclic(cur_component)]
+
+    def topological_order(self):
+        """Orders all jobs so that every job follows the jobs it depends on
+
+        :rtype: :class:`list` of :class:`~.job.Job`
+        :raises:
+            :class:`~.exceptions.DependencyCycleError` if jobs depend on each
+            other cyclically, in which case no such order exists
+        """
+        cycles = self.cycles
+        if cycles:
+            raise DependencyCycleError(cycles)
+        return self._jobs_at(
+            cur_component[0]
+            for cur_component in reversed(self._get_components()))
+
+    def _is_cyclic(self, component):
+        """Checks to see whether a strongly connected component is a cycle
+
+        :param list component: positions of the jobs in the component
+        :rtype: :class:`bool`
+        """
+        if len(component) > 1:
+            return True
+        return component[0] in self._downstream[component[0]]
+
+    def _get_components(self):
+        """Gets the strongly connected components of the graph
+
+        :returns: the components, in reverse topological order
+        :rtype: :class:`list` of :class:`list`
+        """
+        if self._components is None:
+            components = _strongly_connected_components(self._downstream)
+            owners = [None] * len(self._paths)
+            for comp_id, cur_component in enumerate(components):
+                for pos in cur_component:
+                    owners[pos] = comp_id
+            self._owners = owners
+            self._components = components
+        return self._components
+
+    def _closure(self, pos, edges, closures):
+        """Gets the transitive dependencies of a job in one direction
+
+        Jobs in the same cycle share the same dependencies, so each cycle is
+        treated as a single node. The collapsed graph is walked from the
+        job's cycle, without descending into the nodes whose dependencies
+        are already known.
+
+        :param int pos: position of the job
+        :param list edges:
+            adjacency array describing the dependencies to follow
+        :param dict closures:
+            dependencies already computed, as sorted positions indexed by
+            component. The dependencies of the job's component are added.
+        :returns: positions of the jobs the job depends on, in order
+        :rtype: :class:`tuple` of :class:`int`
+        """
+        components = self._get_components()
+        owners = self._owners
+        comp_id = owners[pos]
+        retval = closures.get(comp_id)
+        if retval is not None:
+            return retval
+
+        positions = set()
+        if self._is_cyclic(components[comp_id]):
+            positions.update(components[comp_id])
+        seen = set([comp_id])
+        work = [comp_id]
+        while work:
+            for member in components[work.pop()]:
+                for neighbour in edges[member]:
+                    other = owners[neighbour]
+                    if other in seen:
+                        continue
+                    seen.add(other)
+                    positions.update(components[other])
+                    known = closures.get(other)
+                    if known is None:
+                        work.append(other)
+                    else:
+                        positions.update(known)
+
+        retval = tuple(sorted(positions))
+        closures[comp_id] = retval
+        return retval
+
+
+if __name__ == "__main__":  # pragma: no cover
+    pass
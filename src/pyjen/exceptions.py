@@ -57,6 +57,68 @@ class InvalidParameterError(PyJenError):
         return self.__msg
 
 
+class WaitTimeoutError(PyJenError):
+    """Exception raised when an object doesn't reach the state being waited on
+    before the wait times out"""
+
+    def __init__(self, msg):
+        """Constructor
+
+        :param str msg: Descriptive message associated with this exception
+        """
+        super(WaitTimeoutError, self).__init__()
+
+        self.__msg = msg
+
+    def __str__(self):
+        return self.__msg
+
+
+class DependencyCycleError(PyJenError):
+    """Exception raised when jobs can't be ordered because they depend on
+    each other cyclically"""
+
+    def __init__(self, cycles):
+        """Constructor
+
+        :param list cycles:
+            each cycle found, as a list of the paths of the jobs involved
+        """
+        super(DependencyCycleError, self).__init__()
+        self._cycles = cycles
+
+    def __str__(self):
+        return "Jobs depend on each other cyclically: " + "; ".join(
+            ", ".join(cur_cycle) for cur_cycle in self._cycles)
+
+    @property
+    def cycles(self):
+        """each cycle found, as a list of the paths of the jobs involved"""
+        return self._cycles
+
+
+class BulkOperationError(PyJenError):
+    """Exception raised when a bulk operation fails on one or more objects"""
+
+    def __init__(self, result):
+        """Constructor
+
+        :param result: summary of the outcome of the bulk operation
+        :type result: :class:`~.utils.bulk.BulkResult`
+        """
+        super(BulkOperationError, self).__init__()
+        self._result = result
+
+    def __str__(self):
+        return "Bulk operation failed on {0} of {1} objects".format(
+            len(self._result.failed), len(self._result))
+
+    @property
+    def result(self):
+        """Summary of the outcome of the bulk operation"""
+        return self._result
+
+
 class NotYetImplementedError(PyJenError):
     """Exception thrown from methods that are not yet implemented"""
 
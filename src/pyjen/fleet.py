@@ -0,0 +1,768 @@
+"""Primitives for inspecting the build agents of a Jenkins master as a whole"""
+import logging
+import threading
+import time
+from collections import deque
+from pyjen.build import Build
+from pyjen.node import Node
+from pyjen.utils.poller import Backoff, DEFAULT_MAX_DELAY
+from pyjen.utils.tree_query import compile_tree_query
+
+# Fields loaded for each node when capturing a snapshot of the fleet. Covers
+# all of the properties of the :class:`~.node.Node` class, so they can be
+# queried without hitting the REST API again.
+NODE_FLEET_FIELDS = [
+    "displayName",
+    "offline",
+    "idle",
+    "numExecutors",
+    "executors[idle,currentExecutable[url]]",
+    "oneOffExecutors[currentExecutable[url]]",
+    "assignedLabels[name]",
+]
+
+# Number of seconds between two samples of executor utilization by default
+DEFAULT_SAMPLE_INTERVAL = 60
+
+# Number of samples of executor utilization retained by default. Together
+# with the default sampling interval this covers one day.
+DEFAULT_SAMPLE_CAPACITY = 1440
+
+# Number of seconds between the first two checks when waiting for the fleet
+# to become idle. Subsequent checks back off up to DEFAULT_MAX_DELAY.
+DEFAULT_IDLE_POLL_DELAY = 1
+
+
+def _node_url(root_url, name):
+    """Generates the URL of the REST API endpoint for a node
+
+    :param str root_url: URL of the Jenkins master
+    :param str name: display name of the node
+    :rtype: :class:`str`
+    """
+    if name == "master":
+        return root_url + "computer/(master)"
+    return root_url + "computer/" + name
+
+
+def _busy_executors(data):
+    """Counts the executors of a node which are running builds
+
+    :param dict data: REST API data describing the node, from a fleet listing
+    :rtype: :class:`int`
+    """
+    return len([cur_executor for cur_executor in data["executors"]
+                if not cur_executor["idle"]])
+
+
+class NodeFleet(object):
+    """Abstraction around the set of build agents managed by a Jenkins master
+
+    .. seealso: :py:attr:`~.jenkins.Jenkins.node_fleet`
+
+    :param api:
+        Pre-initialized connection to the Jenkins REST API
+    :type api: :class:`~/utils/jenkins_api/JenkinsAPI`
+    """
+
+    def __init__(self, api):
+        super(NodeFleet, self).__init__()
+        self._api = api
+
+    def snapshot(self):
+        """Captures the state of all nodes with a single request
+
+        The nodes in the snapshot are pre-populated with the data loaded by
+        the request, so their properties can be read without querying the
+        REST API again.
+
+        :rtype: :class:`FleetSnapshot`
+        """
+        query = compile_tree_query(
+            "computer", NODE_FLEET_FIELDS, required=["_class"])
+        data = self._api.get_api_data(query_params=query)
+        nodes = [
+            Node(self._api.clone(
+                _node_url(self._api.root_url, cur_node["displayName"]),
+                cur_node))
+            for cur_node in data["computer"]
+        ]
+        return FleetSnapshot(nodes, data["computer"])
+
+    def label_index(self):
+        """Creates an index of the nodes of this fleet by label
+
+        The index is populated from a new snapshot of the fleet.
+
+        :rtype: :class:`LabelIndex`
+        """
+        retval = LabelIndex(self)
+        retval.refresh()
+        return retval
+
+    def wait_for_idle(self, timeout=None, progress=None, backoff=None):
+        """Blocks until no builds are running on any node of the fleet
+
+        The state of all nodes is checked with a single request each time.
+        The delay between checks grows exponentially while the number of
+        running builds stays the same, and starts over whenever it drops, so
+        the end of a drain is detected promptly without hammering the server
+        while long builds finish.
+
+        :param float timeout:
+            maximum number of seconds to wait. If not provided, waits
+            indefinitely.
+        :param progress:
+            optional callable object which is passed the
+            :class:`FleetSnapshot` captured by each check, allowing progress
+            to be reported
+        :param backoff:
+            generator of the delays between checks. If not provided, the
+            default delays are used.
+        :type backoff: :class:`~.utils.poller.Backoff`
+        :returns: summary describing the outcome of the wait
+        :rtype: :class:`DrainSummary`
+        """
+        if backoff is None:
+            backoff = Backoff(DEFAULT_IDLE_POLL_DELAY, DEFAULT_MAX_DELAY)
+        start = time.time()
+        deadline = None if timeout is None else start + timeout
+        checks = 0
+        previous = None
+
+        while True:
+            snapshot = self.snapshot()
+            checks += 1
+            if progress is not None:
+                progress(snapshot)
+
+            running = snapshot.running_build_urls
+            idle = not running and snapshot.busy_executors == 0
+            now = time.time()
+            if idle or (deadline is not None and now >= deadline):
+                break
+
+            if previous is not None and len(running) < previous:
+                backoff.reset()
+            previous = len(running)
+
+            delay = backoff.next_delay()
+            if deadline is not None:
+                delay = min(delay, deadline - now)
+            time.sleep(delay)
+
+        return DrainSummary(
+            idle,
+            time.time() - start,
+            checks,
+            [Build(self._api.clone(cur_url)) for cur_url in running])
+
+    def sampler(self, interval=DEFAULT_SAMPLE_INTERVAL,
+                capacity=DEFAULT_SAMPLE_CAPACITY):
+        """Creates a sampler recording the executor utilization of this fleet
+
+        :param float interval: number of seconds between two samples
+        :param int capacity: maximum number of samples to retain
+        :rtype: :class:`UtilizationSampler`
+        """
+        return UtilizationSampler(self, interval, capacity)
+
+
+class FleetSnapshot(object):
+    """State of all nodes managed by a Jenkins master at a point in time
+
+    Instances of this class are typically obtained from
+    :meth:`NodeFleet.snapshot`.
+
+    :param list nodes: the nodes, pre-populated with the data describing them
+    :param list data: REST API data describing each node
+    """
+
+    def __init__(self, nodes, data):
+        super(FleetSnapshot, self).__init__()
+        self._nodes = list(nodes)
+        self._data = list(data)
+        self._timestamp = time.time()
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    @property
+    def timestamp(self):
+        """time at which the snapshot was captured, in seconds since the epoch
+
+        :rtype: :class:`float`
+        """
+        return self._timestamp
+
+    @property
+    def nodes(self):
+        """all nodes managed by the Jenkins master
+
+        :rtype: :class:`list` of :class:`~.node.Node`
+        """
+        return list(self._nodes)
+
+    @property
+    def online_nodes(self):
+        """nodes which were online
+
+        :rtype: :class:`list` of :class:`~.node.Node`
+        """
+        return [cur_node for cur_node, cur_data in zip(self._nodes, self._data)
+                if not cur_data["offline"]]
+
+    @property
+    def offline_nodes(self):
+        """nodes which were offline
+
+        :rtype: :class:`list` of :class:`~.node.Node`
+        """
+        return [cur_node for cur_node, cur_data in zip(self._nodes, self._data)
+                if cur_data["offline"]]
+
+    @property
+    def total_executors(self):
+        """number of executors provided by all online nodes
+
+        :rtype: :class:`int`
+        """
+        return sum(cur_data["numExecutors"] for cur_data in self._data
+                   if not cur_data["offline"])
+
+    @property
+    def busy_executors(self):
+        """number of executors of online nodes which were running builds
+
+        :rtype: :class:`int`
+        """
+        return sum(_busy_executors(cur_data) for cur_data in self._data
+                   if not cur_data["offline"])
+
+    @property
+    def idle_executors(self):
+        """number of executors of online nodes which were not running builds
+
+        :rtype: :class:`int`
+        """
+        return self.total_executors - self.busy_executors
+
+    @property
+    def utilization(self):
+        """fraction of the executors of online nodes which were running builds
+
+        :returns: value between 0 and 1, or 0 if there are no executors online
+        :rtype: :class:`float`
+        """
+        total = self.total_executors
+        if not total:
+            return 0.0
+        return float(self.busy_executors) / total
+
+    @property
+    def running_build_urls(self):
+        """URLs of the builds that were running on all nodes
+
+        Includes builds running on the lightweight executors Jenkins creates
+        on demand, like the ones running Pipeline builds.
+
+        :rtype: :class:`list` of :class:`str`
+        """
+        retval = list()
+        for cur_data in self._data:
+            executors = cur_data["executors"] + \
+                cur_data.get("oneOffExecutors", list())
+            for cur_executor in executors:
+                build = cur_executor.get("currentExecutable")
+                if build and build.get("url"):
+                    retval.append(build["url"])
+        return retval
+
+
+class DrainSummary(object):
+    """Outcome of waiting for all builds running on a fleet to finish
+
+    .. seealso: :meth:`NodeFleet.wait_for_idle`
+
+    :param bool idle: whether the fleet became idle before the wait ended
+    :param float elapsed: number of seconds spent waiting
+    :param int checks: number of times the state of the fleet was checked
+    :param list running_builds: builds still running when the wait ended
+    """
+
+    def __init__(self, idle, elapsed, checks, running_builds):
+        super(DrainSummary, self).__init__()
+        self._idle = idle
+        self._elapsed = elapsed
+        self._checks = checks
+        self._running_builds = list(running_builds)
+
+    def __str__(self):
+        if self._idle:
+            return "Fleet became idle after {0:.1f} seconds".format(
+                self._elapsed)
+        return "{0} builds still running after {1:.1f} seconds".format(
+            len(self._running_builds), self._elapsed)
+
+    @property
+    def idle(self):
+        """Checks to see whether the fleet became idle before the wait ended
+
+        :rtype: :class:`bool`
+        """
+        return self._idle
+
+    @property
+    def elapsed(self):
+        """number of seconds spent waiting
+
+        :rtype: :class:`float`
+        """
+        return self._elapsed
+
+    @property
+    def checks(self):
+        """number of times the state of the fleet was checked
+
+        :rtype: :class:`int`
+        """
+        return self._checks
+
+    @property
+    def running_builds(self):
+        """builds which were still running when the wait ended
+
+        :rtype: :class:`list` of :class:`~.build.Build`
+        """
+        return list(self._running_builds)
+
+
+class _LabelStats(object):
+    """Aggregate executor counts of all nodes carrying a label"""
+    def __init__(self):
+        super(_LabelStats, self).__init__()
+        self.nodes = set()
+        self.total_executors = 0
+        self.busy_executors = 0
+
+
+class LabelIndex(object):
+    """In-memory index of the nodes of a fleet by the labels they carry
+
+    Executor counts are aggregated per label as the index is populated, so
+    capacity queries for a label are answered in constant time, without
+    iterating over the nodes or querying the REST API.
+
+    The index is refreshed from snapshots of the fleet. Only the nodes whose
+    labels or executor state changed since the previous snapshot are
+    re-indexed, so refreshing the index costs a single request to the REST
+    API, with the aggregate counts only updated for the nodes that changed.
+
+    Only the executors of nodes which are online are counted. Labels are
+    matched exactly; label expressions like "linux && x64" aren't evaluated.
+
+    Instances of this class are typically obtained from
+    :meth:`NodeFleet.label_index`.
+
+    **Example:** ::
+
+        index = jk.node_fleet.label_index()
+        while True:
+            print("free linux executors: {0}".format(
+                index.free_executors("linux")))
+            time.sleep(5)
+            index.refresh()
+
+    :param fleet: the fleet to index
+    :type fleet: :class:`NodeFleet`
+    """
+
+    def __init__(self, fleet):
+        super(LabelIndex, self).__init__()
+        self._fleet = fleet
+        self._lock = threading.Lock()
+        self._nodes = dict()
+        self._records = dict()
+        self._labels = dict()
+        self._timestamp = None
+
+    def __contains__(self, label):
+        with self._lock:
+            return label in self._labels
+
+    @property
+    def timestamp(self):
+        """time at which the snapshot the index reflects was captured
+
+        :returns:
+            seconds since the epoch, or None if the index hasn't been
+            populated yet
+        :rtype: :class:`float`
+        """
+        return self._timestamp
+
+    @property
+    def labels(self):
+        """all labels carried by at least one node
+
+        :rtype: :class:`list` of :class:`str`
+        """
+        with self._lock:
+            return sorted(self._labels)
+
+    def refresh(self):
+        """Updates the index from a new snapshot of the fleet
+
+        :returns: names of the nodes that were added, removed or changed
+        :rtype: :class:`set` of :class:`str`
+        """
+        return self.update(self._fleet.snapshot())
+
+    def update(self, snapshot):
+        """Updates the index from a snapshot of the fleet
+
+        :param snapshot: the current state of the fleet
+        :type snapshot: :class:`FleetSnapshot`
+        :returns: names of the nodes that were added, removed or changed
+        :rtype: :class:`set` of :class:`str`
+        """
+        # The records are computed from the data loaded by the snapshot
+        # rather than from the nodes, whose properties would query the REST
+        # API once that data is stale
+        records = dict()
+        nodes = dict()
+        data = snapshot._data  # pylint: disable=protected-access
+        for cur_node, cur_data in zip(snapshot.nodes, data):
+            name = cur_data["displayName"]
+            nodes[name] = cur_node
+            records[name] = (
+                frozenset(cur_label["name"]
+                          for cur_label in cur_data["assignedLabels"]),
+                not cur_data["offline"],
+                cur_data["numExecutors"],
+                _busy_executors(cur_data))
+
+        changed = set()
+        with self._lock:
+            for name in set(self._records) - set(records):
+                self._remove(name)
+                changed.add(name)
+
+            for name, cur_record in records.items():
+                if self._records.get(name) == cur_record:
+                    continue
+                if name in self._records:
+                    self._remove(name)
+                self._add(name, cur_record)
+                changed.add(name)
+
+            # Nodes are replaced even if unchanged, so the objects returned
+            # by the index are hydrated with the latest data
+            self._nodes = nodes
+            self._timestamp = snapshot.timestamp
+        return changed
+
+    def _add(self, name, record):
+        """Adds the contribution of a node to the aggregate counts
+
+        :param str name: name of the node
+        :param tuple record: indexed state of the node
+        """
+        labels, online, total, busy = record
+        for cur_label in labels:
+            stats = self._labels.setdefault(cur_label, _LabelStats())
+            stats.nodes.add(name)
+            if online:
+                stats.total_executors += total
+                stats.busy_executors += busy
+        self._records[name] = record
+
+    def _remove(self, name):
+        """Removes the contribution of a node from the aggregate counts
+
+        :param str name: name of the node
+        """
+        labels, online, total, busy = self._records.pop(name)
+        for cur_label in labels:
+            stats = self._labels[cur_label]
+            stats.nodes.discard(name)
+            if online:
+                stats.total_executors -= total
+                stats.busy_executors -= busy
+            if not stats.nodes:
+                del self._labels[cur_label]
+
+    def nodes_with_label(self, label):
+        """Gets the nodes carrying a label
+
+        :param str label: the label to look for
+        :rtype: :class:`list` of :class:`~.node.Node`
+        """
+        with self._lock:
+            stats = self._labels.get(label)
+            if stats is None:
+                return list()
+            return [self._nodes[cur_name] for cur_name in sorted(stats.nodes)]
+
+    def total_executors(self, label):
+        """Gets the number of executors of online nodes carrying a label
+
+        :param str label: the label to look for
+        :rtype: :class:`int`
+        """
+        with self._lock:
+            stats = self._labels.get(label)
+            return 0 if stats is None else stats.total_executors
+
+    def busy_executors(self, label):
+        """Gets the number of executors running builds on nodes with a label
+
+        :param str label: the label to look for
+        :rtype: :class:`int`
+        """
+        with self._lock:
+            stats = self._labels.get(label)
+            return 0 if stats is None else stats.busy_executors
+
+    def free_executors(self, label):
+        """Gets the number of idle executors of online nodes with a label
+
+        :param str label: the label to look for
+        :rtype: :class:`int`
+        """
+        with self._lock:
+            stats = self._labels.get(label)
+            if stats is None:
+                return 0
+            return stats.total_executors - stats.busy_executors
+
+
+class UtilizationSample(object):
+    """Measurement of the executor utilization of a fleet at a point in time
+
+    :param float timestamp: time at which the sample was taken
+    :param int total_executors: number of executors of online nodes
+    :param int busy_executors: number of those executors running builds
+    :param int offline_nodes: number of nodes which were offline
+    """
+
+    def __init__(self, timestamp, total_executors, busy_executors,
+                 offline_nodes):
+        super(UtilizationSample, self).__init__()
+        self._timestamp = timestamp
+        self._total_executors = total_executors
+        self._busy_executors = busy_executors
+        self._offline_nodes = offline_nodes
+
+    def __repr__(self):
+        return "UtilizationSample({0}, {1}/{2} busy)".format(
+            self._timestamp, self._busy_executors, self._total_executors)
+
+    @property
+    def timestamp(self):
+        """time at which the sample was taken, in seconds since the epoch
+
+        :rtype: :class:`float`
+        """
+        return self._timestamp
+
+    @property
+    def total_executors(self):
+        """number of executors provided by online nodes
+
+        :rtype: :class:`int`
+        """
+        return self._total_executors
+
+    @property
+    def busy_executors(self):
+        """number of executors which were running builds
+
+        :rtype: :class:`int`
+        """
+        return self._busy_executors
+
+    @property
+    def offline_nodes(self):
+        """number of nodes which were offline
+
+        :rtype: :class:`int`
+        """
+        return self._offline_nodes
+
+    @property
+    def utilization(self):
+        """fraction of executors which were running builds
+
+        :rtype: :class:`float`
+        """
+        if not self._total_executors:
+            return 0.0
+        return float(self._busy_executors) / self._total_executors
+
+
+class UtilizationSampler(object):
+    """Periodically records the executor utilization of a fleet
+
+    Samples are kept in a ring buffer of fixed size, so the oldest samples
+    are discarded once it is full and memory use stays constant no matter
+    how long the sampler runs. Each sample costs a single request to the
+    REST API.
+
+    Instances of this class are typically obtained from
+    :meth:`NodeFleet.sampler`.
+
+    **Example:** ::
+
+        with jk.node_fleet.sampler(interval=30) as sampler:
+            run_workload()
+        print("peak utilization: {0}".format(sampler.peak_utilization))
+
+    :param fleet: the fleet to sample
+    :type fleet: :class:`NodeFleet`
+    :param float interval: number of seconds between two samples
+    :param int capacity: maximum number of samples to retain
+    """
+
+    def __init__(self, fleet, interval=DEFAULT_SAMPLE_INTERVAL,
+                 capacity=DEFAULT_SAMPLE_CAPACITY):
+        super(UtilizationSampler, self).__init__()
+        self._log = logging.getLogger(__name__)
+        self._fleet = fleet
+        self._interval = interval
+        self._samples = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._samples)
+
+    @property
+    def capacity(self):
+        """maximum number of samples retained
+
+        :rtype: :class:`int`
+        """
+        return self._samples.maxlen
+
+    @property
+    def interval(self):
+        """number of seconds between two samples
+
+        :rtype: :class:`float`
+        """
+        return self._interval
+
+    @property
+    def running(self):
+        """Checks to see whether samples are being recorded in the background
+
+        :rtype: :class:`bool`
+        """
+        return self._thread is not None
+
+    @property
+    def samples(self):
+        """samples retained by the sampler, from oldest to newest
+
+        :rtype: :class:`list` of :class:`UtilizationSample`
+        """
+        with self._lock:
+            return list(self._samples)
+
+    @property
+    def average_utilization(self):
+        """mean utilization across all retained samples
+
+        :returns: value between 0 and 1, or None if there are no samples
+        :rtype: :class:`float`
+        """
+        samples = self.samples
+        if not samples:
+            return None
+        return sum(cur_sample.utilization for cur_sample in samples) / \
+            len(samples)
+
+    @property
+    def peak_utilization(self):
+        """highest utilization across all retained samples
+
+        :returns: value between 0 and 1, or None if there are no samples
+        :rtype: :class:`float`
+        """
+        samples = self.samples
+        if not samples:
+            return None
+        return max(cur_sample.utilization for cur_sample in samples)
+
+    def sample(self):
+        """Records the current executor utilization of the fleet
+
+        :returns: the sample that was recorded
+        :rtype: :class:`UtilizationSample`
+        """
+        snapshot = self._fleet.snapshot()
+        retval = UtilizationSample(
+            snapshot.timestamp,
+            snapshot.total_executors,
+            snapshot.busy_executors,
+            len(snapshot.offline_nodes))
+        with self._lock:
+            self._samples.append(retval)
+        return retval
+
+    def clear(self):
+        """Discards all retained samples"""
+        with self._lock:
+            self._samples.clear()
+
+    def start(self):
+        """Starts recording samples in the background
+
+        Does nothing if the sampler is already running.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="pyjen-utilization-sampler")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stops recording samples in the background
+
+        Blocks until the background thread has exited.
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        """Main loop of the background thread"""
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as err:  # pylint: disable=broad-except
+                # Failed samples are skipped rather than ending the sampler
+                self._log.debug("Failed to sample executor utilization: %s",
+                                err)
+            self._stop.wait(self._interval)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    pass
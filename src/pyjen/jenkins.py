@@ -3,16 +3,22 @@ import logging
 from requests.exceptions import RequestException
 from pyjen.view import View
 from pyjen.node import Node
-from pyjen.job import Job
+from pyjen.fleet import NodeFleet
+from pyjen.dependency_graph import DependencyGraph
+from pyjen.job import Job, DEFAULT_INVENTORY_DEPTH, METRICS_JOB_FIELDS, \
+    compile_job_metrics
 from pyjen.user import User
 from pyjen.queue import Queue
+from pyjen.watch import WatchService
 from pyjen.plugin_manager import PluginManager
 from pyjen.utils.user_params import JenkinsConfigParser
-from pyjen.utils.jenkins_api import JenkinsAPI
+from pyjen.utils.jenkins_api import JenkinsAPI, DEFAULT_MAX_DATA_AGE
 from pyjen.utils.helpers import create_view, create_job
+from pyjen.utils.cache import ReadCache
+from pyjen.utils.bulk import BulkJobOperations, DEFAULT_MAX_WORKERS
 
 
-class Jenkins(object):
+class Jenkins(BulkJobOperations):
     """Python wrapper managing the Jenkins primary dashboard
 
     Generally you should use this class as the primary entry point to the PyJen
@@ -56,9 +62,39 @@ class Jenkins(object):
         remote server. Maybe be a boolean indicating whether SSL verification
         is enabled or disabled, or may be a path to a certificate authority
         bundle.
+    :param transport:
+        Optional pooled HTTP transport used for all communication with the
+        Jenkins REST API. Use this to customize the connection pool size and
+        keep-alive behavior. If not provided, a transport with default
+        settings will be created. The transport is shared by all objects
+        produced by this class, including jobs, views, builds and so on.
+    :type transport: :class:`~.utils.transport.Transport`
+    :param int max_data_age:
+        Objects created from listings, like the jobs returned by
+        :py:attr:`.jobs`, are pre-populated with the data contained in those
+        listings to avoid re-querying the REST API. This parameter controls
+        how long, in seconds, that data is considered valid. May be None to
+        keep the data until the objects are explicitly refreshed. Any
+        operation that modifies the state of the Jenkins server invalidates
+        the data immediately.
+    :param float cache_ttl:
+        Optional number of seconds data loaded from the REST API may be
+        reused by any object produced by this class. When enabled, reading
+        several properties of the same object, or of different objects backed
+        by the same REST API endpoint, within this window results in a single
+        request to the server, as do identical requests issued concurrently
+        from several threads. Any operation that modifies the state of the
+        Jenkins server invalidates the data immediately. Disabled by default.
+    :param build_store:
+        Optional persistent store used to cache the data and console output
+        of builds that have finished running, across runs of a script.
+        Disabled by default.
+    :type build_store: :class:`~.utils.build_store.BuildStore`
     """
 
-    def __init__(self, url, credentials=None, ssl_cert=True):
+    def __init__(self, url, credentials=None, ssl_cert=True, transport=None,
+                 max_data_age=DEFAULT_MAX_DATA_AGE, cache_ttl=None,
+                 build_store=None):
         super(Jenkins, self).__init__()
         self._log = logging.getLogger(__name__)
 
@@ -71,7 +107,12 @@ class Jenkins(object):
         else:
             creds = credentials
 
-        self._api = JenkinsAPI(url, creds, ssl_cert)
+        self._api = JenkinsAPI(url, creds, ssl_cert, transport)
+        self._api.context.max_data_age = max_data_age
+        if cache_ttl is not None:
+            self._api.context.read_cache = ReadCache(cache_ttl)
+        self._api.context.build_store = build_store
+        self._watch_service = None
 
     @property
     def connected(self):
@@ -114,21 +155,23 @@ class Jenkins(object):
     def nodes(self):
         """gets the list of nodes (aka: agents) managed by this Jenkins master
 
+        The nodes are pre-populated with the data describing them, loaded
+        using a single request. See :meth:`~.fleet.NodeFleet.snapshot`.
+
         :returns: list of 0 or more Node objects managed by this Jenkins master
         :rtype: :class:`list` of :class:`~.node.Node` objects
         """
-        data = self._api.get_api_data(target_url=self._api.url + "computer/")
-        nodes = data['computer']
-        retval = []
-        for cur_node in nodes:
-            if cur_node['displayName'] == 'master':
-                node_url = self._api.url + 'computer/(master)'
-            else:
-                node_url = self._api.url + 'computer/' + cur_node['displayName']
+        return self.node_fleet.snapshot().nodes
 
-            retval.append(Node(self._api.clone(node_url)))
+    @property
+    def node_fleet(self):
+        """object that describes the nodes (aka: agents) of this master
 
-        return retval
+        Unlike :py:attr:`nodes`, it covers the fleet of nodes as a whole.
+
+        :rtype: :class:`~.fleet.NodeFleet`
+        """
+        return NodeFleet(self._api.clone(self._api.url + "computer/"))
 
     @property
     def default_view(self):
@@ -168,31 +211,79 @@ class Jenkins(object):
     def jobs(self):
         """Gets all jobs managed by this Jenkins instance
 
+        .. seealso: :py:meth:`.list_jobs`
+
         :rtype:  :class:`list` of :class:`~.job.Job` objects
         """
-        data = self._api.get_api_data(query_params="depth=2")
+        return self.list_jobs()
 
-        retval = list()
-        for j in data['jobs']:
-            retval.append(Job.instantiate(j, self._api))
+    def list_jobs(self, fields=None, start=None, end=None):
+        """Gets jobs managed by this Jenkins instance, with selected fields
 
-        return retval
+        Only the fields selected by the caller are loaded for each job, making
+        this much cheaper than loading the full job data on servers with many
+        jobs. The returned jobs are pre-populated with the loaded data so it
+        may be queried without hitting the REST API again.
 
-    def _recursively_find_jobs(self, obj):
-        """Recursively locates all jobs managed by an arbitrary Jenkins object
+        **Example:** ::
 
-        :param obj:
-            An arbitrary Jenkins object which may contain jobs. The given object
-            may be one of any number of PyJen plugins, but it must expose
-            a 'jobs' property which can be used to load a list of jobs
-            managed by the object
-        :rtype: :class:`list` of :class:`~.job.Job` objects"""
-        retval = list()
-        for cur_job in obj.jobs:
-            retval.append(cur_job)
-            if isinstance(getattr(type(cur_job), "jobs", None), property):
-                retval.extend(self._recursively_find_jobs(cur_job))
-        return retval
+            jobs = jk.list_jobs(["name", "color", "lastBuild[number,result]"])
+
+        :param list fields:
+            list of fields to load for each job, using the field selector
+            syntax described by :func:`~.utils.tree_query.format_fields`.
+            If not provided, a default set of fields covering the most
+            commonly used job properties is loaded.
+        :param int start:
+            optional index of the first job to load
+        :param int end:
+            optional index one past the last job to load
+        :rtype:  :class:`list` of :class:`~.job.Job` objects
+        """
+        return Job.instantiate_list(self._api, fields, start, end)
+
+    def job_inventory(self, depth=DEFAULT_INVENTORY_DEPTH, fields=None,
+                      max_workers=DEFAULT_MAX_WORKERS):
+        """Gets all jobs managed by this Jenkins instance, indexed by path
+
+        Jobs nested within containers, like folders and multibranch
+        pipelines, are loaded several levels at a time using a single
+        request, so even large hierarchies can be enumerated quickly.
+        See :meth:`~.job.Job.instantiate_inventory` for details.
+
+        :param int depth:
+            number of levels of nested jobs to load in each request
+        :param list fields:
+            list of fields to load for each job, using the field selector
+            syntax described by :func:`~.utils.tree_query.format_fields`.
+            If not provided only the job names are loaded.
+        :param int max_workers:
+            maximum number of requests which may be in flight at one time when
+            expanding deeply nested containers
+        :returns:
+            all jobs managed by this instance, indexed by the full path to
+            each job, as in "folder/subfolder/job"
+        :rtype: :class:`collections.OrderedDict`
+        """
+        return Job.instantiate_inventory(
+            self._api, depth, fields, max_workers)
+
+    def dependency_graph(self, depth=DEFAULT_INVENTORY_DEPTH,
+                         max_workers=DEFAULT_MAX_WORKERS):
+        """Loads the upstream / downstream relationships of all jobs
+
+        The dependencies of all jobs, including jobs nested within folders,
+        are loaded with a single crawl of the job hierarchy. See
+        :meth:`.job_inventory` for details.
+
+        :param int depth:
+            number of levels of nested jobs to load in each request
+        :param int max_workers:
+            maximum number of requests which may be in flight at one time when
+            expanding deeply nested containers
+        :rtype: :class:`~.dependency_graph.DependencyGraph`
+        """
+        return DependencyGraph.load(self._api, depth, max_workers)
 
     @property
     def all_jobs(self):
@@ -203,8 +294,54 @@ class Jenkins(object):
         support nesting jobs under sub-folders / sub-paths. Any job which
         exposes a custom 'jobs' property.
 
+        .. seealso: :py:meth:`.job_inventory`
+
         :rtype: :class:`list` of :class:`~.job.Job` objects"""
-        return self._recursively_find_jobs(self)
+        return list(self.job_inventory().values())
+
+    @property
+    def metrics(self):
+        """Composes a report on the jobs managed by this Jenkins instance
+
+        .. seealso: :py:meth:`.get_metrics`
+
+        :return: Dictionary containing metrics about the jobs
+        :rtype: :class:`dict`
+        """
+        return self.get_metrics()
+
+    def get_metrics(self, recursive=False):
+        """Composes a report on the jobs managed by this Jenkins instance
+
+        The state of all jobs is loaded in a single request. See
+        :func:`~.job.compile_job_metrics` for a description of the report.
+
+        :param bool recursive:
+            Indicates whether jobs contained within folders, and other
+            containers, should be included in the report
+        :return: Dictionary containing metrics about the jobs
+        :rtype: :class:`dict`
+        """
+        if recursive:
+            jobs = self.job_inventory(fields=METRICS_JOB_FIELDS).values()
+        else:
+            jobs = self.list_jobs(METRICS_JOB_FIELDS)
+        return compile_job_metrics(jobs)
+
+    @property
+    def _bulk_jobs(self):
+        """list of jobs affected by bulk operations on this Jenkins instance
+
+        Includes every job managed by this instance, recursively, except for
+        containers like folders. Operating on a container and the jobs
+        within it at the same time would produce conflicting results.
+
+        :rtype: :class:`list` of :class:`~.job.Job`
+        """
+        return [
+            cur_job for cur_job in self.all_jobs
+            if not isinstance(getattr(type(cur_job), "jobs", None), property)
+        ]
 
     def prepare_shutdown(self):
         """Starts a "quiet down" and prevents new builds from executing
@@ -217,6 +354,33 @@ class Jenkins(object):
         """
         self._api.post(self._api.url + 'quietDown')
 
+    def drain(self, timeout=None, progress=None):
+        """Prevents new builds from starting and waits for running ones to end
+
+        Starts a "quiet down", like :py:meth:`.prepare_shutdown`, then waits
+        until no builds are running on any node. All nodes are checked with a
+        single request each time. See
+        :meth:`~.fleet.NodeFleet.wait_for_idle` for details.
+
+        The quiet down remains in effect once this method returns, even if
+        builds were still running when the wait timed out. Use
+        :py:meth:`.cancel_shutdown` to allow builds to run again.
+
+        :param float timeout:
+            maximum number of seconds to wait for running builds to finish.
+            If not provided, waits indefinitely.
+        :param progress:
+            optional callable object which is passed the
+            :class:`~.fleet.FleetSnapshot` captured by each check, allowing
+            progress to be reported
+        :returns:
+            summary describing the outcome of the drain, including any builds
+            still running at the deadline
+        :rtype: :class:`~.fleet.DrainSummary`
+        """
+        self.prepare_shutdown()
+        return self.node_fleet.wait_for_idle(timeout, progress)
+
     def cancel_shutdown(self):
         """Cancels a previous scheduled shutdown sequence
 
@@ -364,6 +528,19 @@ class Jenkins(object):
         """
         return Queue(self._api.clone(self._api.url + 'queue'))
 
+    @property
+    def watch_service(self):
+        """service which watches many builds and queued builds at once
+
+        The same service is shared by all callers using this object, so
+        watches registered by any of them are refreshed together.
+
+        :rtype: :class:`~.watch.WatchService`
+        """
+        if self._watch_service is None:
+            self._watch_service = WatchService(self._api)
+        return self._watch_service
+
 
 if __name__ == '__main__':  # pragma: no cover
     pass
@@ -1,12 +1,56 @@
 """Primitives for interacting with Jenkins jobs"""
 import logging
+from collections import OrderedDict
+from datetime import datetime
 from six.moves import urllib_parse
-import requests
-from requests.exceptions import HTTPError
-from pyjen.build import Build
+from pyjen.build import Build, DEFAULT_BUILD_FIELDS
 from pyjen.queue_item import QueueItem
 from pyjen.utils.jobxml import JobXML
 from pyjen.utils.plugin_api import find_plugin, get_all_plugins
+from pyjen.utils.tree_query import compile_tree_query, \
+    compile_nested_tree_query
+from pyjen.utils.bulk import run_bulk, DEFAULT_MAX_WORKERS
+
+# Fields loaded for each job in a listing when the caller doesn't request
+# specific ones. Covers the most commonly used job properties, so they can be
+# queried without hitting the REST API again.
+DEFAULT_JOB_FIELDS = [
+    "name",
+    "color",
+    "lastBuild[number,url]",
+    "lastSuccessfulBuild[number,url]",
+    "lastFailedBuild[number,url]",
+    "lastCompletedBuild[number,url]",
+    "lastUnsuccessfulBuild[number,url]",
+    "healthReport[description,score]",
+]
+
+# Fields loaded for each job when composing reports summarizing the state of
+# many jobs. See :func:`compile_job_metrics`.
+METRICS_JOB_FIELDS = ["name", "color", "healthReport[description,score]"]
+
+# Fields stored for each build when synchronizing the build history of a job
+# with a local store. See :meth:`Job.sync_builds`.
+DEFAULT_SYNC_FIELDS = ["result", "timestamp", "duration"]
+
+# Number of builds loaded by each request when synchronizing build history
+DEFAULT_SYNC_PAGE_SIZE = 100
+
+# Number of builds loaded by each request when iterating over build history
+DEFAULT_BUILD_PAGE_SIZE = 50
+
+# Number of builds loaded by each request when searching for builds that
+# started within a time range
+DEFAULT_TIME_RANGE_PAGE_SIZE = 100
+
+# Number of builds, in addition to the ones being searched for, to include
+# when searching the recent builds of a job for builds started from specific
+# queue items. Accounts for other builds started in the meantime.
+DEFAULT_QUEUE_SEARCH_MARGIN = 50
+
+# Number of levels of nested jobs loaded by each request issued when
+# enumerating all jobs in a hierarchy of folders
+DEFAULT_INVENTORY_DEPTH = 4
 
 
 class Job(object):
@@ -20,6 +64,7 @@ class Job(object):
         super(Job, self).__init__()
         self._api = api
         self._xml_cache = None
+        self._build_index = None
         self._log = logging.getLogger(self.__module__)
 
     def __repr__(self):
@@ -42,6 +87,18 @@ class Job(object):
         """Hashing function, allowing object to be serialized and compared"""
         return hash(self._api.url)
 
+    def refresh(self):
+        """Reloads the cached state of this job from the REST API
+
+        Jobs created from the listings of parent objects, like
+        :py:attr:`pyjen.jenkins.Jenkins.jobs`, are pre-populated with the data
+        contained in those listings. That data is used until it goes stale,
+        or until this method is called.
+        """
+        self._xml_cache = None
+        self._build_index = None
+        self._api.refresh()
+
     # ---------------------------------------------- CONFIG XML BASED PROPERTIES
     @property
     def _job_xml(self):
@@ -123,7 +180,7 @@ class Job(object):
         :returns: The name of the job
         :rtype: :class:`str`
         """
-        data = self._api.get_api_data()
+        data = self._api.get_api_data(keys=["name"])
         return data['name']
 
     @property
@@ -133,7 +190,7 @@ class Job(object):
         :returns: True if the job is disabled, otherwise False
         :rtype: :class:`bool`
         """
-        data = self._api.get_api_data()
+        data = self._api.get_api_data(keys=["color"])
 
         return data['color'] == "disabled"
 
@@ -145,7 +202,7 @@ class Job(object):
             True if the latest build of the job is unsable, otherwise False
         :rtype: :class:`bool`
         """
-        data = self._api.get_api_data()
+        data = self._api.get_api_data(keys=["color"])
 
         return data['color'] == "yellow"
 
@@ -157,7 +214,7 @@ class Job(object):
             True if the latest build of the job is a failure, otherwise False
         :rtype: :class:`bool`
         """
-        data = self._api.get_api_data()
+        data = self._api.get_api_data(keys=["color"])
         return data['color'] == "red"
 
     @property
@@ -167,7 +224,7 @@ class Job(object):
         :returns: True if the job has been built at least once, otherwise false
         :rtype: :class:`bool`
         """
-        data = self._api.get_api_data()
+        data = self._api.get_api_data(keys=["color"])
 
         return data['color'] != "notbuilt"
 
@@ -180,16 +237,45 @@ class Job(object):
         synonymous with the short list provided on the main info
         page for the job on the dashboard.
 
+        .. seealso: :py:meth:`.list_builds`
+
         :returns: a list of the most recent builds for this job
         :rtype: :class:`list` of :class:`~.build.Build` objects
         """
-        data = self._api.get_api_data(query_params="depth=2")
+        return self.list_builds()
+
+    def list_builds(self, fields=None, start=None, end=None):
+        """Gets a list of the most recent builds for this job
+
+        Only the fields selected by the caller are loaded for each build. The
+        returned builds are pre-populated with that data, so it may be queried
+        without hitting the REST API again.
+
+        **Example:** ::
 
-        builds = data['builds']
+            builds = job.list_builds(["result", "duration"], end=5)
+
+        :param list fields:
+            list of fields to load for each build, using the field selector
+            syntax described by :func:`~.utils.tree_query.format_fields`.
+            If not provided, a default set of fields covering the most
+            commonly used build properties is loaded.
+        :param int start:
+            optional index of the first build to load, newest first
+        :param int end:
+            optional index one past the last build to load
+        :returns: a list of the most recent builds for this job
+        :rtype: :class:`list` of :class:`~.build.Build` objects
+        """
+        if fields is None:
+            fields = DEFAULT_BUILD_FIELDS
+        query = compile_tree_query(
+            "builds", fields, start, end, required=["number", "url"])
+        data = self._api.get_api_data(query_params=query)
 
         retval = list()
-        for cur_build in builds:
-            temp_build = Build(self._api.clone(cur_build['url']))
+        for cur_build in data['builds']:
+            temp_build = Build(self._api.clone(cur_build['url'], cur_build))
             retval.append(temp_build)
 
         return retval
@@ -201,17 +287,176 @@ class Job(object):
         :returns: all recorded builds for this job
         :rtype: :class:`list` of :class:`~.build.Build` objects
         """
-        data = self._api.get_api_data(query_params="tree=allBuilds[url]")
+        data = self._api.get_api_data(
+            query_params="tree=allBuilds[number,url]")
 
         builds = data['allBuilds']
 
         retval = list()
         for cur_build in builds:
-            temp_build = Build(self._api.clone(cur_build['url']))
+            temp_build = Build(self._api.clone(cur_build['url'], cur_build))
             retval.append(temp_build)
 
         return retval
 
+    def iter_builds(self, fields=None, page_size=DEFAULT_BUILD_PAGE_SIZE,
+                    start=0):
+        """Generates all builds of this job, newest first, one page at a time
+
+        Builds are loaded lazily, so only the pages actually consumed by the
+        caller are loaded from the REST API, and memory use is independent of
+        the size of the build history.
+
+        **Example:** ::
+
+            for cur_build in job.iter_builds(["result"]):
+                if cur_build.result == "FAILURE":
+                    break
+
+        :param list fields:
+            list of fields to load for each build, using the field selector
+            syntax described by :func:`~.utils.tree_query.format_fields`.
+            If not provided, a default set of fields covering the most
+            commonly used build properties is loaded.
+        :param int page_size: number of builds to load in each request
+        :param int start: index of the first build to generate
+        :rtype: :class:`~.build.Build` generator
+        """
+        if fields is None:
+            fields = DEFAULT_BUILD_FIELDS
+
+        index = start
+        while True:
+            page = self._load_build_page(fields, index, index + page_size)
+            for cur_build in page:
+                yield Build(self._api.clone(cur_build["url"], cur_build))
+            if len(page) < page_size:
+                return
+            index += page_size
+
+    def sync_builds(self, store, fields=None,
+                    page_size=DEFAULT_SYNC_PAGE_SIZE, check_deletions=False):
+        """Synchronizes the build history of this job with a local store
+
+        Only builds newer than those synchronized by previous calls are
+        loaded, newest first, one page at a time, so the cost of each
+        synchronization is proportional to the number of new builds rather
+        than the size of the build history. Compact records describing each
+        finished build are saved in the store. Builds which are still running
+        are picked up again by the next synchronization.
+
+        Records for builds rotated out by the job's log rotation policy are
+        removed from the store, which only requires loading the number of
+        the oldest build of the job. Builds deleted from the middle of the
+        build history are only detected when `check_deletions` is set.
+
+        .. seealso: :py:meth:`.stored_builds`
+
+        :param store: local store to synchronize the build history with
+        :type store: :class:`~.utils.build_store.BuildStore`
+        :param list fields:
+            list of fields to store for each build, using the field selector
+            syntax described by :func:`~.utils.tree_query.format_fields`.
+            The build number, URL and running state are always stored.
+        :param int page_size: number of builds to load in each request
+        :param bool check_deletions:
+            Indicates whether builds deleted from the middle of the build
+            history should be detected. This requires loading the number of
+            every build of the job, which is much cheaper than loading the
+            builds themselves but still proportional to the size of the build
+            history. Defaults to False, in which case only builds rotated out
+            of the history are detected.
+        :returns:
+            dictionary containing the sorted list of build numbers "added" to
+            and "removed" from the store, and the new "high_water_mark": the
+            number of the newest build for which the history has been fully
+            synchronized
+        :rtype: :class:`dict`
+        """
+        if fields is None:
+            fields = DEFAULT_SYNC_FIELDS
+        job_url = self._api.url
+        high_water_mark = store.get_high_water_mark(job_url)
+        known_numbers = store.get_build_numbers(job_url)
+
+        # Builds are listed newest first, so we load pages until we reach a
+        # build that has already been synchronized
+        new_records = list()
+        start = 0
+        while True:
+            query = compile_tree_query(
+                "allBuilds", fields, start, start + page_size,
+                required=["number", "url", "building"])
+            page = self._api.get_api_data(query_params=query)["allBuilds"]
+            done = len(page) < page_size
+            for cur_build in page:
+                if high_water_mark is not None and \
+                        cur_build["number"] <= high_water_mark:
+                    done = True
+                    break
+                new_records.append(cur_build)
+            if done:
+                break
+            start += page_size
+
+        if check_deletions:
+            data = self._api.get_api_data(
+                query_params="tree=allBuilds[number]")
+            remote_numbers = set(
+                cur_build["number"] for cur_build in data["allBuilds"])
+            removed = known_numbers - remote_numbers
+        else:
+            data = self._api.get_api_data(
+                query_params="tree=firstBuild[number]")
+            if data["firstBuild"] is None:
+                removed = set(known_numbers)
+            else:
+                oldest = data["firstBuild"]["number"]
+                removed = set(
+                    cur_number for cur_number in known_numbers
+                    if cur_number < oldest)
+
+        finished = [cur_build for cur_build in new_records
+                    if not cur_build["building"]]
+        running = [cur_build["number"] for cur_build in new_records
+                   if cur_build["building"]]
+        if running:
+            high_water_mark = min(running) - 1
+        elif new_records:
+            high_water_mark = max(
+                cur_build["number"] for cur_build in new_records)
+        elif high_water_mark is None:
+            high_water_mark = 0
+
+        store.delete_build_records(job_url, removed)
+        store.put_build_records(job_url, finished, high_water_mark)
+
+        return {
+            "added": sorted(
+                cur_build["number"] for cur_build in finished
+                if cur_build["number"] not in known_numbers),
+            "removed": sorted(removed),
+            "high_water_mark": high_water_mark,
+        }
+
+    def stored_builds(self, store):
+        """Gets the builds of this job saved in a local store
+
+        Each build is pre-populated with the data saved in the store.
+
+        .. seealso: :py:meth:`.sync_builds`
+
+        :param store: local store the build history was synchronized with
+        :type store: :class:`~.utils.build_store.BuildStore`
+        :returns: builds of this job, sorted from newest to oldest
+        :rtype: :class:`list` of :class:`~.build.Build` objects
+        """
+        retval = list()
+        for cur_record in store.get_build_records(self._api.url):
+            retval.append(
+                Build(self._api.clone(cur_record["url"], cur_record)))
+        return retval
+
     @property
     def last_good_build(self):
         """Gets the most recent successful build of this job
@@ -226,14 +471,14 @@ class Job(object):
             this method returns None
         :rtype: :class:`~.build.Build`
         """
-        data = self._api.get_api_data()
+        data = self._api.get_api_data(keys=["lastSuccessfulBuild"])
 
         lgb = data['lastSuccessfulBuild']
 
         if lgb is None:
             return None
 
-        return Build(self._api.clone(lgb['url']))
+        return Build(self._api.clone(lgb['url'], lgb))
 
     @property
     def last_build(self):
@@ -249,13 +494,13 @@ class Job(object):
             this method returns None
         :rtype: :class:`~.build.Build`
         """
-        data = self._api.get_api_data()
+        data = self._api.get_api_data(keys=["lastBuild"])
 
         if 'lastBuild' not in data or data['lastBuild'] is None:
             return None
         last_build = data['lastBuild']
 
-        return Build(self._api.clone(last_build['url']))
+        return Build(self._api.clone(last_build['url'], last_build))
 
     @property
     def last_failed_build(self):
@@ -269,14 +514,14 @@ class Job(object):
             builds in the build history, this method returns None
         :rtype: :class:`~.build.Build`
         """
-        data = self._api.get_api_data()
+        data = self._api.get_api_data(keys=["lastFailedBuild"])
 
         bld = data['lastFailedBuild']
 
         if bld is None:
             return None
 
-        return Build(self._api.clone(bld['url']))
+        return Build(self._api.clone(bld['url'], bld))
 
     @property
     def last_stable_build(self):
@@ -290,14 +535,14 @@ class Job(object):
             builds in the build history, this method returns None
         :rtype: :class:`~.build.Build`
         """
-        data = self._api.get_api_data()
+        data = self._api.get_api_data(keys=["lastCompletedBuild"])
 
         bld = data['lastCompletedBuild']
 
         if bld is None:
             return None
 
-        return Build(self._api.clone(bld['url']))
+        return Build(self._api.clone(bld['url'], bld))
 
     @property
     def last_unsuccessful_build(self):
@@ -311,18 +556,20 @@ class Job(object):
             builds in the build history, this method returns None
         :rtype: :class:`~.build.Build`
         """
-        data = self._api.get_api_data()
+        data = self._api.get_api_data(keys=["lastUnsuccessfulBuild"])
 
         bld = data['lastUnsuccessfulBuild']
 
         if bld is None:
             return None
 
-        return Build(self._api.clone(bld['url']))
+        return Build(self._api.clone(bld['url'], bld))
 
     def find_build_by_queue_id(self, queue_id):
         """Gets the build of this job which correlates to a specific queue item
 
+        .. seealso: :py:meth:`.find_builds_by_queue_ids`
+
         :param int queue_id:
             ID of the build queue item to correlate with. Typically extracted
             from the :meth:`pyjen.queue_item.QueueItem.id` property.
@@ -330,22 +577,45 @@ class Job(object):
             reference to the build associated with the specified queue id
             None if no such reference exsts
         """
-        data = {
-            "tree": "builds[url,queueId]",
-            "xpath": "//build[queueId={0}]".format(queue_id)
-        }
-        try:
-            root_node = self._api.get_api_xml(params=data)
-        except HTTPError as err:
-            if err.response.status_code == requests.codes.NOT_FOUND:
-                return None
-            raise
+        return self.find_builds_by_queue_ids([queue_id]).get(queue_id)
+
+    def find_builds_by_queue_ids(self, queue_ids):
+        """Gets the builds of this job which correlate to many queue items
 
-        node = root_node.find("url")
-        new_api = self._api.clone(node.text)
-        return Build(new_api)
+        The most recent builds of the job are searched first, using a single
+        request. The entire build history is only searched, using one more
+        request, if some of the queue items can't be found among them.
 
-        #tmp = "http://localhost/job/eoijeooivoif/api/xml?tree=builds%5Burl,queueId%5D&xpath=//build%5BqueueId=1166%5D"
+        :param list queue_ids:
+            IDs of the build queue items to correlate with. Typically
+            extracted from the :meth:`pyjen.queue_item.QueueItem.id` property.
+        :returns:
+            dictionary mapping each queue ID to its associated build. Queue
+            IDs which have no associated build are omitted.
+        :rtype: :class:`dict`
+        """
+        wanted = set(queue_ids)
+        required = ["number", "url", "queueId"]
+
+        # NOTE: the "builds" collection is capped at the 100 most recent
+        #       builds so we query "allBuilds" with an explicit range instead
+        query = compile_tree_query(
+            "allBuilds", list(), 0, len(wanted) + DEFAULT_QUEUE_SEARCH_MARGIN,
+            required=required)
+        builds = self._api.get_api_data(query_params=query)["allBuilds"]
+        found = dict((cur_build["queueId"], cur_build) for cur_build in builds
+                     if cur_build["queueId"] in wanted)
+
+        if len(found) < len(wanted):
+            query = compile_tree_query("allBuilds", list(), required=required)
+            data = self._api.get_api_data(query_params=query)
+            for cur_build in data["allBuilds"]:
+                if cur_build["queueId"] in wanted:
+                    found[cur_build["queueId"]] = cur_build
+
+        return dict(
+            (queue_id, Build(self._api.clone(cur_build["url"], cur_build)))
+            for queue_id, cur_build in found.items())
 
     def disable(self):
         """Disables this job
@@ -395,11 +665,13 @@ class Job(object):
             params = {"params": kwargs}
             res = self._api.post(self._api.url + "buildWithParameters", params)
 
-        return QueueItem(self._api.clone(res.headers["Location"]))
+        return QueueItem(self._api.clone(res.headers["Location"]), self)
 
     def get_build_by_number(self, build_number):
         """Gets a specific build of this job from the build history
 
+        .. seealso: :py:meth:`.get_builds_by_numbers`
+
         :param int build_number:
             Numeric identifier of the build to retrieve
             Value is typically non-negative
@@ -408,45 +680,170 @@ class Job(object):
             If such a build does not exist, returns None
         :rtype: :class:`~.build.Build`
         """
-        # Generate URL where the specified build "should" be
-        # TODO: Find some way to efficiently search through all builds to
-        #       locate the one with the correct number this would still
-        #       require 1 hit to the REST API but would be more robust than
-        #       trying to "guess" the correct URL endpoint
-        temp_url = self._api.url + str(build_number)
-        retval = Build(self._api.clone(temp_url))
-
-        # query the REST API to make sure the URL is correct and that it
-        # returns the correct build number
-        try:
-            assert retval.number == build_number
-        except:  # pylint: disable=broad-except,bare-except
-            return None
+        return self.get_builds_by_numbers([build_number])[0]
+
+    def get_builds_by_numbers(self, build_numbers):
+        """Gets several specific builds of this job from the build history
+
+        Builds are located using an index of the build numbers of this job,
+        which is loaded in a single request the first time it is needed.
+        Afterwards, the index is only updated with builds newer than those
+        it already contains, when a requested build can't be found in it.
+        Use :meth:`refresh` to rebuild the index, for example after deleting
+        builds.
+
+        :param list build_numbers:
+            Numeric identifiers of the builds to retrieve
+        :returns:
+            Build objects for each of the given numeric identifiers, in the
+            same order. Builds which do not exist are returned as None.
+        :rtype: :class:`list` of :class:`~.build.Build`
+        """
+        if self._build_index is None:
+            self._build_index = dict(
+                (cur_build["number"], cur_build["url"])
+                for cur_build in self._load_build_page(list(), None, None))
+        elif any(cur_number not in self._build_index
+                 for cur_number in build_numbers):
+            self._update_build_index()
 
+        retval = list()
+        for cur_number in build_numbers:
+            url = self._build_index.get(cur_number)
+            if url is None:
+                retval.append(None)
+                continue
+            retval.append(Build(self._api.clone(
+                url, {"number": cur_number, "url": url})))
         return retval
 
-    def get_builds_in_time_range(self, start_time, end_time):
+    def _update_build_index(self):
+        """Adds builds newer than those already indexed to the build index"""
+        newest = max(self._build_index) if self._build_index else None
+        index = 0
+        while True:
+            page = self._load_build_page(
+                list(), index, index + DEFAULT_BUILD_PAGE_SIZE)
+            for cur_build in page:
+                if newest is not None and cur_build["number"] <= newest:
+                    return
+                self._build_index[cur_build["number"]] = cur_build["url"]
+            if len(page) < DEFAULT_BUILD_PAGE_SIZE:
+                return
+            index += DEFAULT_BUILD_PAGE_SIZE
+
+    def get_builds_in_time_range(self, start_time, end_time,
+                                 page_size=DEFAULT_TIME_RANGE_PAGE_SIZE):
         """ Returns a list of all of the builds for a job that
             occurred between the specified start and end times
 
+            .. seealso: :py:meth:`.iter_builds_in_time_range`
+
             :param datetime start_time:
                 starting time index for range of builds to find
             :param datetime end_time:
                 ending time index for range of builds to find
+            :param int page_size:
+                number of builds to load in each request
             :returns: a list of 0 or more builds
             :rtype: :class:`list` of :class:`~.build.Build` objects
         """
+        return list(self.iter_builds_in_time_range(
+            start_time, end_time, page_size))
+
+    def iter_builds_in_time_range(self, start_time, end_time,
+                                  page_size=DEFAULT_TIME_RANGE_PAGE_SIZE):
+        """Generates the builds of this job that started in a time range
+
+        Builds are loaded newest first, one page at a time, and loading stops
+        as soon as a build older than the time range is found. When the time
+        range lies deep in the build history, the first build within it is
+        located by bisecting the build history using single-build queries,
+        so the builds in between never need to be loaded.
+
+        Builds are assumed to have started in the same order as their build
+        numbers.
+
+        :param datetime start_time:
+            starting time index for range of builds to find
+        :param datetime end_time:
+            ending time index for range of builds to find
+        :param int page_size:
+            number of builds to load in each request
+        :returns:
+            builds within the time range, newest first, pre-populated with
+            their most commonly used properties
+        :rtype: :class:`~.build.Build` generator
+        """
         if start_time > end_time:
             end_time, start_time = start_time, end_time
 
-        builds = list()
+        index = 0
+        page = self._load_build_page(DEFAULT_BUILD_FIELDS, 0, page_size)
+        if len(page) == page_size and \
+                _build_start_time(page[-1]) > end_time:
+            index = self._bisect_builds(end_time, page_size - 1)
+            page = self._load_build_page(
+                DEFAULT_BUILD_FIELDS, index, index + page_size)
+
+        while True:
+            for cur_build in page:
+                build_time = _build_start_time(cur_build)
+                if build_time < start_time:
+                    return
+                if build_time <= end_time:
+                    yield Build(self._api.clone(cur_build["url"], cur_build))
+            if len(page) < page_size:
+                return
+            index += page_size
+            page = self._load_build_page(
+                DEFAULT_BUILD_FIELDS, index, index + page_size)
+
+    def _load_build_page(self, fields, start, end):
+        """Loads a range of builds from the build history of this job
+
+        :param list fields: fields to load for each build
+        :param int start: index of the first build to load
+        :param int end: index one past the last build to load
+        :returns: data describing each build, newest first
+        :rtype: :class:`list` of :class:`dict`
+        """
+        query = compile_tree_query(
+            "allBuilds", fields, start, end, required=["number", "url"])
+        return self._api.get_api_data(query_params=query)["allBuilds"]
 
-        for run in self.all_builds:
-            if run.start_time < start_time:
-                break
-            elif end_time >= run.start_time >= start_time:
-                builds.append(run)
-        return builds
+    def _bisect_builds(self, end_time, newer_index):
+        """Finds the index of the newest build started no later than a time
+
+        :param datetime end_time: time to search for
+        :param int newer_index:
+            index of a build known to have started after the given time
+        :returns:
+            index of the newest build which started no later than the given
+            time, or the length of the build history if there is none
+        :rtype: :class:`int`
+        """
+        def started_after(index):
+            page = self._load_build_page(["timestamp"], index, index + 1)
+            return bool(page) and _build_start_time(page[0]) > end_time
+
+        # Gallop through the history, doubling the step size each time, to
+        # find an upper bound, then bisect between the last two probes
+        lower = newer_index
+        step = 1
+        upper = lower + step
+        while started_after(upper):
+            lower = upper
+            step *= 2
+            upper = lower + step
+
+        while upper - lower > 1:
+            middle = (lower + upper) // 2
+            if started_after(middle):
+                lower = middle
+            else:
+                upper = middle
+        return upper
 
     @property
     def build_health(self):
@@ -458,7 +855,7 @@ class Job(object):
         :return: percentage of good builds on record for this job
         :rtype: :class:`int`
         """
-        data = self._api.get_api_data()
+        data = self._api.get_api_data(keys=["healthReport"])
 
         health_report = data['healthReport']
 
@@ -551,11 +948,6 @@ class Job(object):
             PyJen view object wrapping the REST API for the given Jenkins view
         :rtype: :class:`~.view.View`
         """
-        # TODO: Find some way to cache the json data given inside the view so
-        #       we can lazy-load API data. For example, the name of the view
-        #       is always included in the json data and therefore queries for
-        #       the View name after creation should not require another hit
-        #       to the REST API
         log = logging.getLogger(__name__)
 
         job_url = json_data["url"]
@@ -571,19 +963,187 @@ class Job(object):
         #               debugging purposes however, we log some debug output
         #               if we ever hit this case so we can investigate the
         #               the details further.
+        #
+        #               Partial data, like the summaries of related jobs
+        #               loaded with a narrow tree query, may also lack the
+        #               attribute. In that case we load it from the job itself.
         plugin_class = None
-        if "_class" in json_data:
-            plugin_class = find_plugin(json_data["_class"])
+        job_class = json_data.get("_class")
+        if job_class is None:
+            job_class = rest_api.clone(job_url).get_api_data(
+                query_params="tree=_class").get("_class")
+        if job_class is not None:
+            plugin_class = find_plugin(job_class)
         else:  # pragma: no cover
             log.debug("Unsupported Jenkins version detected. Jobs are "
                       "expected to have a _class metadata attribute but this "
                       "one does not: %s", json_data)
 
         if not plugin_class:
-            log.debug("Unable to find plugin for class %s", json_data["_class"])
+            log.debug("Unable to find plugin for class %s", job_class)
             plugin_class = Job
 
-        return plugin_class(rest_api.clone(job_url))
+        # Hydrate the new job with the data we were given so properties
+        # contained therein can be queried without hitting the REST API again
+        return plugin_class(rest_api.clone(job_url, json_data))
+
+    @staticmethod
+    def instantiate_list(rest_api, fields=None, start=None, end=None):
+        """Factory method which instantiates all jobs contained in an object
+
+        Loads the list of jobs managed by an arbitrary Jenkins object, like
+        the dashboard, a view or a folder, in a single query and generates a
+        PyJen job object for each one, pre-populated with the selected data.
+
+        :param rest_api:
+            PyJen REST API for the parent object which contains the jobs
+        :param list fields:
+            list of fields to load for each job, using the field selector
+            syntax described by :func:`~.utils.tree_query.format_fields`.
+            If not provided, a default set of fields covering the most
+            commonly used job properties is loaded.
+        :param int start:
+            optional index of the first job to load
+        :param int end:
+            optional index one past the last job to load
+        :rtype: :class:`list` of :class:`~.job.Job`
+        """
+        if fields is None:
+            fields = DEFAULT_JOB_FIELDS
+        query = compile_tree_query("jobs", fields, start, end)
+        data = rest_api.get_api_data(query_params=query)
+
+        retval = list()
+        for cur_job in data['jobs']:
+            retval.append(Job.instantiate(cur_job, rest_api))
+        return retval
+
+    @staticmethod
+    def load_inventory_data(rest_api, depth=DEFAULT_INVENTORY_DEPTH,
+                            fields=None, max_workers=DEFAULT_MAX_WORKERS):
+        """Loads the REST API data describing all jobs in an object, recursively
+
+        Jobs nested within containers, like folders and multibranch
+        pipelines, are loaded `depth` levels at a time using a single nested
+        query. Any containers found at the bottom of the loaded hierarchy are
+        then expanded in parallel, breadth first, until the entire hierarchy
+        has been loaded. Jobs of types not supported by any PyJen plugin
+        found at the bottom of the loaded hierarchy may be containers too,
+        so they are expanded the same way.
+
+        :param rest_api:
+            PyJen REST API for the parent object which contains the jobs
+        :param int depth:
+            number of levels of nested jobs to load in each request
+        :param list fields:
+            list of fields to load for each job, using the field selector
+            syntax described by :func:`~.utils.tree_query.format_fields`.
+            If not provided only the job names are loaded.
+        :param int max_workers:
+            maximum number of requests which may be in flight at one time when
+            expanding deeply nested containers
+        :returns:
+            data describing all jobs contained in the parent object, indexed
+            by the path to each job relative to the parent, as in
+            "folder/subfolder/job". Containers precede the jobs they contain.
+            The data describing containers omits the jobs they contain.
+        :rtype: :class:`collections.OrderedDict`
+        """
+        if fields is None:
+            fields = ["name"]
+        if "name" not in fields:
+            fields = ["name"] + list(fields)
+        query = compile_nested_tree_query("jobs", fields, depth)
+
+        log = logging.getLogger(__name__)
+
+        def load_jobs(api):
+            # Jobs which turn out not to be containers have no "jobs"
+            return api.get_api_data(query_params=query).get("jobs", list())
+
+        def find_unexpanded(jobs, level=1):
+            retval = list()
+            for cur_job in jobs:
+                if "jobs" in cur_job:
+                    retval.extend(find_unexpanded(cur_job["jobs"], level + 1))
+                    continue
+                plugin_class = find_plugin(cur_job.get("_class", ""))
+                if isinstance(getattr(plugin_class, "jobs", None), property):
+                    retval.append(cur_job)
+                elif plugin_class is None and level == depth:
+                    # Containers nested within the loaded hierarchy include
+                    # the jobs they contain, but at the bottom of it we can't
+                    # tell containers of unsupported types from other jobs
+                    log.debug("Expanding job of unsupported type %s: %s",
+                              cur_job.get("_class"), cur_job["url"])
+                    retval.append(cur_job)
+            return retval
+
+        # Children of containers loaded by follow-up requests, indexed by the
+        # URL of the container. The data returned by the REST API may be
+        # shared with other callers so we avoid modifying it in place.
+        expanded = dict()
+
+        root = load_jobs(rest_api)
+        frontier = find_unexpanded(root)
+        while frontier:
+            results = run_bulk(
+                lambda cur_job: load_jobs(rest_api.clone(cur_job["url"])),
+                frontier,
+                max_workers)
+            if results.failed:
+                raise results.failed[0][1]
+
+            frontier = list()
+            for cur_job, children in results.succeeded:
+                expanded[cur_job["url"]] = children
+                frontier.extend(find_unexpanded(children))
+
+        retval = OrderedDict()
+
+        def flatten(jobs, prefix):
+            for cur_job in jobs:
+                path = prefix + cur_job["name"]
+                children = cur_job.get("jobs", expanded.get(cur_job["url"]))
+                job_data = dict(
+                    (key, value) for key, value in cur_job.items()
+                    if key != "jobs")
+                retval[path] = job_data
+                if children:
+                    flatten(children, path + "/")
+
+        flatten(root, "")
+        return retval
+
+    @staticmethod
+    def instantiate_inventory(rest_api, depth=DEFAULT_INVENTORY_DEPTH,
+                              fields=None, max_workers=DEFAULT_MAX_WORKERS):
+        """Factory method which instantiates all jobs in an object, recursively
+
+        See :meth:`load_inventory_data` for details on how the jobs are
+        loaded.
+
+        :param rest_api:
+            PyJen REST API for the parent object which contains the jobs
+        :param int depth:
+            number of levels of nested jobs to load in each request
+        :param list fields:
+            list of fields to load for each job, using the field selector
+            syntax described by :func:`~.utils.tree_query.format_fields`.
+            If not provided only the job names are loaded.
+        :param int max_workers:
+            maximum number of requests which may be in flight at one time when
+            expanding deeply nested containers
+        :returns:
+            all jobs contained in the parent object, indexed by the path to
+            each job relative to the parent, as in "folder/subfolder/job".
+            Containers precede the jobs they contain.
+        :rtype: :class:`collections.OrderedDict`
+        """
+        data = Job.load_inventory_data(rest_api, depth, fields, max_workers)
+        return OrderedDict(
+            (path, Job.instantiate(job_data, rest_api))
+            for path, job_data in data.items())
 
     @classmethod
     def get_supported_plugins(cls):
@@ -602,5 +1162,63 @@ class Job(object):
         return JobXML
 
 
+def _build_start_time(data):
+    """Extracts the start time of a build from its REST API data
+
+    :param dict data: REST API data describing a build
+    :rtype: :class:`datetime.datetime`
+    """
+    return datetime.fromtimestamp(data["timestamp"] * 0.001)
+
+
+def compile_job_metrics(jobs):
+    """Composes a report summarizing the state of a set of jobs
+
+    The jobs are expected to be pre-populated with the fields listed in
+    :data:`METRICS_JOB_FIELDS`, as done by
+    :meth:`~.job.Job.instantiate_list`, so the report can be composed without
+    querying the REST API again. Containers, like folders, are ignored, as
+    are duplicate references to the same job.
+
+    :param list jobs: list of :class:`~.job.Job` objects to summarize
+    :returns: Dictionary containing metrics about the jobs
+    :rtype: :class:`dict`
+    """
+    broken_jobs = []
+    disabled_jobs = []
+    unstable_jobs = []
+    health_scores = []
+    found = set()
+
+    for cur_job in jobs:
+        if isinstance(getattr(type(cur_job), "jobs", None), property):
+            continue
+        if repr(cur_job) in found:
+            continue
+        found.add(repr(cur_job))
+
+        if cur_job.is_failing:
+            broken_jobs.append(cur_job)
+        elif cur_job.is_disabled:
+            disabled_jobs.append(cur_job)
+        elif cur_job.is_unstable:
+            unstable_jobs.append(cur_job)
+
+        health_scores.append(cur_job.build_health)
+
+    average_health = None
+    if health_scores:
+        average_health = sum(health_scores) / float(len(health_scores))
+
+    return {"jobs_count": len(found),
+            "broken_jobs_count": len(broken_jobs),
+            "disabled_jobs_count": len(disabled_jobs),
+            "unstable_jobs_count": len(unstable_jobs),
+            "broken_jobs": broken_jobs,
+            "unstable_jobs": unstable_jobs,
+            "disabled_jobs": disabled_jobs,
+            "average_build_health": average_health}
+
+
 if __name__ == "__main__":  # pragma: no cover
     pass
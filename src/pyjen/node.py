@@ -25,7 +25,7 @@ class Node(object):
 
         :rtype: :class:`str`
         """
-        data = self._api.get_api_data()
+        data = self._api.get_api_data(keys=["displayName"])
 
         return data['displayName']
 
@@ -35,7 +35,7 @@ class Node(object):
 
         :rtype: :class:`bool`
         """
-        data = self._api.get_api_data()
+        data = self._api.get_api_data(keys=["offline"])
 
         return data['offline']
 
@@ -45,7 +45,7 @@ class Node(object):
 
         :rtype: :class:`bool`
         """
-        data = self._api.get_api_data()
+        data = self._api.get_api_data(keys=["idle"])
         return data['idle']
     
     @property
@@ -54,9 +54,44 @@ class Node(object):
         
         :rtype: :class:`int`
         """
-        data = self._api.get_api_data()
+        data = self._api.get_api_data(keys=["numExecutors"])
         return data['numExecutors']
 
+    @property
+    def busy_executors(self):
+        """Returns the number of executors of this node currently running builds
+
+        :rtype: :class:`int`
+        """
+        executors = self._api.get_api_data(keys=["executors"])['executors']
+        if not all('idle' in cur_executor for cur_executor in executors):
+            # The state of each executor is only reported when explicitly
+            # requested
+            data = self._api.get_api_data(query_params="tree=executors[idle]")
+            executors = data['executors']
+        return len([cur_executor for cur_executor in executors
+                    if not cur_executor['idle']])
+
+    @property
+    def labels(self):
+        """Gets the labels assigned to this node
+
+        Every node also carries a label matching its own name.
+
+        :rtype: :class:`list` of :class:`str`
+        """
+        data = self._api.get_api_data(keys=["assignedLabels"])
+        return [cur_label['name'] for cur_label in data['assignedLabels']]
+
+    def refresh(self):
+        """Reloads the cached state of this node from the REST API
+
+        Nodes created from listings, like :py:attr:`~.jenkins.Jenkins.nodes`,
+        are pre-populated with the data contained in those listings. That data
+        is used until it goes stale, or until this method is called.
+        """
+        self._api.refresh()
+
     def toggle_offline(self, message=None):
         """Toggles the online status of this Node
 
@@ -88,8 +123,10 @@ class Node(object):
         polling_period_in_seconds = 1
 
         total_wait_time = 0
+        self.refresh()
         while not self.is_idle:
             time.sleep(polling_period_in_seconds)
+            self.refresh()
             if max_timeout is None:
                 continue
 
@@ -1,8 +1,6 @@
 """Interface for interacting with Jenkins plugins"""
 import os
-import requests
 import json
-from tqdm import tqdm
 
 
 class Plugin(object):
@@ -104,6 +102,11 @@ class Plugin(object):
         if not os.path.exists(output_folder):
             os.makedirs(output_folder)
 
+        # These dependencies are only needed for downloads, so we defer
+        # importing them to keep the PyJen library fast to import
+        import requests
+        from tqdm import tqdm
+
         # Stream the download of the plugin installer from the online Jenkins
         # plugin database
         response = requests.get(self.download_url, stream=True, verify=False)
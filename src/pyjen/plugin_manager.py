@@ -1,5 +1,16 @@
 """Interfaces for managing plugins for a particular Jenkins instance"""
 from pyjen.plugin import Plugin
+from pyjen.utils.tree_query import compile_tree_query
+
+# Fields loaded for each plugin when the caller doesn't request specific ones.
+# Covers all of the properties exposed by the Plugin class.
+DEFAULT_PLUGIN_FIELDS = [
+    "longName",
+    "version",
+    "enabled",
+    "url",
+    "dependencies[shortName,version,optional]",
+]
 
 
 class PluginManager(object):
@@ -22,7 +33,27 @@ class PluginManager(object):
 
         :returns: list of 0 or more plugins installed on the Jenkins instance
         :rtype: List of 0 or more :class:`~.plugin.Plugin` objects"""
-        res = self._api.get_api_data(query_params='depth=2')
+        return self.list_plugins()
+
+    def list_plugins(self, fields=None):
+        """list of installed plugins, with selected fields
+
+        Only the fields selected by the caller are loaded for each plugin.
+        Properties of the returned plugins which depend on fields that were
+        not loaded will raise a :class:`KeyError`.
+
+        :param list fields:
+            list of fields to load for each plugin, using the field selector
+            syntax described by :func:`~.utils.tree_query.format_fields`.
+            If not provided, all fields used by the
+            :class:`~.plugin.Plugin` class are loaded.
+        :returns: list of 0 or more plugins installed on the Jenkins instance
+        :rtype: List of 0 or more :class:`~.plugin.Plugin` objects"""
+        if fields is None:
+            fields = DEFAULT_PLUGIN_FIELDS
+        query = compile_tree_query(
+            "plugins", fields, required=["shortName"])
+        res = self._api.get_api_data(query_params=query)
 
         retval = []
 
@@ -1,23 +1,67 @@
 """Primitives that manage Jenkins job of type 'Folder'"""
-from pyjen.job import Job
+from pyjen.job import Job, DEFAULT_INVENTORY_DEPTH
 from pyjen.utils.helpers import create_job
+from pyjen.utils.bulk import BulkJobOperations, DEFAULT_MAX_WORKERS
 
 
-class FolderJob(Job):
+class FolderJob(Job, BulkJobOperations):
     """Jenkins job of type 'folder'"""
     @property
     def jobs(self):
         """Gets a list of all jobs contained in this folder
 
+        .. seealso: :py:meth:`.list_jobs`
+
         :rtype: :class:`list` of :class:`~.job.Job`
         """
-        data = self._api.get_api_data()
+        return self.list_jobs()
+
+    def list_jobs(self, fields=None, start=None, end=None):
+        """Gets jobs contained in this folder, with selected fields
+
+        :param list fields:
+            list of fields to load for each job, using the field selector
+            syntax described by :func:`~.utils.tree_query.format_fields`.
+            If not provided, a default set of fields covering the most
+            commonly used job properties is loaded.
+        :param int start:
+            optional index of the first job to load
+        :param int end:
+            optional index one past the last job to load
+        :rtype: :class:`list` of :class:`~.job.Job`
+        """
+        return Job.instantiate_list(self._api, fields, start, end)
+
+    def job_inventory(self, depth=DEFAULT_INVENTORY_DEPTH, fields=None,
+                      max_workers=DEFAULT_MAX_WORKERS):
+        """Gets all jobs contained in this folder, recursively, indexed by path
+
+        See :meth:`~.job.Job.instantiate_inventory` for details.
+
+        :param int depth:
+            number of levels of nested jobs to load in each request
+        :param list fields:
+            list of fields to load for each job, using the field selector
+            syntax described by :func:`~.utils.tree_query.format_fields`.
+            If not provided only the job names are loaded.
+        :param int max_workers:
+            maximum number of requests which may be in flight at one time when
+            expanding deeply nested containers
+        :returns:
+            all jobs contained in this folder, indexed by the path to each
+            job relative to this folder, as in "subfolder/job"
+        :rtype: :class:`collections.OrderedDict`
+        """
+        return Job.instantiate_inventory(
+            self._api, depth, fields, max_workers)
 
-        retval = list()
-        for tjob in data['jobs']:
-            retval.append(Job.instantiate(tjob, self._api))
+    @property
+    def _bulk_jobs(self):
+        """list of jobs affected by bulk operations on this folder
 
-        return retval
+        :rtype: :class:`list` of :class:`~.job.Job`
+        """
+        return self.list_jobs(["name"])
 
     def create_job(self, job_name, job_class):
         """Creates a new job on the Jenkins dashboard
@@ -61,6 +61,23 @@ class FreestyleJob(Job):
         self._job_xml.update()
 
     # ---------------------------------------------------- JSON BASED PROPERTIES
+    def _get_projects(self, key):
+        """Loads the data describing the jobs this job is related to
+
+        Data this job was hydrated with is only used if it describes each
+        related job well enough to instantiate it. Otherwise the data is
+        reloaded from the REST API.
+
+        :param str key:
+            name of the attribute listing the related jobs, like
+            "upstreamProjects"
+        :rtype: :class:`list` of :class:`dict`
+        """
+        projects = self._api.get_api_data(keys=[key])[key]
+        if all("_class" in cur_project for cur_project in projects):
+            return projects
+        return self._api.get_api_data()[key]
+
     @property
     def upstream_jobs(self):
         """Gets the list of upstream dependencies for this job
@@ -68,13 +85,9 @@ class FreestyleJob(Job):
         :returns: A list of 0 or more jobs that this job depends on
         :rtype: :class:`list` of :class:`~.job.Job` objects
         """
-        data = self._api.get_api_data()
-
-        jobs = data['upstreamProjects']
-
         retval = list()
 
-        for j in jobs:
+        for j in self._get_projects("upstreamProjects"):
             retval.append(Job.instantiate(j, self._api))
 
         return retval
@@ -86,14 +99,15 @@ class FreestyleJob(Job):
         Includes jobs that trigger this job, and all jobs trigger those
         jobs, recursively for all upstream dependencies
 
+        Each job is only visited once, even when shared by several of the
+        dependencies, or when jobs depend on each other cyclically. To
+        analyze the dependencies of many jobs, use
+        :meth:`~.jenkins.Jenkins.dependency_graph` instead.
+
         :returns: A list of 0 or more jobs this job depend on
         :rtype:  :class:`list` of :class:`~.job.Job` objects
         """
-
-        retval = self.upstream_jobs
-        for cur_job in retval:
-            retval.extend(cur_job.all_upstream_jobs)
-        return retval
+        return _walk_dependencies(self, "upstream_jobs")
 
     @property
     def downstream_jobs(self):
@@ -102,13 +116,9 @@ class FreestyleJob(Job):
         :returns: A list of 0 or more jobs which depend on this one
         :rtype:  :class:`list` of :class:`~.job.Job` objects
         """
-        data = self._api.get_api_data()
-
-        jobs = data['downstreamProjects']
-
         retval = list()
 
-        for j in jobs:
+        for j in self._get_projects("downstreamProjects"):
             retval.append(Job.instantiate(j, self._api))
 
         return retval
@@ -120,14 +130,15 @@ class FreestyleJob(Job):
         Includes jobs triggered by this job, and all jobs triggered by those
         jobs, recursively for all downstream dependencies
 
+        Each job is only visited once, even when shared by several of the
+        dependents, or when jobs depend on each other cyclically. To analyze
+        the dependencies of many jobs, use
+        :meth:`~.jenkins.Jenkins.dependency_graph` instead.
+
         :returns: A list of 0 or more jobs which depend on this one
         :rtype:  :class:`list` of :class:`~.job.Job` objects
         """
-        retval = self.downstream_jobs
-        for cur_job in retval:
-            retval.extend(cur_job.all_downstream_jobs)
-
-        return retval
+        return _walk_dependencies(self, "downstream_jobs")
 
     # --------------------------------------------------------------- PLUGIN API
     @property
@@ -271,6 +282,37 @@ class FreestyleXML(JobXML):
         builder.parent = self
 
 
+def _walk_dependencies(job, direction):
+    """Finds all jobs reachable from a job by following its dependencies
+
+    :param job: the job to start from
+    :type job: :class:`~.job.Job`
+    :param str direction:
+        name of the property listing the direct dependencies of a job in the
+        direction to follow, like "upstream_jobs". Jobs which don't provide
+        the property are treated as having no dependencies.
+    :returns: the jobs found, in breadth first order
+    :rtype: :class:`list` of :class:`~.job.Job`
+    """
+    retval = list()
+    visited = set([repr(job)])
+    frontier = [job]
+    while frontier:
+        next_frontier = list()
+        for cur_job in frontier:
+            if not isinstance(getattr(type(cur_job), direction, None),
+                              property):
+                continue
+            for dependency in getattr(cur_job, direction):
+                if repr(dependency) in visited:
+                    continue
+                visited.add(repr(dependency))
+                retval.append(dependency)
+                next_frontier.append(dependency)
+        frontier = next_frontier
+    return retval
+
+
 PluginClass = FreestyleJob
 
 
@@ -9,15 +9,27 @@ class MultibranchPipelineJob(Job):
     def jobs(self):
         """Gets all branch jobs managed by this multibranch pipeline
 
+        .. seealso: :py:meth:`.list_jobs`
+
         :rtype: :class:`list` of :class:`~.pipelinejob.PipelineJob`
         """
-        data = self._api.get_api_data(query_params="depth=2")
+        return self.list_jobs()
 
-        retval = list()
-        for j in data["jobs"]:
-            retval.append(Job.instantiate(j, self._api))
+    def list_jobs(self, fields=None, start=None, end=None):
+        """Gets branch jobs managed by this multibranch pipeline
 
-        return retval
+        :param list fields:
+            list of fields to load for each job, using the field selector
+            syntax described by :func:`~.utils.tree_query.format_fields`.
+            If not provided, a default set of fields covering the most
+            commonly used job properties is loaded.
+        :param int start:
+            optional index of the first job to load
+        :param int end:
+            optional index one past the last job to load
+        :rtype: :class:`list` of :class:`~.pipelinejob.PipelineJob`
+        """
+        return Job.instantiate_list(self._api, fields, start, end)
 
     # --------------------------------------------------------------- PLUGIN API
     @staticmethod
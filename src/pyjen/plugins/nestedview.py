@@ -1,6 +1,11 @@
 """Primitives for working with Jenkins views of type 'NestedView'"""
+from collections import OrderedDict
 from pyjen.view import View
+from pyjen.job import Job, METRICS_JOB_FIELDS, DEFAULT_INVENTORY_DEPTH
+from pyjen.utils.bulk import run_bulk
 from pyjen.utils.helpers import create_view
+from pyjen.utils.plugin_api import find_plugin
+from pyjen.utils.tree_query import compile_nested_tree_query
 
 
 class NestedView(View):
@@ -93,6 +98,63 @@ class NestedView(View):
 
         return retval
 
+    def _metrics_jobs(self, recursive):
+        """Loads the jobs summarized by the metrics for this view
+
+        The jobs contained in all sub-views are loaded in a single request.
+        When recursing, that same request also loads several levels of
+        nested sub-views. Only sub-views nested deeper than that, and the
+        containers found in any of the sub-views, are then loaded by follow
+        up requests. Containers, like folders, are not themselves included
+        in the metrics; only the jobs they contain are.
+
+        :param bool recursive:
+            Indicates whether jobs contained within nested views and folders
+            should be included
+        :rtype: :class:`list` of :class:`~.job.Job`
+        """
+        depth = DEFAULT_INVENTORY_DEPTH if recursive else 1
+        query = compile_nested_tree_query(
+            "views", [{"jobs": METRICS_JOB_FIELDS}], depth)
+        data = self._api.get_api_data(query_params=query)
+
+        retval = list()
+        containers = OrderedDict()
+        unexpanded_views = list()
+
+        def collect(views):
+            for cur_view in views:
+                if "views" in cur_view:
+                    collect(cur_view["views"])
+                elif recursive and find_plugin(
+                        cur_view.get("_class", "")) is NestedView:
+                    unexpanded_views.append(cur_view)
+
+                for cur_job in cur_view.get("jobs", list()):
+                    cur_job = Job.instantiate(cur_job, self._api)
+                    retval.append(cur_job)
+                    if recursive and isinstance(
+                            getattr(type(cur_job), "jobs", None), property):
+                        containers[repr(cur_job)] = cur_job
+
+        collect(data["views"])
+
+        def expand(item):
+            if isinstance(item, Job):
+                return Job.instantiate_inventory(
+                    self._api.clone(repr(item)),
+                    fields=METRICS_JOB_FIELDS).values()
+            # pylint: disable=protected-access
+            return View.instantiate(item, self._api)._metrics_jobs(True)
+
+        results = run_bulk(
+            expand, list(containers.values()) + unexpanded_views)
+        if results.failed:
+            raise results.failed[0][1]
+        for _, cur_jobs in results.succeeded:
+            retval.extend(cur_jobs)
+        return retval
+
     def create_view(self, view_name, view_class):
         """Creates a new sub-view within this nested view
 
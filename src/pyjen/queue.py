@@ -1,4 +1,10 @@
-from pyjen.queue_item import QueueItem
+"""Primitives for interacting with the Jenkins build queue"""
+import time
+from collections import OrderedDict
+from pyjen.queue_item import QueueItem, QUEUE_ITEM_FIELDS, _instantiate_task, \
+    _parse_label
+from pyjen.utils.plugin_api import find_plugin
+from pyjen.utils.tree_query import compile_tree_query
 
 
 class Queue(object):
@@ -23,17 +29,187 @@ class Queue(object):
         assert retval["_class"] == "hudson.model.Queue"
         return retval
 
+    def _instantiate_items(self, items):
+        """Creates queue items pre-populated with the data from a listing
+
+        The job each queued build belongs to is also instantiated from the
+        listing, so it remains available without querying the REST API even
+        once the rest of the data goes stale. Tasks which aren't supported by
+        any PyJen plugin, like the placeholders pipeline steps queue while
+        waiting for an executor, are left for the queue items to resolve on
+        demand instead.
+
+        :param list items: REST API data describing each queued build
+        :rtype: :class:`list` of :class:`~.queue_item.QueueItem`
+        """
+        retval = list()
+        for cur_item in items:
+            queue_api = self._api.clone(
+                self._api.root_url + cur_item["url"], cur_item)
+            task = cur_item.get("task")
+            job = None
+            if task is not None and "url" in task and \
+                    find_plugin(task.get("_class", "")) is not None:
+                job = _instantiate_task(self._api, task)
+            retval.append(QueueItem(queue_api, job))
+        return retval
+
     @property
     def items(self):
         """Gets a list of scheduled builds waiting in the queue
 
         :rtype: :class:`list` of :class:`QueueItem`
         """
-        retval = list()
-        for cur_item in self._data["items"]:
-            queue_api = self._api.clone(self._api.root_url + cur_item["url"])
-            retval.append(QueueItem(queue_api))
-        return retval
+        return self._instantiate_items(self._data["items"])
+
+    def snapshot(self):
+        """Captures the state of the entire build queue with a single request
+
+        The queue items in the snapshot are pre-populated with the data
+        loaded by the request, so their descriptive properties like
+        :py:attr:`~.queue_item.QueueItem.reason` and
+        :py:attr:`~.queue_item.QueueItem.job` can be read without querying
+        the REST API again.
+
+        :rtype: :class:`QueueSnapshot`
+        """
+        query = compile_tree_query("items", QUEUE_ITEM_FIELDS)
+        data = self._api.get_api_data(query_params=query)
+        return QueueSnapshot(
+            self._instantiate_items(data["items"]), data["items"])
+
+
+class QueueSnapshot(object):
+    """State of the build queue at a point in time, with aggregations
+
+    All aggregations are computed from the data captured when the snapshot
+    was taken, so they never query the REST API and remain consistent with
+    each other no matter how old the snapshot gets.
+
+    Instances of this class are typically obtained from
+    :meth:`Queue.snapshot`.
+
+    **Example:** ::
+
+        snapshot = jk.build_queue.snapshot()
+        for label, items in snapshot.by_label.items():
+            print("{0}: {1} builds waiting".format(label, len(items)))
+
+    :param list items:
+        queued builds, pre-populated with the data describing them
+    :param list data: REST API data describing each queued build
+    """
+
+    def __init__(self, items, data):
+        super(QueueSnapshot, self).__init__()
+        self._items = list(items)
+        self._data = list(data)
+        self._timestamp = time.time()
+        self._by_label = None
+        self._by_job = None
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def _select(self, field):
+        """Gets the queued builds for which a boolean field was set
+
+        :param str field: name of the field describing each queued build
+        :rtype: :class:`list` of :class:`~.queue_item.QueueItem`
+        """
+        return [cur_item for cur_item, cur_data in zip(self._items, self._data)
+                if cur_data.get(field)]
+
+    @property
+    def timestamp(self):
+        """time at which the snapshot was captured, in seconds since the epoch
+
+        :rtype: :class:`float`
+        """
+        return self._timestamp
+
+    @property
+    def items(self):
+        """all builds that were waiting in the queue
+
+        :rtype: :class:`list` of :class:`~.queue_item.QueueItem`
+        """
+        return list(self._items)
+
+    @property
+    def by_label(self):
+        """queued builds grouped by the label of the agents they wait on
+
+        Builds which aren't waiting on a specific label are grouped under
+        the key None. See :py:attr:`~.queue_item.QueueItem.label`.
+
+        :rtype: :class:`dict`
+        """
+        if self._by_label is None:
+            self._by_label = OrderedDict()
+            for cur_item, cur_data in zip(self._items, self._data):
+                label = _parse_label(cur_data.get("why"))
+                self._by_label.setdefault(label, list()).append(cur_item)
+        return self._by_label
+
+    @property
+    def by_job(self):
+        """queued builds grouped by the URL of the job they belong to
+
+        Builds whose task has no URL, such as the placeholder tasks of
+        pipeline ``node`` steps, are grouped under None.
+
+        :rtype: :class:`dict`
+        """
+        if self._by_job is None:
+            self._by_job = OrderedDict()
+            for cur_item, cur_data in zip(self._items, self._data):
+                key = (cur_data.get("task") or dict()).get("url")
+                self._by_job.setdefault(key, list()).append(cur_item)
+        return self._by_job
+
+    @property
+    def stuck_items(self):
+        """queued builds which are unable to build
+
+        :rtype: :class:`list` of :class:`~.queue_item.QueueItem`
+        """
+        return self._select("stuck")
+
+    @property
+    def blocked_items(self):
+        """queued builds waiting for some other event to complete
+
+        :rtype: :class:`list` of :class:`~.queue_item.QueueItem`
+        """
+        return self._select("blocked")
+
+    @property
+    def buildable_items(self):
+        """queued builds ready to run as soon as an executor is available
+
+        :rtype: :class:`list` of :class:`~.queue_item.QueueItem`
+        """
+        return self._select("buildable")
+
+    @property
+    def oldest_item(self):
+        """the build that has been waiting in the queue the longest
+
+        :returns:
+            the queued build, or None if the queue was empty or the time at
+            which builds were queued is unknown
+        :rtype: :class:`~.queue_item.QueueItem`
+        """
+        queued = [(cur_data["inQueueSince"], pos)
+                  for pos, cur_data in enumerate(self._data)
+                  if cur_data.get("inQueueSince") is not None]
+        if not queued:
+            return None
+        return self._items[min(queued)[1]]
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -1,3 +1,7 @@
+"""Primitives for interacting with builds waiting in the Jenkins build queue"""
+from collections import OrderedDict
+from datetime import datetime
+import re
 import requests
 from six.moves import urllib_parse
 from six import PY2
@@ -5,6 +9,63 @@ from requests.exceptions import HTTPError
 from pyjen.build import Build
 from pyjen.utils.plugin_api import find_plugin
 from pyjen.exceptions import PluginNotSupportedError
+from pyjen.utils.bulk import run_bulk, DEFAULT_MAX_WORKERS
+from pyjen.utils.poller import get_default_poller
+
+# Fields loaded for each item in a listing of the build queue. Covers all of
+# the descriptive properties of a queue item, so they can be queried without
+# hitting the REST API again.
+QUEUE_ITEM_FIELDS = [
+    "id",
+    "why",
+    "blocked",
+    "buildable",
+    "stuck",
+    "inQueueSince",
+    "task[_class,url,name]",
+]
+
+# Pattern extracting the label a queued build is waiting on from the
+# explanation Jenkins gives for why the build is still queued, like
+# "Waiting for next available executor on 'linux'" or
+# "There are no nodes with the label 'linux'"
+_LABEL_PATTERN = re.compile(
+    u"(?:available executor on|with the label|nodes of label) "
+    u"[\u2018'\"]([^\u2019'\"]+)[\u2019'\"]")
+
+
+def _parse_label(reason):
+    """Extracts the label a queued build is waiting on from its explanation
+
+    :param str reason: explanation for why the build is still queued
+    :returns:
+        the label expression, or None if the build isn't waiting on a
+        specific label
+    :rtype: :class:`str`
+    """
+    match = _LABEL_PATTERN.search(reason or "")
+    if match is None:
+        return None
+    return match.group(1)
+
+
+def _instantiate_task(api, task):
+    """Creates the job a queued build belongs to from its REST API data
+
+    :param api: PyJen REST API used to instantiate the job
+    :param dict task:
+        REST API data describing the task of the queued build, or None if
+        the queued build is no longer valid
+    :returns: the job, or None if no task data was given
+    :rtype: :class:`~.job.Job`
+    """
+    if task is None:
+        return None
+    plugin = find_plugin(task["_class"])
+    if plugin is None:
+        raise PluginNotSupportedError(
+            "Job plugin not supported.", task["_class"])
+    return plugin(api.clone(task["url"], task))
 
 
 class QueueItem(object):
@@ -13,11 +74,20 @@ class QueueItem(object):
     :param api:
         Pre-initialized connection to the Jenkins REST API
     :type api: :class:`~/utils/jenkins_api/JenkinsAPI`
+    :param job:
+        Optional reference to the job the queued build belongs to, if known.
+        Avoids having to query the REST API to find it.
+    :type job: :class:`~.job.Job`
     """
 
-    def __init__(self, api):
+    def __init__(self, api, job=None):
         super(QueueItem, self).__init__()
         self._api = api
+        self._job = job
+
+    def __repr__(self):
+        """Serialized representation of this object"""
+        return self._api.url
 
     def __eq__(self, other):
         """Equality operator
@@ -46,10 +116,25 @@ class QueueItem(object):
         May return an empty dictionary if the object is no longer backed by a
         valid REST API endpoint.
 
+        :rtype: :class:`dict`
+        """
+        return self._get_data()
+
+    def _get_data(self, keys=None):
+        """Loads the API data describing this queued build
+
+        May return an empty dictionary if the object is no longer backed by a
+        valid REST API endpoint.
+
+        :param list keys:
+            names of the attributes the caller needs. If provided, data this
+            object was hydrated with, like the data loaded by a listing of the
+            build queue, is used when it contains all of them. Otherwise the
+            current state of the queued build is loaded from the REST API.
         :rtype: :class:`dict`
         """
         try:
-            return self._api.get_api_data()
+            return self._api.get_api_data(keys=keys)
         except HTTPError as err:
             if err.response.status_code == requests.codes.NOT_FOUND:
                 return dict()
@@ -88,7 +173,7 @@ class QueueItem(object):
 
         :rtype: :class:`bool`
         """
-        return self._data.get("stuck")
+        return self._get_data(["stuck"]).get("stuck")
 
     @property
     def blocked(self):
@@ -98,7 +183,7 @@ class QueueItem(object):
 
         :rtype: :class:`bool`
         """
-        return self._data.get("blocked")
+        return self._get_data(["blocked"]).get("blocked")
 
     @property
     def buildable(self):
@@ -108,7 +193,7 @@ class QueueItem(object):
 
         :rtype: :class:`bool`
         """
-        return self._data.get("buildable")
+        return self._get_data(["buildable"]).get("buildable")
 
     @property
     def reason(self):
@@ -118,9 +203,39 @@ class QueueItem(object):
 
         :rtype: :class:`str`
         """
-        if not self._data.keys():
+        data = self._get_data(["why"])
+        if not data.keys():
             return None
-        return self._data.get("why", "")
+        return data.get("why", "")
+
+    @property
+    def queued_since(self):
+        """Gets the time at which this build was added to the queue
+
+        May return None if this queue item has been invalidated by Jenkins
+
+        :rtype: :class:`datetime.datetime`
+        """
+        data = self._get_data(["inQueueSince"])
+        if "inQueueSince" not in data:
+            return None
+        return datetime.fromtimestamp(data["inQueueSince"] * 0.001)
+
+    @property
+    def label(self):
+        """Gets the label of the build agents this queued build is waiting on
+
+        Jenkins doesn't report the label a queued build is assigned to
+        directly, so it is extracted from the explanation given by
+        :py:attr:`reason`. It is only available while the build is waiting
+        for an executor with a specific label to become available.
+
+        :returns:
+            the label expression, or None if the build isn't waiting on a
+            specific label
+        :rtype: :class:`str`
+        """
+        return _parse_label(self.reason)
 
     @property
     def waiting(self):
@@ -143,9 +258,10 @@ class QueueItem(object):
 
         :rtype: :class:`bool`
         """
-        if not self._data.keys():
+        data = self._data
+        if not data:
             return None
-        return self._data.get("cancelled", False)
+        return data.get("cancelled", False)
 
     @property
     def job(self):
@@ -155,14 +271,10 @@ class QueueItem(object):
 
         :rtype: :class:`pyjen.job.Job`
         """
-        job_data = self._data.get("task")
-        if job_data is None:
-            return None
-        plugin = find_plugin(job_data["_class"])
-        if plugin is None:
-            raise PluginNotSupportedError(
-                "Job plugin not supported.", job_data["_class"])
-        return plugin(self._api.clone(job_data["url"]))
+        if self._job is not None:
+            return self._job
+        return _instantiate_task(
+            self._api, self._get_data(["task"]).get("task"))
 
     @property
     def build(self):
@@ -176,7 +288,132 @@ class QueueItem(object):
         exe_info = self._data.get("executable")
         if exe_info is None:
             return None
-        return Build(self._api.clone(exe_info["url"]))
+        return Build(self._api.clone(exe_info["url"], exe_info))
+
+    def _poll_build(self):
+        """Checks whether the build for this queue item has started
+
+        Used as the check function when waiting for the build to start. See
+        :meth:`~.utils.poller.Poller.submit` for details.
+
+        :rtype: :class:`tuple`
+        """
+        data = self._data
+        if not data:
+            # Jenkins expires queue items shortly after their builds start,
+            # so we may have missed the transition. Fall back to searching
+            # the job's build history, if we know which job the item is for.
+            if self._job is None:
+                return True, None
+            return True, self._job.find_builds_by_queue_ids([self.id]).get(
+                self.id)
+
+        if data.get("cancelled", False):
+            return True, None
+
+        exe_info = data.get("executable")
+        if exe_info is None:
+            return False, None
+        return True, Build(self._api.clone(exe_info["url"], exe_info))
+
+    def wait_for_build_async(self, timeout=None, poller=None):
+        """Starts waiting, in the background, for this queued build to start
+
+        The queue item is checked periodically, with the delay between checks
+        growing exponentially. Any number of waits can be serviced by the
+        same background thread.
+
+        :param float timeout:
+            maximum number of seconds to wait. If not provided, waits
+            indefinitely.
+        :param poller:
+            poller to service the wait. If not provided, the poller shared by
+            all waits is used.
+        :type poller: :class:`~.utils.poller.Poller`
+        :returns:
+            future which completes with the build once it has started, or
+            with None if the queued build was cancelled or expired before it
+            could be found. Fails with a
+            :class:`~.exceptions.WaitTimeoutError` if the build hasn't
+            started before the timeout.
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        poller = poller or get_default_poller()
+        return poller.submit(self._poll_build, timeout)
+
+    def wait_for_build(self, timeout=None, poller=None):
+        """Blocks until this queued build leaves the queue and starts building
+
+        See :meth:`wait_for_build_async` for details.
+
+        :param float timeout:
+            maximum number of seconds to wait. If not provided, waits
+            indefinitely.
+        :param poller:
+            poller to service the wait. If not provided, the poller shared by
+            all waits is used.
+        :type poller: :class:`~.utils.poller.Poller`
+        :returns:
+            the build that was started, or None if the queued build was
+            cancelled or expired before it could be found
+        :rtype: :class:`~.build.Build`
+        :raises: :class:`~.exceptions.WaitTimeoutError`
+        """
+        return self.wait_for_build_async(timeout, poller).result()
+
+    @staticmethod
+    def resolve_builds(queue_items, max_workers=DEFAULT_MAX_WORKERS):
+        """Finds the builds associated with many queued builds at once
+
+        Queue items are grouped by job, and the builds for each job are
+        located using a single search of the job's build history. Jobs are
+        searched in parallel. Queue items obtained from a listing of the build
+        queue already know the job they belong to, so no request is needed to
+        find it.
+
+        .. seealso: :py:meth:`pyjen.job.Job.find_builds_by_queue_ids`
+
+        :param list queue_items:
+            the queued builds to locate builds for. They may belong to any
+            number of jobs.
+        :param int max_workers:
+            maximum number of requests which may be in flight at one time
+        :returns:
+            the build associated with each queue item, in the same order as
+            the queue items. Items that haven't started building yet, or which
+            have been invalidated by Jenkins, are returned as None.
+        :rtype: :class:`list` of :class:`~.build.Build`
+        """
+        queue_items = list(queue_items)
+        jobs = run_bulk(lambda item: item.job, queue_items, max_workers)
+        jobs.raise_on_failure()
+
+        # Group the queue items by the job they belong to
+        groups = OrderedDict()
+        for cur_item, cur_job in jobs.succeeded:
+            if cur_job is None:
+                continue
+            group = groups.setdefault(repr(cur_job), (cur_job, list()))
+            group[1].append(cur_item.id)
+
+        results = run_bulk(
+            lambda group: group[0].find_builds_by_queue_ids(group[1]),
+            groups.values(),
+            max_workers)
+        results.raise_on_failure()
+
+        builds = dict()
+        for cur_group, cur_builds in results.succeeded:
+            for queue_id, cur_build in cur_builds.items():
+                builds[(repr(cur_group[0]), queue_id)] = cur_build
+
+        retval = list()
+        for cur_item, cur_job in jobs.succeeded:
+            if cur_job is None:
+                retval.append(None)
+                continue
+            retval.append(builds.get((repr(cur_job), cur_item.id)))
+        return retval
 
     def cancel(self):
         """Cancels this queued build"""
@@ -0,0 +1,251 @@
+"""Persistent storage for data describing builds that have finished running"""
+import json
+import sqlite3
+import threading
+
+# Fields describing a build which must all be loaded before the build data
+# can be stored. Together with one of the :data:`STORED_CHANGESET_FIELDS`
+# these cover every property of the :class:`~.build.Build` class, so partial
+# snapshots loaded from listings are never mistaken for a complete
+# description of the build.
+STORED_BUILD_FIELDS = [
+    "id",
+    "number",
+    "result",
+    "building",
+    "timestamp",
+    "duration",
+    "estimatedDuration",
+    "description",
+    "artifacts",
+]
+
+# Fields describing the source code changes included in a build, of which
+# at least one must be loaded before the build data can be stored. Freestyle
+# builds expose a single "changeSet" while pipeline builds, which may check
+# out several repositories, expose a list of "changeSets" instead.
+STORED_CHANGESET_FIELDS = ["changeSet", "changeSets"]
+
+
+class BuildStore(object):
+    """On-disk cache of data describing builds that have finished running
+
+    Once a build has finished, the data describing it never changes, so it
+    can be cached indefinitely. The store is backed by an SQLite database so
+    the data survives across runs of the same script, avoiding the need to
+    re-download the same builds over and over again.
+
+    Builds which are still running are never stored.
+
+    **Example:** ::
+
+        store = BuildStore("/var/cache/pyjen/builds.db")
+        jk = Jenkins("http://localhost:8080", build_store=store)
+
+    :param str path:
+        path to the database file to store data in. The file will be created
+        if it doesn't already exist. May be ":memory:" to keep the data in
+        memory for the lifetime of the process only.
+    """
+    def __init__(self, path):
+        super(BuildStore, self).__init__()
+        self._path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS builds "
+                "(url TEXT PRIMARY KEY, data TEXT NOT NULL)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS console "
+                "(url TEXT PRIMARY KEY, text TEXT NOT NULL)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_builds "
+                "(job_url TEXT NOT NULL, number INTEGER NOT NULL, "
+                "data TEXT NOT NULL, PRIMARY KEY (job_url, number))")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs "
+                "(job_url TEXT PRIMARY KEY, high_water_mark INTEGER)")
+
+    def __len__(self):
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM builds").fetchone()
+        return row[0]
+
+    def __contains__(self, url):
+        return self.get_data(url) is not None
+
+    @property
+    def path(self):
+        """location of the database backing this store
+
+        :rtype: :class:`str`
+        """
+        return self._path
+
+    def _fetch(self, query, url):
+        """Loads a single value from the database
+
+        :param str query: SQL query accepting a URL as its only parameter
+        :param str url: URL of the build or job to load data for
+        :returns: the value loaded, or None if there is no matching data
+        """
+        with self._lock:
+            row = self._conn.execute(query, (url,)).fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def get_data(self, url):
+        """Loads the stored REST API data for a build
+
+        :param str url: URL of the build
+        :returns:
+            data describing the build, or None if the build hasn't been stored
+        :rtype: :class:`dict`
+        """
+        retval = self._fetch("SELECT data FROM builds WHERE url=?", url)
+        if retval is None:
+            return None
+        return json.loads(retval)
+
+    def put_data(self, url, data):
+        """Stores the REST API data describing a build
+
+        Data is only stored for builds that have finished running and
+        contain all of the :data:`STORED_BUILD_FIELDS`, as well as one of the
+        :data:`STORED_CHANGESET_FIELDS`.
+
+        :param str url: URL of the build
+        :param dict data: REST API data describing the build
+        :returns: True if the data was stored, otherwise False
+        :rtype: :class:`bool`
+        """
+        if data.get("building", True):
+            return False
+        if not all(cur_field in data for cur_field in STORED_BUILD_FIELDS):
+            return False
+        if not any(cur_field in data
+                   for cur_field in STORED_CHANGESET_FIELDS):
+            return False
+
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO builds (url, data) VALUES (?, ?)",
+                    (url, json.dumps(data)))
+        return True
+
+    def get_console(self, url):
+        """Loads the stored console output for a build
+
+        :param str url: URL of the build
+        :returns:
+            console output of the build, or None if it hasn't been stored
+        :rtype: :class:`str`
+        """
+        return self._fetch("SELECT text FROM console WHERE url=?", url)
+
+    def put_console(self, url, text):
+        """Stores the console output of a build that has finished running
+
+        :param str url: URL of the build
+        :param str text: console output of the build
+        """
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO console (url, text) VALUES (?, ?)",
+                    (url, text))
+
+    def delete(self, url):
+        """Removes all stored data for a build
+
+        :param str url: URL of the build
+        """
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM builds WHERE url=?", (url,))
+                self._conn.execute("DELETE FROM console WHERE url=?", (url,))
+
+    def get_high_water_mark(self, job_url):
+        """Gets the number of the newest build synchronized for a job
+
+        All builds of the job up to and including this one have been
+        synchronized. See :meth:`~.job.Job.sync_builds`.
+
+        :param str job_url: URL of the job
+        :returns:
+            the build number, or None if the job has never been synchronized
+        :rtype: :class:`int`
+        """
+        return self._fetch(
+            "SELECT high_water_mark FROM jobs WHERE job_url=?", job_url)
+
+    def get_build_records(self, job_url):
+        """Loads the compact records describing the builds of a job
+
+        :param str job_url: URL of the job
+        :returns: build records, sorted from newest to oldest
+        :rtype: :class:`list` of :class:`dict`
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM job_builds WHERE job_url=? "
+                "ORDER BY number DESC", (job_url,)).fetchall()
+        return [json.loads(cur_row[0]) for cur_row in rows]
+
+    def get_build_numbers(self, job_url):
+        """Gets the numbers of all builds of a job with a stored record
+
+        :param str job_url: URL of the job
+        :rtype: :class:`set` of :class:`int`
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT number FROM job_builds WHERE job_url=?",
+                (job_url,)).fetchall()
+        return set(cur_row[0] for cur_row in rows)
+
+    def put_build_records(self, job_url, records, high_water_mark):
+        """Stores compact records describing builds of a job
+
+        :param str job_url: URL of the job
+        :param list records:
+            build records to store. Each record must contain at least the
+            "number" of the build.
+        :param int high_water_mark:
+            number of the newest build for which all builds up to and
+            including it have now been synchronized
+        """
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO job_builds (job_url, number, data) "
+                    "VALUES (?, ?, ?)",
+                    [(job_url, cur_record["number"], json.dumps(cur_record))
+                     for cur_record in records])
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO jobs (job_url, high_water_mark) "
+                    "VALUES (?, ?)", (job_url, high_water_mark))
+
+    def delete_build_records(self, job_url, numbers):
+        """Removes the records describing builds of a job
+
+        :param str job_url: URL of the job
+        :param numbers: numbers of the builds to remove
+        """
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "DELETE FROM job_builds WHERE job_url=? AND number=?",
+                    [(job_url, cur_number) for cur_number in numbers])
+
+    def close(self):
+        """Closes the database backing this store"""
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    pass
@@ -0,0 +1,256 @@
+"""Primitives for applying operations to many Jenkins objects in parallel"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pyjen.exceptions import BulkOperationError
+
+# Default number of operations that may be in flight at one time
+DEFAULT_MAX_WORKERS = 8
+
+
+class BulkResult(object):
+    """Summary of an operation applied to many objects
+
+    Operations are applied to each object independently, so a failure on one
+    object does not prevent the operation from being applied to the others.
+    The outcome for each object is recorded here for later inspection.
+    """
+    def __init__(self):
+        super(BulkResult, self).__init__()
+        self._succeeded = list()
+        self._failed = list()
+
+    def __str__(self):
+        return "{0} of {1} operations succeeded".format(
+            len(self._succeeded), len(self))
+
+    def __len__(self):
+        return len(self._succeeded) + len(self._failed)
+
+    def add_success(self, item, result):
+        """Records a successful operation
+
+        :param item: object the operation was applied to
+        :param result: value returned by the operation
+        """
+        self._succeeded.append((item, result))
+
+    def add_failure(self, item, error):
+        """Records a failed operation
+
+        :param item: object the operation was applied to
+        :param Exception error: error raised by the operation
+        """
+        self._failed.append((item, error))
+
+    @property
+    def succeeded(self):
+        """list of objects the operation succeeded on, and their results
+
+        :rtype: :class:`list` of :class:`tuple`
+        """
+        return list(self._succeeded)
+
+    @property
+    def failed(self):
+        """list of objects the operation failed on, and the errors raised
+
+        :rtype: :class:`list` of :class:`tuple`
+        """
+        return list(self._failed)
+
+    @property
+    def ok(self):  # pylint: disable=invalid-name
+        """Checks to see whether the operation succeeded on all objects
+
+        :rtype: :class:`bool`
+        """
+        return not self._failed
+
+    def raise_on_failure(self):
+        """Raises an error if the operation failed on any object
+
+        :raises: :class:`~.exceptions.BulkOperationError`
+        """
+        if self._failed:
+            raise BulkOperationError(self)
+
+
+def run_bulk(operation, items, max_workers=DEFAULT_MAX_WORKERS):
+    """Applies an operation to many objects in parallel
+
+    :param operation:
+        callable object which accepts a single parameter: the object to
+        apply the operation to
+    :param list items: objects to apply the operation to
+    :param int max_workers:
+        maximum number of operations which may be in flight at one time
+    :returns: summary of the outcome of the operation for each object
+    :rtype: :class:`BulkResult`
+    """
+    log = logging.getLogger(__name__)
+    retval = BulkResult()
+    items = list(items)
+    if not items:
+        return retval
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            (cur_item, executor.submit(operation, cur_item))
+            for cur_item in items
+        ]
+        for cur_item, cur_future in futures:
+            try:
+                retval.add_success(cur_item, cur_future.result())
+            except Exception as err:  # pylint: disable=broad-except
+                log.debug("Bulk operation failed on %s: %s", cur_item, err)
+                retval.add_failure(cur_item, err)
+
+    return retval
+
+
+class BulkJobOperations(object):
+    """Mixin class providing parallel bulk operations on a set of jobs
+
+    Derived classes must implement a `_bulk_jobs` property which returns the
+    list of jobs the bulk operations are to be applied to.
+
+    Each operation is applied to every job, even if it fails on some of them.
+    By default a :class:`~.exceptions.BulkOperationError` is then raised if
+    the operation failed on any job. Callers wanting to handle partial
+    failures themselves may pass `raise_on_error=False` and inspect the
+    returned summary instead.
+    """
+
+    @staticmethod
+    def _finish_bulk(result, raise_on_error):
+        """Reports the outcome of a bulk operation on jobs
+
+        :param result: summary of the outcome of the operation
+        :type result: :class:`~.utils.bulk.BulkResult`
+        :param bool raise_on_error:
+            whether to raise an error if the operation failed on any job
+        :rtype: :class:`~.utils.bulk.BulkResult`
+        """
+        if raise_on_error:
+            result.raise_on_failure()
+        return result
+
+    def enable_all_jobs(self, max_workers=DEFAULT_MAX_WORKERS,
+                        raise_on_error=True):
+        """Enables all jobs managed by this object, in parallel
+
+        :param int max_workers:
+            maximum number of operations which may be in flight at one time
+        :param bool raise_on_error:
+            whether to raise an error if the operation failed on any job
+        :returns: summary of the outcome of the operation on each job
+        :rtype: :class:`~.utils.bulk.BulkResult`
+        :raises:
+            :class:`~.exceptions.BulkOperationError` if the operation failed
+            on any job and `raise_on_error` is set
+        """
+        return self._finish_bulk(
+            run_bulk(lambda job: job.enable(), self._bulk_jobs, max_workers),
+            raise_on_error)
+
+    def disable_all_jobs(self, max_workers=DEFAULT_MAX_WORKERS,
+                         raise_on_error=True):
+        """Disables all jobs managed by this object, in parallel
+
+        :param int max_workers:
+            maximum number of operations which may be in flight at one time
+        :param bool raise_on_error:
+            whether to raise an error if the operation failed on any job
+        :returns: summary of the outcome of the operation on each job
+        :rtype: :class:`~.utils.bulk.BulkResult`
+        :raises:
+            :class:`~.exceptions.BulkOperationError` if the operation failed
+            on any job and `raise_on_error` is set
+        """
+        return self._finish_bulk(
+            run_bulk(lambda job: job.disable(), self._bulk_jobs, max_workers),
+            raise_on_error)
+
+    def delete_all_jobs(self, max_workers=DEFAULT_MAX_WORKERS,
+                        raise_on_error=True):
+        """Deletes all jobs managed by this object, in parallel
+
+        :param int max_workers:
+            maximum number of operations which may be in flight at one time
+        :param bool raise_on_error:
+            whether to raise an error if the operation failed on any job
+        :returns: summary of the outcome of the operation on each job
+        :rtype: :class:`~.utils.bulk.BulkResult`
+        :raises:
+            :class:`~.exceptions.BulkOperationError` if the operation failed
+            on any job and `raise_on_error` is set
+        """
+        return self._finish_bulk(
+            run_bulk(lambda job: job.delete(), self._bulk_jobs, max_workers),
+            raise_on_error)
+
+    def clone_all_jobs(self, name_format, disable=True,
+                       max_workers=DEFAULT_MAX_WORKERS, raise_on_error=True):
+        """Creates a copy of every job managed by this object, in parallel
+
+        :param str name_format:
+            Python format string used to generate the name of each new job.
+            The name of the job being cloned is passed as the first format
+            parameter, as in "{0}_copy".
+        :param bool disable:
+            Indicates whether the newly created jobs should be disabled after
+            creation to prevent builds from accidentally triggering
+        :param int max_workers:
+            maximum number of operations which may be in flight at one time
+        :param bool raise_on_error:
+            whether to raise an error if the operation failed on any job
+        :returns:
+            summary of the outcome of the operation on each job. The result
+            for each successfully cloned job is the newly created job.
+        :rtype: :class:`~.utils.bulk.BulkResult`
+        :raises:
+            :class:`~.exceptions.BulkOperationError` if the operation failed
+            on any job and `raise_on_error` is set
+        """
+        return self._finish_bulk(
+            run_bulk(
+                lambda job: job.clone(name_format.format(job.name), disable),
+                self._bulk_jobs,
+                max_workers),
+            raise_on_error)
+
+    def update_all_configs(self, transform, max_workers=DEFAULT_MAX_WORKERS,
+                           raise_on_error=True):
+        """Modifies the XML configuration of all jobs, in parallel
+
+        :param transform:
+            callable object which accepts the XML configuration of a job, as
+            a string, and returns the updated XML configuration. May return
+            None to leave a job's configuration unchanged.
+        :param int max_workers:
+            maximum number of operations which may be in flight at one time
+        :param bool raise_on_error:
+            whether to raise an error if the operation failed on any job
+        :returns:
+            summary of the outcome of the operation on each job. The result
+            for each job is True if its configuration was updated or False if
+            it was left unchanged.
+        :rtype: :class:`~.utils.bulk.BulkResult`
+        :raises:
+            :class:`~.exceptions.BulkOperationError` if the operation failed
+            on any job and `raise_on_error` is set
+        """
+        def update_config(job):
+            new_xml = transform(job.config_xml)
+            if new_xml is None:
+                return False
+            job.config_xml = new_xml
+            return True
+
+        return self._finish_bulk(
+            run_bulk(update_config, self._bulk_jobs, max_workers),
+            raise_on_error)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    pass
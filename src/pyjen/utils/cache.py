@@ -0,0 +1,288 @@
+"""Caching primitives used to avoid re-transferring unchanged REST API data"""
+import threading
+import time
+from collections import OrderedDict
+
+# Maximum number of responses kept in a response cache by default
+DEFAULT_MAX_ENTRIES = 256
+
+# Number of seconds data kept in a read cache remains valid by default
+DEFAULT_READ_CACHE_TTL = 2
+
+
+class ResponseCache(object):
+    """Bounded cache of HTTP responses keyed by the request that produced them
+
+    Only responses carrying an ETag or Last-Modified validator are stored.
+    Cached responses are never returned without first being revalidated with
+    the server, using a conditional request, so the cache can never return
+    stale data. It only saves the cost of transferring bodies that haven't
+    changed.
+
+    When full, the least recently used response is evicted to make room for
+    new ones.
+
+    **Example:** ::
+
+        cache = ResponseCache()
+        jk = Jenkins("http://localhost:8080", transport=Transport(cache=cache))
+        ...
+        print("cache hits: {0}, misses: {1}".format(cache.hits, cache.misses))
+
+    :param int max_entries:
+        maximum number of responses to keep in the cache
+    """
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        super(ResponseCache, self).__init__()
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def max_entries(self):
+        """maximum number of responses kept in the cache
+
+        :rtype: :class:`int`
+        """
+        return self._max_entries
+
+    @property
+    def hits(self):
+        """number of requests answered from the cache after revalidation
+
+        :rtype: :class:`int`
+        """
+        return self._hits
+
+    @property
+    def misses(self):
+        """number of requests for which the server returned a full response
+
+        :rtype: :class:`int`
+        """
+        return self._misses
+
+    def validators(self, key):
+        """Generates conditional request headers for a cached response
+
+        :param key: unique identifier of the request
+        :returns:
+            dictionary of HTTP headers used to revalidate the cached response.
+            Will be empty if no response for the request has been cached.
+        :rtype: :class:`dict`
+        """
+        with self._lock:
+            response = self._entries.get(key)
+        if response is None:
+            return dict()
+
+        retval = dict()
+        if "ETag" in response.headers:
+            retval["If-None-Match"] = response.headers["ETag"]
+        if "Last-Modified" in response.headers:
+            retval["If-Modified-Since"] = response.headers["Last-Modified"]
+        return retval
+
+    def process(self, key, response):
+        """Updates the cache with a response returned by the server
+
+        :param key: unique identifier of the request
+        :param response: response returned by the server for the request
+        :type response: :class:`requests.models.Response`
+        :returns:
+            The cached response if the server indicated it is still valid,
+            otherwise the given response
+        :rtype: :class:`requests.models.Response`
+        """
+        with self._lock:
+            if response.status_code == 304 and key in self._entries:
+                self._hits += 1
+                # Re-insert the response to mark it as most recently used
+                retval = self._entries.pop(key)
+                self._entries[key] = retval
+                return retval
+
+            self._misses += 1
+            if response.status_code != 200:
+                self._entries.pop(key, None)
+                return response
+            if "ETag" not in response.headers and \
+                    "Last-Modified" not in response.headers:
+                self._entries.pop(key, None)
+                return response
+
+            # Make sure the body has been read from the server before
+            # storing the response, so it can be shared between callers
+            _ = response.content
+            self._entries.pop(key, None)
+            self._entries[key] = response
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            return response
+
+    def clear(self):
+        """Discards all cached responses and resets the hit / miss counters"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+
+class _Flight(object):
+    """Request for REST API data that is currently in progress
+
+    Used by :class:`ReadCache` to share the outcome of a request with all
+    threads that asked for the same data while it was in progress.
+    """
+    def __init__(self):
+        super(_Flight, self).__init__()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ReadCache(object):
+    """Short lived cache of REST API data shared by all objects of a server
+
+    Repeated reads of the same REST API endpoint within a short freshness
+    window are answered from memory. Identical reads issued concurrently from
+    several threads are collapsed into a single request to the server, with
+    all callers receiving the same result.
+
+    Cached data is invalidated as soon as the server context it belongs to
+    performs an operation that may modify server state. See
+    :meth:`~.utils.jenkins_api.JenkinsContext.invalidate`.
+
+    NOTE: Data returned from the cache is shared by all callers and must
+    not be modified.
+
+    :param float ttl:
+        number of seconds cached data remains valid. A value of 0 disables
+        caching, while still collapsing concurrent requests for the same data.
+    :param int max_entries:
+        maximum number of REST API responses to keep in the cache
+    """
+    def __init__(self, ttl=DEFAULT_READ_CACHE_TTL,
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        super(ReadCache, self).__init__()
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._in_flight = dict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def ttl(self):
+        """number of seconds cached data remains valid
+
+        :rtype: :class:`float`
+        """
+        return self._ttl
+
+    @property
+    def hits(self):
+        """number of reads answered from the cache
+
+        :rtype: :class:`int`
+        """
+        return self._hits
+
+    @property
+    def misses(self):
+        """number of reads which required a request to the server
+
+        :rtype: :class:`int`
+        """
+        return self._misses
+
+    @property
+    def coalesced(self):
+        """number of reads which shared the result of another in-flight read
+
+        :rtype: :class:`int`
+        """
+        return self._coalesced
+
+    def get(self, key, generation, loader):
+        """Loads data through the cache
+
+        :param key: unique identifier of the data to load, like its URL
+        :param int generation:
+            current generation of the server context the data belongs to.
+            Data cached under a different generation is considered stale.
+        :param loader:
+            callable object, accepting no parameters, which loads the data
+            from the server when it isn't available in the cache
+        :returns: the requested data
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                timestamp, entry_generation, value = entry
+                if entry_generation == generation and \
+                        time.time() - timestamp < self._ttl:
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+
+            flight_key = (key, generation)
+            flight = self._in_flight.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._in_flight[flight_key] = flight
+                self._misses += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        succeeded = False
+        try:
+            flight.result = loader()
+            succeeded = True
+        except Exception as err:
+            flight.error = err
+            raise
+        finally:
+            if not succeeded and flight.error is None:
+                flight.error = RuntimeError(
+                    "Request for {0} was aborted".format(key))
+            with self._lock:
+                del self._in_flight[flight_key]
+                if succeeded and self._ttl > 0:
+                    self._entries[key] = (
+                        time.time(), generation, flight.result)
+                    while len(self._entries) > self._max_entries:
+                        self._entries.popitem(last=False)
+            flight.done.set()
+        return flight.result
+
+    def clear(self):
+        """Discards all cached data and resets the usage counters"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            self._coalesced = 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    pass
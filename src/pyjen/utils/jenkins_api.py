@@ -1,10 +1,241 @@
 """Base class for all objects that interact with the Jenkins REST API"""
 import logging
 import json
+import threading
+import time
 import requests
 from requests.exceptions import InvalidHeader
 from six.moves import urllib_parse
 import xml.etree.ElementTree as ElementTree
+from pyjen.utils.transport import Transport
+
+# Default number of seconds data used to hydrate an object remains valid
+DEFAULT_MAX_DATA_AGE = 10
+
+
+class JenkinsContext(object):
+    """Server-level state shared by all REST API objects for one Jenkins master
+
+    Every :class:`JenkinsAPI` object cloned from the same root shares a single
+    context, so details like the server version, dashboard headers and the
+    CSRF crumb only need to be loaded from the server once, regardless of how
+    many jobs, views, builds, etc. are being managed.
+
+    :param str root_url:
+        URL of the main Jenkins dashboard
+    :param tuple creds:
+        username and password pair to authenticate with when accessing
+        the REST API
+    :param ssl_cert:
+        Either a boolean controlling SSL verification, or a path to a cert
+        authority bundle to use for SSL verification.
+    :param transport:
+        Optional pooled HTTP transport to send requests through. If not
+        provided a new one will be created with default pool settings.
+    :type transport: :class:`~.utils.transport.Transport`
+    :param int max_data_age:
+        number of seconds data used to hydrate objects is considered valid.
+        May be None to keep the data until it is explicitly refreshed.
+    :param read_cache:
+        Optional cache used to share REST API data loaded by all objects
+        connected to this server, for a short time. Disabled by default.
+    :type read_cache: :class:`~.utils.cache.ReadCache`
+    :param build_store:
+        Optional persistent store for data describing builds that have
+        finished running. Disabled by default.
+    :type build_store: :class:`~.utils.build_store.BuildStore`
+    """
+    def __init__(self, root_url, creds, ssl_cert, transport=None,
+                 max_data_age=DEFAULT_MAX_DATA_AGE, read_cache=None,
+                 build_store=None):
+        super(JenkinsContext, self).__init__()
+        self._read_cache = read_cache
+        self._build_store = build_store
+        self._root_url = root_url.rstrip("/\\") + "/"
+        self._creds = creds
+        self._ssl_cert = ssl_cert
+        self._transport = transport or Transport()
+        self._max_data_age = max_data_age
+
+        # Counter incremented every time an operation that may modify server
+        # state is performed. Used to detect stale client-side data.
+        self._generation = 0
+
+        # Server-wide metadata is loaded lazily and cached for the lifetime
+        # of the context. Access is synchronized so objects used from several
+        # threads at once don't all race to load the same data.
+        self._lock = threading.Lock()
+        self._headers_cache = None
+        self._version_cache = None
+        self._crumb_cache = None
+
+    @property
+    def root_url(self):
+        """URL of the main Jenkins dashboard managed by this context
+
+        :rtype: :class:`str`
+        """
+        return self._root_url
+
+    @property
+    def creds(self):
+        """username and password pair used to authenticate with the server
+
+        :rtype: :class:`tuple`
+        """
+        return self._creds
+
+    @property
+    def ssl_cert(self):
+        """SSL verification settings used when connecting to the server"""
+        return self._ssl_cert
+
+    @property
+    def transport(self):
+        """pooled HTTP transport used to communicate with the server
+
+        :rtype: :class:`~.utils.transport.Transport`
+        """
+        return self._transport
+
+    @property
+    def max_data_age(self):
+        """number of seconds data used to hydrate objects remains valid
+
+        :rtype: :class:`int`
+        """
+        return self._max_data_age
+
+    @max_data_age.setter
+    def max_data_age(self, value):
+        self._max_data_age = value
+
+    @property
+    def read_cache(self):
+        """cache of REST API data shared by all objects, if one is in use
+
+        :rtype: :class:`~.utils.cache.ReadCache`
+        """
+        return self._read_cache
+
+    @read_cache.setter
+    def read_cache(self, value):
+        self._read_cache = value
+
+    @property
+    def build_store(self):
+        """persistent store for finished builds, if one is in use
+
+        :rtype: :class:`~.utils.build_store.BuildStore`
+        """
+        return self._build_store
+
+    @build_store.setter
+    def build_store(self, value):
+        self._build_store = value
+
+    @property
+    def generation(self):
+        """Counter which changes every time server state may have changed
+
+        :rtype: :class:`int`
+        """
+        return self._generation
+
+    def invalidate(self):
+        """Marks all data cached client-side for this server as stale"""
+        with self._lock:
+            self._generation += 1
+
+    def get(self, url, **kwargs):
+        """Sends an authenticated HTTP GET request to the server
+
+        :param str url: URL to query
+        :param kwargs: optional arguments passed directly to the transport
+        :rtype: :class:`requests.models.Response`
+        """
+        return self._transport.get(
+            url, auth=self._creds, verify=self._ssl_cert, **kwargs)
+
+    def post(self, url, **kwargs):
+        """Sends an authenticated HTTP POST request to the server
+
+        :param str url: URL to post to
+        :param kwargs: optional arguments passed directly to the transport
+        :rtype: :class:`requests.models.Response`
+        """
+        return self._transport.post(
+            url, auth=self._creds, verify=self._ssl_cert, **kwargs)
+
+    @property
+    def headers(self):
+        """HTTP headers from the main Jenkins dashboard
+
+        :rtype: :class:`dict`
+        """
+        with self._lock:
+            if self._headers_cache is None:
+                temp_path = urllib_parse.urljoin(self._root_url, "api/python")
+                req = self.get(temp_path)
+                req.raise_for_status()
+
+                self._headers_cache = req.headers
+
+            return self._headers_cache
+
+    @property
+    def version(self):
+        """Version number of the Jenkins server
+
+        :rtype: :class:`tuple`
+        """
+        if self._version_cache is None:
+            headers = self.headers
+            if 'x-jenkins' not in headers:
+                raise InvalidHeader("Jenkins header has no x-jenkins metadata "
+                                    "attached to it. Can not load version "
+                                    "info.")
+            self._version_cache = tuple([
+                int(i) for i in headers['x-jenkins'].split(".")
+            ])
+        return self._version_cache
+
+    @property
+    def crumb(self):
+        """CSRF protection token required by POST operations
+
+        May be an empty string if CSRF protection is disabled on the server
+
+        :rtype: :class:`dict`
+        """
+        with self._lock:
+            if self._crumb_cache is None:
+                # Query the REST API for the crumb token
+                req = self.get(self._root_url + 'crumbIssuer/api/json')
+
+                if req.status_code == requests.codes.NOT_FOUND:
+                    # If we get a 404 error, endpoint not found, assume the
+                    # Cross Site Scripting support has been disabled
+                    self._crumb_cache = ''
+                else:
+                    req.raise_for_status()
+                    data = req.json()
+
+                    self._crumb_cache = {
+                        data['crumbRequestField']: data['crumb']
+                    }
+
+            return self._crumb_cache
+
+    def reset_crumb(self):
+        """Discards the cached crumb so a new one is loaded on next use
+
+        Crumbs may expire server-side, for example when the web session they
+        were issued to times out, in which case Jenkins rejects any POST
+        operation using it with an HTTP 403 error.
+        """
+        with self._lock:
+            self._crumb_cache = None
 
 
 class JenkinsAPI(object):
@@ -18,21 +249,32 @@ class JenkinsAPI(object):
     :param ssl_cert:
         Either a boolean controlling SSL verification, or a path to a cert
         authority bundle to use for SSL verification.
+    :param transport:
+        Optional pooled HTTP transport to send requests through. If not
+        provided a new one will be created with default pool settings.
+    :type transport: :class:`~.utils.transport.Transport`
+    :param context:
+        Optional server context shared with other REST API objects connected
+        to the same Jenkins master. When provided, the credentials, SSL
+        settings and transport are all taken from the context and the other
+        parameters are ignored.
+    :type context: :class:`JenkinsContext`
     ."""
 
-    def __init__(self, url, creds, ssl_cert):
+    def __init__(self, url, creds, ssl_cert, transport=None, context=None):
         self._log = logging.getLogger(__name__)
 
         self._url = url.rstrip("/\\") + "/"
-        self._creds = creds
-        self._ssl_cert = ssl_cert
 
-        self._jenkins_root_url = self._url
+        if context is None:
+            context = JenkinsContext(self._url, creds, ssl_cert, transport)
+        self._context = context
 
-        # Internal data members used for caching certain API response data
-        # to improve performance
-        self._crumb_cache = None
-        self._jenkins_headers_cache = None
+        # Snapshot of the API data for our endpoint, typically taken from
+        # the JSON listing of the parent object this one was created from
+        self._hydrated_data = None
+        self._hydrated_time = None
+        self._hydrated_generation = None
 
     def __str__(self):
         """String representation of the job"""
@@ -42,19 +284,79 @@ class JenkinsAPI(object):
         """Encoded state of the job usable for serialization"""
         return "({0}: {1})".format(type(self), self.url)
 
-    def clone(self, api_url):
+    def clone(self, api_url, data=None):
         """Creates a copy of this instance, for a new endpoint URL
 
+        The new instance shares the server context of this one, including
+        the HTTP transport and any cached server metadata.
+
         :param str api_url:
             URL for the new REST API endpoint to be managed
+        :param dict data:
+            optional API data describing the new endpoint, typically extracted
+            from the JSON listing of a parent object. When provided, the new
+            instance is hydrated with this data.
         :returns:
             newly created JenkinsAPI
         :rtype: :class:`~.utils.jenkins_api.JenkinsAPI`
         """
-        retval = JenkinsAPI(api_url, self._creds, self._ssl_cert)
-        retval._jenkins_root_url = self._jenkins_root_url
+        retval = JenkinsAPI(api_url, None, None, context=self._context)
+        if data is not None:
+            retval.hydrate(data)
+        return retval
+
+    def hydrate(self, data):
+        """Seeds this object with a snapshot of the API data for its endpoint
+
+        Queries made through :meth:`get_api_data` for keys contained in the
+        snapshot will be answered from it without hitting the REST API, until
+        the snapshot becomes stale. The snapshot goes stale after the
+        :attr:`JenkinsContext.max_data_age` has elapsed, or as soon as any
+        operation that may modify server state is performed through any object
+        sharing our server context.
+
+        :param dict data:
+            API data describing the endpoint managed by this object
+        """
+        self._hydrated_data = data
+        self._hydrated_time = time.time()
+        self._hydrated_generation = self._context.generation
+
+    def refresh(self):
+        """Reloads the API data for this endpoint and hydrates it
+
+        :returns: the freshly loaded API data
+        :rtype: :class:`dict`
+        """
+        retval = self.get_api_data()
+        self.hydrate(retval)
         return retval
 
+    @property
+    def _fresh_data(self):
+        """Gets the hydrated API data for this object, if it isn't stale
+
+        :returns:
+            the snapshot of our API data, or None if there is no valid snapshot
+        :rtype: :class:`dict`
+        """
+        if self._hydrated_data is None:
+            return None
+        if self._hydrated_generation != self._context.generation:
+            return None
+        max_age = self._context.max_data_age
+        if max_age is not None and time.time() - self._hydrated_time > max_age:
+            return None
+        return self._hydrated_data
+
+    @property
+    def context(self):
+        """Server-level state shared by all clones of this object
+
+        :rtype: :class:`JenkinsContext`
+        """
+        return self._context
+
     @property
     def url(self):
         """Gets the URL for the REST API endpoint managed by this object
@@ -74,7 +376,7 @@ class JenkinsAPI(object):
 
         :rtype: :class:`str`
         """
-        return self._jenkins_root_url
+        return self._context.root_url
 
     @property
     def jenkins_headers(self):
@@ -85,17 +387,7 @@ class JenkinsAPI(object):
         UI theme, and others.
 
         :rtype: :class:`dict`"""
-        if self._jenkins_headers_cache is None:
-            temp_path = urllib_parse.urljoin(self.root_url, "api/python")
-            req = requests.get(
-                temp_path,
-                auth=self._creds,
-                verify=self._ssl_cert)
-            req.raise_for_status()
-
-            self._jenkins_headers_cache = req.headers
-
-        return self._jenkins_headers_cache
+        return self._context.headers
 
     @property
     def jenkins_version(self):
@@ -105,14 +397,9 @@ class JenkinsAPI(object):
         the version number
 
         :rtype: :class:`tuple`"""
-        if 'x-jenkins' not in self.jenkins_headers:
-            raise InvalidHeader("Jenkins header has no x-jenkins metadata "
-                                "attached to it. Can not load version info.")
-        return tuple([
-            int(i) for i in self.jenkins_headers['x-jenkins'].split(".")
-        ])
-
-    def get_api_data(self, target_url=None, query_params=None):
+        return self._context.version
+
+    def get_api_data(self, target_url=None, query_params=None, keys=None):
         """retrieves the Jenkins API specific data from the specified URL
 
         :param str target_url:
@@ -120,11 +407,22 @@ class JenkinsAPI(object):
             data will be loaded from the default 'url' for this object
         :param str query_params:
             optional set of query parameters to customize the returned data
+        :param list keys:
+            optional list of attribute names the caller is interested in. When
+            loading data for the default 'url' of this object, if all of these
+            attributes are contained in the data this object was hydrated with
+            the hydrated data is returned instead of querying the REST API.
+            See :meth:`hydrate` for details.
         :returns:
             The set of Jenkins attributes, converted to Python objects,
             associated with the given URL.
         :rtype: :class:`dict`
         """
+        if target_url is None and query_params is None and keys:
+            data = self._fresh_data
+            if data is not None and all(key in data for key in keys):
+                return data
+
         if target_url is None:
             target_url = self.url
 
@@ -134,10 +432,21 @@ class JenkinsAPI(object):
             # TODO: Update this to pass 'params' key to get method
             temp_url += "?" + query_params
 
-        req = requests.get(
+        read_cache = self._context.read_cache
+        if read_cache is None:
+            return self._load_api_data(temp_url)
+        return read_cache.get(
             temp_url,
-            auth=self._creds,
-            verify=self._ssl_cert)
+            self._context.generation,
+            lambda: self._load_api_data(temp_url))
+
+    def _load_api_data(self, url):
+        """Loads JSON formatted data from the REST API
+
+        :param str url: Full URL to the REST API endpoint to be queried
+        :rtype: :class:`dict`
+        """
+        req = self._context.get(url)
         req.raise_for_status()
         retval = req.json()
         self._log.debug(json.dumps(retval, indent=4))
@@ -158,11 +467,7 @@ class JenkinsAPI(object):
         if path is not None:
             temp_url = urllib_parse.urljoin(temp_url, path.lstrip("/\\"))
 
-        req = requests.get(
-            temp_url,
-            auth=self._creds,
-            verify=self._ssl_cert,
-            params=params)
+        req = self._context.get(temp_url, params=params)
         req.raise_for_status()
 
         return req.text
@@ -207,16 +512,31 @@ class JenkinsAPI(object):
             del args["headers"]
         else:
             temp_headers = dict()
+        if args is None:
+            args = dict()
 
-        if self.jenkins_version >= (2, 0, 0) and self.crumb:
+        use_crumb = self.jenkins_version >= (2, 0, 0) and self.crumb
+        if use_crumb:
             temp_headers.update(self.crumb)
 
-        req = requests.post(
-            target_url,
-            auth=self._creds,
-            verify=self._ssl_cert,
-            headers=temp_headers,
-            **args if args else dict())
+        req = self._context.post(target_url, headers=temp_headers, **args)
+
+        if req.status_code == requests.codes.FORBIDDEN and use_crumb:
+            # Our cached crumb may have expired. Load a fresh one and try
+            # the operation one more time before giving up.
+            self._log.debug("Post to %s rejected. Refreshing crumb.",
+                            target_url)
+            self._context.reset_crumb()
+            if self.crumb:
+                temp_headers.update(self.crumb)
+            for cur_file in args.get("files", dict()).values():
+                if hasattr(cur_file, "seek"):
+                    cur_file.seek(0)
+            req = self._context.post(target_url, headers=temp_headers, **args)
+
+        # Any post operation may modify the state of the server, so all
+        # data cached client-side must be considered out of date
+        self._context.invalidate()
 
         req.raise_for_status()
         return req
@@ -237,29 +557,7 @@ class JenkinsAPI(object):
 
         :rtype: :class:`dict`
         """
-        if self._crumb_cache is None:
-            # Query the REST API for the crumb token
-            req = requests.get(
-                self.root_url + 'crumbIssuer/api/json',
-                auth=self._creds,
-                verify=self._ssl_cert)
-
-            if req.status_code == 404:
-                # If we get a 404 error, endpoint not found, assume the Cross
-                # Site Scripting support has been disabled
-                self._crumb_cache = ''
-            else:
-                req.raise_for_status()
-                data = req.json()
-
-                # Seeing as how the crumb for a given Jenkins instance is
-                # static, we cache the results locally to prevent having to hit
-                # the API unnecessarily
-                self._crumb_cache = {
-                    data['crumbRequestField']: data['crumb']
-                }
-
-        return self._crumb_cache
+        return self._context.crumb
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -1,6 +1,6 @@
 """Primitives for interacting with the PyJen plugin subsystem"""
 import logging
-from pkg_resources import iter_entry_points
+import threading
 
 # Every PyJen plugin must have a class registered with the following Python
 # setup tools entrypoint
@@ -12,6 +12,118 @@ PLUGIN_ENTRYPOINT_NAME = "pyjen.plugins"
 PLUGIN_METHOD_NAME = "get_jenkins_plugin_name"
 
 
+def _load_entry_points(group):
+    """Gets all Python entry points registered under a specific group
+
+    Uses the standard library metadata API when available. Falls back to
+    setuptools' pkg_resources on older Python versions, which is only
+    imported when needed since it is very slow to import.
+
+    :param str group: name of the entry point group to list
+    :rtype: :class:`list`
+    """
+    try:
+        from importlib import metadata
+    except ImportError:  # pragma: no cover
+        from pkg_resources import iter_entry_points
+        return list(iter_entry_points(group=group))
+
+    all_entry_points = metadata.entry_points()
+    if hasattr(all_entry_points, "select"):
+        entry_points = all_entry_points.select(group=group)
+    else:  # pragma: no cover
+        # Python versions prior to 3.10 return a dictionary of entry points
+        # indexed by group
+        entry_points = all_entry_points.get(group, list())
+
+    # The same distribution may be discoverable more than once, for example
+    # when installed in development mode, so we filter out duplicates here
+    retval = list()
+    found = set()
+    for cur_entry_point in entry_points:
+        key = (cur_entry_point.name, cur_entry_point.value)
+        if key in found:
+            continue
+        found.add(key)
+        retval.append(cur_entry_point)
+    return retval
+
+
+class PluginRegistry(object):
+    """Index of all PyJen plugins installed on the system
+
+    Scanning the system for installed plugins is expensive, so the scan is
+    performed once, the first time the registry is used, and the results are
+    cached for the lifetime of the process. Use :meth:`reload` to force the
+    registry to re-scan the system, for example after installing new plugins.
+    """
+    def __init__(self):
+        super(PluginRegistry, self).__init__()
+        self._log = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._plugins = None
+        self._index = None
+
+    def _load(self):
+        """Scans the system for installed plugins, if not done already"""
+        with self._lock:
+            if self._plugins is not None:
+                return
+
+            plugins = list()
+            index = dict()
+            for entry_point in _load_entry_points(PLUGIN_ENTRYPOINT_NAME):
+                cur_plugin = entry_point.load()
+
+                # Filter out plugins that don't support the current version
+                # of our API
+                if not hasattr(cur_plugin, PLUGIN_METHOD_NAME):
+                    self._log.debug(
+                        "Plugin %s does not expose the required %s static "
+                        "method.",
+                        cur_plugin.__module__,
+                        PLUGIN_METHOD_NAME)
+                    continue
+
+                plugins.append(cur_plugin)
+                plugin_name = getattr(cur_plugin, PLUGIN_METHOD_NAME)()
+                index.setdefault(plugin_name, list()).append(cur_plugin)
+
+            self._index = index
+            self._plugins = plugins
+
+    @property
+    def plugins(self):
+        """list of all PyJen plugins installed on the system
+
+        :rtype: :class:`list` of :class:`class`
+        """
+        self._load()
+        return list(self._plugins)
+
+    def find(self, plugin_name):
+        """Locates all PyJen classes associated with a given Jenkins plugin
+
+        :param str plugin_name:
+            Name of the Jenkins plugin to look up, as reported by the
+            `get_jenkins_plugin_name` method of the PyJen plugin
+        :returns: list of 0 or more PyJen plugin classes
+        :rtype: :class:`list` of :class:`class`
+        """
+        self._load()
+        return list(self._index.get(plugin_name, list()))
+
+    def reload(self):
+        """Discards the cached plugin index so it is rebuilt on next use"""
+        with self._lock:
+            self._plugins = None
+            self._index = None
+
+
+# Registry shared by all PyJen objects within the current process
+PLUGIN_REGISTRY = PluginRegistry()
+
+
 def find_plugin(plugin_name):
     """Locates the PyJen class associated with a given Jenkins plugin
 
@@ -25,10 +137,7 @@ def find_plugin(plugin_name):
 
     log = logging.getLogger(__name__)
 
-    supported_plugins = list()
-    for cur_plugin in get_all_plugins():
-        if getattr(cur_plugin, PLUGIN_METHOD_NAME)() == formatted_plugin_name:
-            supported_plugins.append(cur_plugin)
+    supported_plugins = PLUGIN_REGISTRY.find(formatted_plugin_name)
 
     if not supported_plugins:
         return None
@@ -46,25 +155,7 @@ def get_all_plugins():
     :returns: list of 0 or more installed plugins
     :rtype: :class:`list` of :class:`class`
     """
-    log = logging.getLogger(__name__)
-    # First load all libraries that are registered with the PyJen plugin API
-    all_plugins = list()
-    for entry_point in iter_entry_points(group=PLUGIN_ENTRYPOINT_NAME):
-        all_plugins.append(entry_point.load())
-
-    # Next, filter out those that don't support the current version of our API
-    retval = list()
-    for cur_plugin in all_plugins:
-        if not hasattr(cur_plugin, PLUGIN_METHOD_NAME):
-            log.debug(
-                "Plugin %s does not expose the required %s static method.",
-                cur_plugin.__module__,
-                PLUGIN_METHOD_NAME)
-            continue
-
-        retval.append(cur_plugin)
-
-    return retval
+    return PLUGIN_REGISTRY.plugins
 
 
 if __name__ == "__main__":  # pragma: no cover
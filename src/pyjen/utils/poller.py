@@ -0,0 +1,254 @@
+"""Primitives for waiting on the state of many Jenkins objects at once"""
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future
+from pyjen.exceptions import WaitTimeoutError
+from pyjen.utils.bulk import run_bulk, DEFAULT_MAX_WORKERS
+
+# Number of seconds to wait before checking the state of an object again,
+# after the first check
+DEFAULT_INITIAL_DELAY = 0.5
+
+# Upper bound on the number of seconds between two checks of the same object
+DEFAULT_MAX_DELAY = 30
+
+# Factor the delay between checks grows by after each check
+DEFAULT_BACKOFF_FACTOR = 2
+
+# Fraction of each delay which is randomized, so many objects being waited
+# on at the same time don't all hit the server at the same moment
+DEFAULT_JITTER = 0.25
+
+
+class Backoff(object):
+    """Generates delays between checks that grow exponentially, with jitter
+
+    :param float initial_delay: number of seconds before the second check
+    :param float max_delay: upper bound on the delay between two checks
+    :param float factor: factor the delay grows by after each check
+    :param float jitter:
+        fraction of each delay to randomize. A value of 0.25 produces delays
+        within 25% of the nominal delay in either direction.
+    """
+    def __init__(self, initial_delay=DEFAULT_INITIAL_DELAY,
+                 max_delay=DEFAULT_MAX_DELAY, factor=DEFAULT_BACKOFF_FACTOR,
+                 jitter=DEFAULT_JITTER):
+        super(Backoff, self).__init__()
+        self._initial_delay = initial_delay
+        self._max_delay = max_delay
+        self._factor = factor
+        self._jitter = jitter
+        self._attempts = 0
+
+    @property
+    def attempts(self):
+        """number of delays generated so far
+
+        :rtype: :class:`int`
+        """
+        return self._attempts
+
+    def reset(self):
+        """Starts over from the initial delay
+
+        Useful when progress is detected, so the next check is made sooner.
+        """
+        self._attempts = 0
+
+    def next_delay(self):
+        """Generates the number of seconds to wait before the next check
+
+        :rtype: :class:`float`
+        """
+        nominal = min(
+            self._initial_delay * self._factor ** self._attempts,
+            self._max_delay)
+        self._attempts += 1
+        spread = nominal * self._jitter
+        return min(
+            max(0, nominal + random.uniform(-spread, spread)),
+            self._max_delay)
+
+
+class _PollTask(object):
+    """State of a single object being waited on by a :class:`Poller`"""
+    def __init__(self, check, future, backoff, deadline):
+        super(_PollTask, self).__init__()
+        self.check = check
+        self.future = future
+        self.backoff = backoff
+        self.deadline = deadline
+
+    def finish(self, result=None, error=None):
+        """Completes the future associated with this task
+
+        :param result: value to complete the future with
+        :param Exception error: error to complete the future with, if any
+        """
+        if not self.future.set_running_or_notify_cancel():
+            return
+        if error is not None:
+            self.future.set_exception(error)
+        else:
+            self.future.set_result(result)
+
+
+class Poller(object):
+    """Waits on the state of many objects using a single background thread
+
+    Each object being waited on is checked periodically, with the delay
+    between checks growing exponentially up to a limit. Checks which are due
+    at the same time are run in parallel, with a bounded number of requests
+    in flight, so thousands of objects can be waited on at the cost of a
+    single thread and a handful of connections.
+
+    The background thread is started when the first wait is submitted, and
+    exits once there is nothing left to wait on.
+
+    **Example:** ::
+
+        poller = Poller()
+        futures = [poller.submit(check, timeout=600) for check in checks]
+        for cur_future in concurrent.futures.as_completed(futures):
+            print(cur_future.result())
+
+    :param int max_workers:
+        maximum number of checks which may be in flight at one time
+    """
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        super(Poller, self).__init__()
+        self._log = logging.getLogger(__name__)
+        self._max_workers = max_workers
+        self._tasks = list()
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def __len__(self):
+        with self._condition:
+            return len(self._tasks)
+
+    def submit(self, check, timeout=None, backoff=None):
+        """Starts waiting on the state of an object
+
+        :param check:
+            callable object, accepting no parameters, which checks the state
+            of the object being waited on. Must return a 2-tuple: a boolean
+            indicating whether the wait is over, and the value to complete
+            the wait with. Errors raised by the check end the wait.
+        :param float timeout:
+            maximum number of seconds to wait. If the wait isn't over by then
+            the returned future fails with a
+            :class:`~.exceptions.WaitTimeoutError`. If not provided, waits
+            indefinitely.
+        :param backoff:
+            generator of the delays between checks. If not provided, the
+            default delays are used.
+        :type backoff: :class:`Backoff`
+        :returns:
+            future which completes with the value returned by the check once
+            the wait is over
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        deadline = None
+        if timeout is not None:
+            deadline = time.time() + timeout
+        task = _PollTask(check, Future(), backoff or Backoff(), deadline)
+
+        # The first check is made right away
+        self._schedule(task, time.time())
+        return task.future
+
+    def _schedule(self, task, due):
+        """Queues a task to be checked at a given time
+
+        :param task: the task to check
+        :param float due: time stamp at which the check is due
+        """
+        with self._condition:
+            heapq.heappush(self._tasks, (due, next(self._counter), task))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="pyjen-poller")
+                self._thread.daemon = True
+                self._thread.start()
+            self._condition.notify()
+
+    def _next_batch(self):
+        """Blocks until one or more tasks are due to be checked
+
+        :returns:
+            the tasks which are due, or None if there are no tasks left
+        :rtype: :class:`list`
+        """
+        with self._condition:
+            while True:
+                if not self._tasks:
+                    self._thread = None
+                    return None
+                now = time.time()
+                due = self._tasks[0][0]
+                if due <= now:
+                    break
+                self._condition.wait(due - now)
+
+            retval = list()
+            while self._tasks and self._tasks[0][0] <= now:
+                retval.append(heapq.heappop(self._tasks)[2])
+            return retval
+
+    def _run(self):
+        """Main loop of the background thread"""
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            batch = [cur_task for cur_task in batch
+                     if not cur_task.future.cancelled()]
+            results = run_bulk(
+                lambda cur_task: cur_task.check(), batch, self._max_workers)
+
+            for cur_task, error in results.failed:
+                self._log.debug("Wait check failed: %s", error)
+                cur_task.finish(error=error)
+
+            for cur_task, (done, value) in results.succeeded:
+                if done:
+                    cur_task.finish(result=value)
+                    continue
+
+                due = time.time() + cur_task.backoff.next_delay()
+                if cur_task.deadline is not None and due > cur_task.deadline:
+                    if time.time() >= cur_task.deadline:
+                        cur_task.finish(error=WaitTimeoutError(
+                            "Timed out waiting for the object's state to "
+                            "change"))
+                        continue
+                    # Make one last check right at the deadline
+                    due = cur_task.deadline
+                self._schedule(cur_task, due)
+
+
+_DEFAULT_POLLER = None
+_DEFAULT_POLLER_LOCK = threading.Lock()
+
+
+def get_default_poller():
+    """Gets the poller shared by all waits that don't specify their own
+
+    :rtype: :class:`Poller`
+    """
+    global _DEFAULT_POLLER  # pylint: disable=global-statement
+    with _DEFAULT_POLLER_LOCK:
+        if _DEFAULT_POLLER is None:
+            _DEFAULT_POLLER = Poller()
+        return _DEFAULT_POLLER
+
+
+if __name__ == "__main__":  # pragma: no cover
+    pass
@@ -0,0 +1,110 @@
+"""HTTP connection management shared by all PyJen REST API objects"""
+import requests
+from requests.adapters import HTTPAdapter
+
+# Number of distinct hosts for which connection pools are cached
+DEFAULT_POOL_CONNECTIONS = 10
+
+# Maximum number of connections kept open to any one host
+DEFAULT_POOL_MAXSIZE = 10
+
+
+class Transport(object):
+    """Pooled, keep-alive HTTP transport used to talk to the Jenkins REST API
+
+    A single transport is created for each :class:`~.jenkins.Jenkins` instance
+    and is shared by every REST API object cloned from it, so TCP and TLS
+    connections get reused across jobs, views, builds and so on rather than
+    being renegotiated on every request.
+
+    :param int pool_connections:
+        number of per-host connection pools to cache
+    :param int pool_maxsize:
+        maximum number of connections to keep open to a single host. Should be
+        at least as large as the number of threads issuing requests in
+        parallel.
+    :param bool pool_block:
+        when True, requests block until a pooled connection becomes available
+        instead of opening a temporary overflow connection to the host
+    :param bool keep_alive:
+        indicates whether connections should be kept open between requests.
+        Defaults to True.
+    :param cache:
+        Optional cache used to avoid re-transferring response bodies that
+        haven't changed since they were last loaded. Disabled by default.
+    :type cache: :class:`~.utils.cache.ResponseCache`
+    """
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, pool_block=False,
+                 keep_alive=True, cache=None):
+        super(Transport, self).__init__()
+        self._cache = cache
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        if not keep_alive:
+            self._session.headers["Connection"] = "close"
+
+    @property
+    def cache(self):
+        """cache of responses loaded by this transport, if one is in use
+
+        :rtype: :class:`~.utils.cache.ResponseCache`
+        """
+        return self._cache
+
+    def get(self, url, **kwargs):
+        """Sends an HTTP GET request over a pooled connection
+
+        If a response cache is in use, previously loaded responses are
+        revalidated with the server using a conditional request and reused
+        when they haven't changed.
+
+        :param str url: URL to query
+        :param kwargs:
+            optional arguments passed directly to :meth:`requests.Session.get`
+        :rtype: :class:`requests.models.Response`
+        """
+        if self._cache is None:
+            return self._session.get(url, **kwargs)
+
+        # Responses may differ by user, so they are cached separately for
+        # each set of credentials
+        auth = kwargs.get("auth")
+        key = (url, repr(kwargs.get("params")), auth[0] if auth else None)
+
+        headers = dict(kwargs.pop("headers", None) or dict())
+        conditional_headers = dict(headers)
+        conditional_headers.update(self._cache.validators(key))
+        retval = self._cache.process(
+            key, self._session.get(url, headers=conditional_headers, **kwargs))
+
+        if retval.status_code == 304:
+            # The cached response was evicted while the request was in
+            # flight, so we need to load the full response again
+            retval = self._cache.process(
+                key, self._session.get(url, headers=headers, **kwargs))
+        return retval
+
+    def post(self, url, **kwargs):
+        """Sends an HTTP POST request over a pooled connection
+
+        :param str url: URL to post to
+        :param kwargs:
+            optional arguments passed directly to :meth:`requests.Session.post`
+        :rtype: :class:`requests.models.Response`
+        """
+        return self._session.post(url, **kwargs)
+
+    def close(self):
+        """Closes all pooled connections managed by this transport"""
+        self._session.close()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    pass
@@ -0,0 +1,215 @@
+"""Helpers for generating Jenkins REST API 'tree' queries
+
+The Jenkins REST API supports a 'tree' query parameter which restricts the
+data returned by an endpoint to a specific set of fields, optionally limited
+to a range of elements for collections. This is typically orders of magnitude
+cheaper than loading the same data using the 'depth' query parameter.
+
+reference: https://wiki.jenkins-ci.org/display/JENKINS/Remote+access+API
+"""
+from pyjen.exceptions import InvalidParameterError
+
+# Fields which must be loaded for every Jenkins object PyJen instantiates
+# from a listing. These are used to locate the appropriate PyJen plugin and
+# REST API endpoint for the object.
+REQUIRED_FIELDS = ["_class", "url"]
+
+
+def _split_selectors(text):
+    """Splits a comma separated list of field selectors in Jenkins syntax
+
+    Commas nested within brackets or braces are not treated as separators.
+
+    :param str text: comma separated list of field selectors
+    :rtype: :class:`list` of :class:`str`
+    """
+    retval = list()
+    nesting = 0
+    start = 0
+    for pos, cur_char in enumerate(text):
+        if cur_char in "[{":
+            nesting += 1
+        elif cur_char in "]}":
+            nesting -= 1
+        elif cur_char == "," and nesting == 0:
+            retval.append(text[start:pos])
+            start = pos + 1
+    retval.append(text[start:])
+    return [cur_selector for cur_selector in retval if cur_selector]
+
+
+def _add_nested_required(selector, required):
+    """Adds required fields to the nested selectors of a field selector
+
+    :param str selector:
+        a single field selector in Jenkins syntax, like
+        "lastBuild[number,result]"
+    :param list required: fields to load for every nested object
+    :returns: the updated selector, like "lastBuild[_class,url,number,result]"
+    :rtype: :class:`str`
+    """
+    start = selector.find("[")
+    if start < 0:
+        return selector
+    end = start
+    nesting = 0
+    for end in range(start, len(selector)):
+        if selector[end] == "[":
+            nesting += 1
+        elif selector[end] == "]":
+            nesting -= 1
+            if nesting == 0:
+                break
+
+    nested = _split_selectors(selector[start + 1:end])
+    names = [cur_field.split("[")[0].split("{")[0] for cur_field in nested]
+    all_fields = [cur_field for cur_field in required
+                  if cur_field not in names]
+    all_fields.extend(
+        _add_nested_required(cur_field, required) for cur_field in nested)
+    return "{0}[{1}]{2}".format(
+        selector[:start], ",".join(all_fields), selector[end + 1:])
+
+
+def format_fields(fields, required=None):
+    """Converts a list of field selectors to the Jenkins 'tree' syntax
+
+    Each field selector may be either:
+
+    * a string, which is used verbatim. The string may contain nested
+      selectors and range limits using the native Jenkins syntax, like
+      "lastBuild[number,result]" or "builds[number]{0,10}"
+    * a dictionary mapping the name of a field to a list of nested field
+      selectors for that field, like {"lastBuild": ["number", "result"]}
+
+    :param list fields: list of field selectors
+    :param list required:
+        optional list of fields to load for every nested object, regardless
+        of the nested selectors given in `fields`
+    :returns: comma separated list of field selectors in Jenkins syntax
+    :rtype: :class:`str`
+    """
+    retval = list()
+    for cur_field in fields:
+        if isinstance(cur_field, dict):
+            for name in sorted(cur_field):
+                retval.append(
+                    "{0}[{1}]".format(name, format_fields(cur_field[name])))
+        else:
+            retval.append(cur_field)
+    if not required:
+        return ",".join(retval)
+    return ",".join(
+        _add_nested_required(cur_selector, required)
+        for cur_selector in _split_selectors(",".join(retval)))
+
+
+def format_range(start=None, end=None):
+    """Generates a Jenkins range specifier for a collection
+
+    :param int start:
+        index of the first element to include. If not provided, elements will
+        be included from the start of the collection.
+    :param int end:
+        index one past the last element to include. If not provided, elements
+        will be included up to the end of the collection.
+    :returns:
+        range specifier of the form "{m,n}", or an empty string if neither
+        bound is provided
+    :rtype: :class:`str`
+    """
+    if start is None and end is None:
+        return ""
+    if start is not None and end is not None and end < start:
+        raise InvalidParameterError(
+            "Invalid range {0}-{1}: end index must not precede the start "
+            "index".format(start, end))
+    return "{{{0},{1}}}".format(
+        "" if start is None else start,
+        "" if end is None else end)
+
+
+def compile_tree_query(collection, fields, start=None, end=None,
+                       required=None):
+    """Generates a query string selecting a subset of a collection's fields
+
+    **Example:** ::
+
+        compile_tree_query("jobs", ["name", "lastBuild[number,result]"], 0, 10)
+        # returns
+        # "tree=jobs[_class,url,name,lastBuild[_class,url,number,result]]{0,10}"
+
+    Objects nested within the elements of the collection, like the last build
+    of each job above, are always loaded with the :data:`REQUIRED_FIELDS` so
+    PyJen can instantiate them from the data returned by the query.
+
+    :param str collection:
+        name of the collection attribute to query, like "jobs" or "builds"
+    :param list fields:
+        list of field selectors to load for each element of the collection.
+        See :func:`format_fields` for details.
+    :param int start:
+        optional index of the first element of the collection to load
+    :param int end:
+        optional index one past the last element of the collection to load
+    :param list required:
+        list of fields which are always to be loaded, regardless of the
+        selectors given in `fields`. Defaults to :data:`REQUIRED_FIELDS`.
+    :returns: query string suitable for use with the Jenkins REST API
+    :rtype: :class:`str`
+    """
+    if required is None:
+        required = REQUIRED_FIELDS
+    all_fields = [cur_field for cur_field in required
+                  if cur_field not in fields]
+    all_fields.extend(fields)
+
+    return "tree={0}[{1}]{2}".format(
+        collection,
+        format_fields(all_fields, REQUIRED_FIELDS),
+        format_range(start, end))
+
+
+def compile_nested_tree_query(collection, fields, depth, required=None):
+    """Generates a query string selecting fields from a nested collection
+
+    Used to load hierarchical collections, like jobs contained within
+    folders, several levels at a time in a single request.
+
+    **Example:** ::
+
+        compile_nested_tree_query("jobs", ["name"], 2)
+        # returns "tree=jobs[_class,url,name,jobs[_class,url,name]]"
+
+    :param str collection:
+        name of the collection attribute to query at each level, like "jobs"
+    :param list fields:
+        list of field selectors to load for each element of the collection,
+        at every level. See :func:`format_fields` for details.
+    :param int depth:
+        number of levels of the collection to load. Must be at least 1.
+    :param list required:
+        list of fields which are always to be loaded, regardless of the
+        selectors given in `fields`. Defaults to :data:`REQUIRED_FIELDS`.
+    :returns: query string suitable for use with the Jenkins REST API
+    :rtype: :class:`str`
+    """
+    if depth < 1:
+        raise InvalidParameterError(
+            "Invalid depth {0}: at least one level must be loaded".format(
+                depth))
+    if required is None:
+        required = REQUIRED_FIELDS
+    all_fields = [cur_field for cur_field in required
+                  if cur_field not in fields]
+    all_fields.extend(fields)
+    formatted_fields = format_fields(all_fields, REQUIRED_FIELDS)
+
+    retval = "{0}[{1}]".format(collection, formatted_fields)
+    for _ in range(depth - 1):
+        retval = "{0}[{1},{2}]".format(collection, formatted_fields, retval)
+    return "tree=" + retval
+
+
+if __name__ == "__main__":  # pragma: no cover
+    pass
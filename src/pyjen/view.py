@@ -1,13 +1,14 @@
 """Primitives for interacting with Jenkins views"""
 import logging
 from six.moves import urllib_parse
-from pyjen.job import Job
+from pyjen.job import Job, METRICS_JOB_FIELDS, compile_job_metrics
 from pyjen.utils.viewxml import ViewXML
 from pyjen.utils.plugin_api import find_plugin, get_all_plugins
 from pyjen.utils.helpers import create_view
+from pyjen.utils.bulk import BulkJobOperations
 
 
-class View(object):
+class View(BulkJobOperations):
     """generic Jenkins views providing interfaces common to all view types
 
     :param api:
@@ -40,6 +41,17 @@ class View(object):
         """Hashing function, allowing object to be serialized and compared"""
         return hash(self._api.url)
 
+    def refresh(self):
+        """Reloads the cached state of this view from the REST API
+
+        Views created from the listings of parent objects, like
+        :py:attr:`pyjen.jenkins.Jenkins.views`, are pre-populated with the data
+        contained in those listings. That data is used until it goes stale,
+        or until this method is called.
+        """
+        self._xml_cache = None
+        self._api.refresh()
+
     @property
     def name(self):
         """Gets the display name for this view
@@ -50,7 +62,7 @@ class View(object):
         :returns: the name of the view
         :rtype: :class:`str`
         """
-        data = self._api.get_api_data()
+        data = self._api.get_api_data(keys=["name"])
         return data['name']
 
     @property
@@ -62,74 +74,85 @@ class View(object):
         that meet the requirements of the filter associated
         with this view.
 
+        .. seealso: :py:meth:`.list_jobs`
+
         :returns: list of 0 or more jobs that are included in this view
         :rtype:  :class:`list` of :class:`~.job.Job` objects
         """
-        data = self._api.get_api_data(query_params="depth=2")
-
-        view_jobs = data['jobs']
-
-        retval = []
-        for j in view_jobs:
-            retval.append(Job.instantiate(j, self._api))
-
-        return retval
+        return self.list_jobs()
+
+    def list_jobs(self, fields=None, start=None, end=None):
+        """Gets jobs associated with this view, with selected fields
+
+        Only the fields selected by the caller are loaded for each job. The
+        returned jobs are pre-populated with the loaded data so it may be
+        queried without hitting the REST API again.
+
+        :param list fields:
+            list of fields to load for each job, using the field selector
+            syntax described by :func:`~.utils.tree_query.format_fields`.
+            If not provided, a default set of fields covering the most
+            commonly used job properties is loaded.
+        :param int start:
+            optional index of the first job to load
+        :param int end:
+            optional index one past the last job to load
+        :returns: list of 0 or more jobs that are included in this view
+        :rtype:  :class:`list` of :class:`~.job.Job` objects
+        """
+        return Job.instantiate_list(self._api, fields, start, end)
 
     def delete(self):
         """Deletes this view from the dashboard"""
         self._api.post(self._api.url + "doDelete")
 
-    def delete_all_jobs(self):
-        """allows callers to do bulk deletes of all jobs found in this view"""
-        for j in self.jobs:
-            j.delete()
-
-    def disable_all_jobs(self):
-        """allows caller to bulk-disable all jobs found in this view"""
-        for j in self.jobs:
-            j.disable()
+    @property
+    def _bulk_jobs(self):
+        """list of jobs affected by bulk operations on this view
 
-    def enable_all_jobs(self):
-        """allows caller to bulk-enable all jobs found in this view"""
-        for j in self.jobs:
-            j.enable()
+        :rtype: :class:`list` of :class:`~.job.Job`
+        """
+        return self.list_jobs(["name"])
 
     @property
     def view_metrics(self):
         """Composes a report on the jobs contained within the view
 
+        Containers, like folders, are not counted as jobs in the report.
+
+        .. seealso: :py:meth:`.get_metrics`
+
         :return: Dictionary containing metrics about the view
         :rtype: :class:`dict`
         """
-        data = self._api.get_api_data()
-
-        broken_jobs = []
-        disabled_jobs = []
-        unstable_jobs = []
-        broken_job_count = 0
-        disabled_jobs_count = 0
-        unstable_job_count = 0
-
-        for job in data["jobs"]:
-
-            temp_job = Job.instantiate(job, self._api)
-
-            if temp_job.is_failing:
-                broken_job_count += 1
-                broken_jobs.append(temp_job)
-            elif temp_job.is_disabled:
-                disabled_jobs_count += 1
-                disabled_jobs.append(temp_job)
-            elif temp_job.is_unstable:
-                unstable_job_count += 1
-                unstable_jobs.append(temp_job)
-
-        return {"broken_jobs_count": broken_job_count,
-                "disabled_jobs_count": disabled_jobs_count,
-                "unstable_jobs_count": unstable_job_count,
-                "broken_jobs": broken_jobs,
-                "unstable_jobs": unstable_jobs,
-                "disabled_jobs": disabled_jobs}
+        return self.get_metrics()
+
+    def get_metrics(self, recursive=False):
+        """Composes a report on the jobs contained within the view
+
+        The state of all jobs is loaded in a single request. See
+        :func:`~.job.compile_job_metrics` for a description of the report.
+        Containers, like folders, are not counted as jobs in the report.
+
+        :param bool recursive:
+            Indicates whether jobs contained within folders, and other
+            containers in the view, should be included in the report
+        :return: Dictionary containing metrics about the view
+        :rtype: :class:`dict`
+        """
+        return compile_job_metrics(self._metrics_jobs(recursive))
+
+    def _metrics_jobs(self, recursive):
+        """Loads the jobs summarized by the metrics for this view
+
+        :param bool recursive:
+            Indicates whether jobs contained within folders should be included
+        :rtype: :class:`list` of :class:`~.job.Job`
+        """
+        if recursive:
+            return list(Job.instantiate_inventory(
+                self._api, fields=METRICS_JOB_FIELDS).values())
+        return self.list_jobs(METRICS_JOB_FIELDS)
 
     def _clone_view_helper(self, new_view_name):
         # NOTE: In order to properly support views that may contain nested
@@ -253,11 +276,6 @@ class View(object):
             PyJen view object wrapping the REST API for the given Jenkins view
         :rtype: :class:`~.view.View`
         """
-        # TODO: Find some way to cache the json data given inside the view so
-        #       we can lazy-load API data. For example, the name of the view
-        #       is always included in the json data and therefore queries for
-        #       the View name after creation should not require another hit
-        #       to the REST API
         log = logging.getLogger(__name__)
         # The default view will not have a valid view URL
         # so we need to look for this and generate a corrected one
@@ -288,7 +306,9 @@ class View(object):
             log.debug("Unable to find plugin for class %s", json_data["_class"])
             plugin_class = View
 
-        return plugin_class(rest_api.clone(view_url))
+        # Hydrate the new view with the data we were given so properties
+        # contained therein can be queried without hitting the REST API again
+        return plugin_class(rest_api.clone(view_url, json_data))
 
     @classmethod
     def get_supported_plugins(cls):
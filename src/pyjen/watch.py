@@ -0,0 +1,367 @@
+"""Primitives for watching many builds and queued builds at once"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pyjen.build import Build
+from pyjen.exceptions import PluginNotSupportedError
+from pyjen.queue_item import QueueItem
+from pyjen.utils.bulk import run_bulk, DEFAULT_MAX_WORKERS
+from pyjen.utils.plugin_api import find_plugin
+from pyjen.utils.poller import Backoff
+from pyjen.utils.tree_query import compile_tree_query
+
+# Number of seconds between two refreshes of the objects being watched
+DEFAULT_WATCH_INTERVAL = 5
+
+# Number of builds, beyond the range of builds being watched, to include in
+# each listing of a job's builds. Allows for new builds being started between
+# two refreshes without the oldest watched builds falling out of the listing.
+DEFAULT_WATCH_MARGIN = 10
+
+# Fields loaded for each build in the listing of a job's builds
+WATCH_BUILD_FIELDS = ["number", "building", "result"]
+
+
+class _Watch(object):
+    """State of a single object being watched by a :class:`WatchService`"""
+    def __init__(self, target, job=None):
+        super(_Watch, self).__init__()
+        self.target = target
+        self.future = Future()
+        self.job = job
+        self.backoff = None
+        self.next_check = 0
+
+    def finish(self, result=None, error=None):
+        """Completes the future associated with this watch
+
+        :param result: value to complete the future with
+        :param Exception error: error to complete the future with, if any
+        """
+        if not self.future.set_running_or_notify_cancel():
+            return
+        if error is not None:
+            self.future.set_exception(error)
+        else:
+            self.future.set_result(result)
+
+
+def _split_build_url(url):
+    """Splits the URL of a build into the URL of its job and its number
+
+    :param str url: URL of the build, like "http://server/job/A/12/"
+    :returns: 2-tuple of the URL of the job and the build number
+    :rtype: :class:`tuple`
+    """
+    parts = url.rstrip("/").rsplit("/", 1)
+    return parts[0] + "/", int(parts[1])
+
+
+class WatchService(object):
+    """Watches many builds and queued builds using a few listing queries
+
+    Rather than polling each object separately, watched builds are grouped by
+    job and refreshed with a single listing of the recent builds of each job,
+    and all watched queue items are refreshed with a single listing of the
+    build queue. The cost of each refresh therefore grows with the number of
+    jobs involved rather than the number of objects being watched.
+
+    Refreshes are performed by a background thread which is started when the
+    first object is watched, and which exits once there is nothing left to
+    watch. Each watch is represented by a future which completes once the
+    object being watched reaches its final state. Callbacks attached to the
+    futures are run on the background thread.
+
+    Instances of this class are typically obtained from the
+    :py:attr:`~.jenkins.Jenkins.watch_service` property.
+
+    **Example:** ::
+
+        watcher = jk.watch_service
+        futures = [watcher.watch_build(cur_build) for cur_build in builds]
+        for cur_future in concurrent.futures.as_completed(futures):
+            print(cur_future.result().result)
+
+    :param api:
+        Pre-initialized connection to the Jenkins REST API
+    :type api: :class:`~/utils/jenkins_api/JenkinsAPI`
+    :param float interval: number of seconds between two refreshes
+    :param int max_workers:
+        maximum number of listing queries which may be in flight at one time
+    """
+    def __init__(self, api, interval=DEFAULT_WATCH_INTERVAL,
+                 max_workers=DEFAULT_MAX_WORKERS):
+        super(WatchService, self).__init__()
+        self._log = logging.getLogger(__name__)
+        self._api = api
+        self._interval = interval
+        self._max_workers = max_workers
+        self._builds = OrderedDict()
+        self._queue_items = OrderedDict()
+        self._newest_builds = dict()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def __len__(self):
+        with self._condition:
+            return len(self._builds) + len(self._queue_items)
+
+    @property
+    def interval(self):
+        """number of seconds between two refreshes of the watched objects
+
+        :rtype: :class:`float`
+        """
+        return self._interval
+
+    def _watch(self, watches, key, target, callback, job=None):
+        """Registers an object to be watched
+
+        :param dict watches: the watches of the same type as the object
+        :param str key: URL of the object
+        :param target: the object to watch
+        :param callback: optional callback to attach to the watch's future
+        :param job: the job the object belongs to, if known
+        :type job: :class:`~.job.Job`
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        with self._condition:
+            watch = watches.get(key)
+            if watch is None or watch.future.done():
+                watch = _Watch(target, job)
+                watches[key] = watch
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="pyjen-watch-service")
+                self._thread.daemon = True
+                self._thread.start()
+
+        if callback is not None:
+            watch.future.add_done_callback(callback)
+        return watch.future
+
+    def watch_build(self, build, callback=None):
+        """Watches a build until it finishes running
+
+        Watching the same build more than once returns the same future.
+
+        :param build: the build to watch
+        :type build: :class:`~.build.Build`
+        :param callback:
+            optional callable object to run once the build has finished.
+            It is passed the future returned by this method.
+        :returns:
+            future which completes with a refreshed copy of the build once it
+            has finished, or with None if the build was deleted
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        return self._watch(self._builds, repr(build), build, callback)
+
+    def watch_queue_item(self, item, callback=None):
+        """Watches a queued build until it leaves the queue
+
+        Watching the same queue item more than once returns the same future.
+
+        :param item: the queued build to watch
+        :type item: :class:`~.queue_item.QueueItem`
+        :param callback:
+            optional callable object to run once the queued build has left
+            the queue. It is passed the future returned by this method.
+        :returns:
+            future which completes with the build once it has started, or with
+            None if the queued build was cancelled or expired before its build
+            could be found
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        # Items returned when starting a build already know their job, so
+        # their build can be found even if they leave the queue before the
+        # first refresh
+        job = item._job  # pylint: disable=protected-access
+        return self._watch(
+            self._queue_items, repr(item), item, callback, job)
+
+    def _active(self, watches):
+        """Gets the watches which haven't completed yet
+
+        Watches which have completed, or have been cancelled by the caller,
+        are discarded.
+
+        :param dict watches: the watches of one type
+        :returns: the URLs and watches still being watched
+        :rtype: :class:`list` of :class:`tuple`
+        """
+        with self._condition:
+            for key in [key for key, watch in watches.items()
+                        if watch.future.done()]:
+                del watches[key]
+            return list(watches.items())
+
+    def poll(self):
+        """Refreshes all watched objects once
+
+        Called periodically by the background thread. May also be called
+        directly to refresh the watched objects right away.
+        """
+        self._poll_queue()
+        self._poll_builds()
+
+    def _poll_queue(self):
+        """Refreshes all watched queue items using one listing of the queue"""
+        watches = self._active(self._queue_items)
+        if not watches:
+            return
+
+        query = compile_tree_query("items", ["id", "task[_class,url]"])
+        data = self._api.get_api_data(
+            target_url=self._api.root_url + "queue/", query_params=query)
+        queued = dict((cur_item["id"], cur_item) for cur_item in data["items"])
+
+        left = list()
+        for _, cur_watch in watches:
+            entry = queued.get(cur_watch.target.id)
+            if entry is None:
+                left.append(cur_watch)
+                continue
+
+            # Remember the job the item belongs to, so its build can be found
+            # without querying the item once it leaves the queue
+            task = entry.get("task")
+            if cur_watch.job is None and task is not None and "url" in task:
+                plugin = find_plugin(task.get("_class", ""))
+                if plugin is not None:
+                    cur_watch.job = plugin(self._api.clone(task["url"], task))
+
+        # Items which left the queue are found in the build history of their
+        # jobs, using one search per job
+        known = [cur_watch for cur_watch in left if cur_watch.job is not None]
+        items = [
+            QueueItem(self._item_api(cur_watch), cur_watch.job)
+            for cur_watch in known]
+        builds = QueueItem.resolve_builds(items, self._max_workers)
+        for cur_watch, cur_build in zip(known, builds):
+            if cur_build is not None:
+                cur_watch.finish(cur_build)
+
+        # The build may not be listed yet if it was only just started, so
+        # the remaining items are only queried, with a growing delay, to see
+        # whether they will ever produce a build
+        now = time.time()
+        due = [cur_watch for cur_watch in left
+               if not cur_watch.future.done() and cur_watch.next_check <= now]
+        run_bulk(self._check_left_item, due, self._max_workers)
+
+    def _item_api(self, watch):
+        """Gets the REST API endpoint of a watched queue item
+
+        :param watch: the watch of the queue item
+        :rtype: :class:`~/utils/jenkins_api/JenkinsAPI`
+        """
+        return self._api.clone("{0}queue/item/{1}/".format(
+            self._api.root_url, watch.target.id))
+
+    def _check_left_item(self, watch):
+        """Checks whether a queue item which left the queue was cancelled
+
+        Also learns the job the item belongs to, if it isn't known yet, so
+        its build can be found by the next refresh.
+
+        :param watch: the watch of the queue item
+        """
+        if watch.backoff is None:
+            watch.backoff = Backoff(initial_delay=self._interval)
+        watch.next_check = time.time() + watch.backoff.next_delay()
+
+        item = QueueItem(self._item_api(watch))
+        if item.cancelled is not False:
+            watch.finish(None)
+        elif watch.job is None:
+            try:
+                watch.job = item.job
+            except PluginNotSupportedError as err:
+                self._log.debug("Can't find the build of %s: %s", item, err)
+                watch.finish(None)
+
+    def _poll_builds(self):
+        """Refreshes all watched builds using one listing per job"""
+        groups = OrderedDict()
+        for key, cur_watch in self._active(self._builds):
+            job_url, number = _split_build_url(key)
+            groups.setdefault(job_url, dict())[number] = cur_watch
+        if not groups:
+            return
+
+        results = run_bulk(
+            lambda job_url: self._list_builds(job_url, groups[job_url]),
+            list(groups.keys()),
+            self._max_workers)
+
+        # Failed listings are retried on the next refresh, so the builds of
+        # the job remain watched
+        for job_url, error in results.failed:
+            self._log.debug(
+                "Failed to refresh builds of %s: %s", job_url, error)
+
+        for job_url, (builds, complete) in results.succeeded:
+            listed = dict(
+                (cur_build["number"], cur_build) for cur_build in builds)
+            for number, cur_watch in groups[job_url].items():
+                entry = listed.get(number)
+                if entry is None:
+                    # If the listing covers the build, it must have been
+                    # deleted. Otherwise the listing will be widened on the
+                    # next refresh.
+                    if complete or (builds and builds[-1]["number"] < number):
+                        cur_watch.finish(None)
+                    continue
+                if not entry["building"]:
+                    cur_watch.finish(
+                        Build(self._api.clone(entry["url"], entry)))
+
+    def _list_builds(self, job_url, watches):
+        """Loads the listing of builds of a job covering the watched builds
+
+        :param str job_url: URL of the job
+        :param dict watches: maps the watched build numbers to their watches
+        :returns:
+            2-tuple containing the listed builds, from newest to oldest, and a
+            boolean indicating whether the listing covers the entire build
+            history of the job
+        :rtype: :class:`tuple`
+        """
+        oldest = min(watches)
+        newest = max(self._newest_builds.get(job_url, 0), max(watches))
+        count = newest - oldest + 1 + DEFAULT_WATCH_MARGIN
+
+        # NOTE: the "builds" collection is capped at the 100 most recent
+        #       builds, so a short listing of it doesn't mean the entire
+        #       build history was listed. "allBuilds" has no such limit.
+        query = compile_tree_query("allBuilds", WATCH_BUILD_FIELDS, 0, count)
+        builds = self._api.clone(job_url).get_api_data(
+            query_params=query)["allBuilds"]
+        if builds:
+            self._newest_builds[job_url] = builds[0]["number"]
+        return builds, len(builds) < count
+
+    def _run(self):
+        """Main loop of the background thread"""
+        while True:
+            with self._condition:
+                if not self._active(self._builds) and \
+                        not self._active(self._queue_items):
+                    self._thread = None
+                    return
+
+            try:
+                self.poll()
+            except Exception as err:  # pylint: disable=broad-except
+                # Failed listings are retried on the next refresh
+                self._log.debug("Failed to refresh watched objects: %s", err)
+
+            with self._condition:
+                self._condition.wait(self._interval)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    pass
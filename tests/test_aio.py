@@ -0,0 +1,96 @@
+import sys
+import threading
+import time
+import pytest
+from mock import MagicMock
+
+pytestmark = pytest.mark.skipif(
+    sys.version_info < (3, 5), reason="asyncio APIs require Python 3.5+")
+
+
+def _run(awaitable):
+    import asyncio
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(awaitable)
+    finally:
+        loop.close()
+
+
+def test_async_jobs():
+    from pyjen.aio import AsyncJenkins
+    from pyjen.plugins.freestylejob import FreestyleJob
+
+    mock_transport = MagicMock()
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"jobs": [{
+        "_class": "hudson.model.FreeStyleProject",
+        "url": "https://jenkins.server/job/MyJob",
+        "name": "MyJob",
+    }]}
+    mock_transport.get.return_value = mock_response
+
+    jk = AsyncJenkins("https://jenkins.server", ("user", "pw"), transport=mock_transport)
+    try:
+        res = _run(jk.jobs)
+    finally:
+        jk.close()
+
+    assert len(res) == 1
+    assert isinstance(res[0], FreestyleJob)
+    assert res[0].name == "MyJob"
+    mock_transport.get.assert_called_once()
+
+
+def test_bounded_concurrency():
+    from pyjen.aio import AsyncJenkins
+
+    lock = threading.Lock()
+    state = {"current": 0, "max": 0}
+
+    def operation(item):
+        with lock:
+            state["current"] += 1
+            state["max"] = max(state["max"], state["current"])
+        time.sleep(0.01)
+        with lock:
+            state["current"] -= 1
+        return item * 2
+
+    jk = AsyncJenkins("https://jenkins.server", ("user", "pw"),
+                      max_concurrency=3, transport=MagicMock())
+    try:
+        res = _run(jk.map(operation, list(range(20))))
+    finally:
+        jk.close()
+
+    assert res == [i * 2 for i in range(20)]
+    assert state["max"] <= 3
+
+
+def test_several_event_loops():
+    from pyjen.aio import AsyncJenkins
+
+    jk = AsyncJenkins("https://jenkins.server", ("user", "pw"),
+                      max_concurrency=2, transport=MagicMock())
+    try:
+        # Each call runs on a new event loop
+        assert _run(jk.map(lambda item: item + 1, [1, 2, 3])) == [2, 3, 4]
+        assert _run(jk.map(lambda item: item + 1, [4, 5, 6])) == [5, 6, 7]
+    finally:
+        jk.close()
+
+
+def test_async_list_jobs(jenkins_env):
+    from pyjen.aio import AsyncJenkins
+
+    jk = AsyncJenkins(jenkins_env["url"], (jenkins_env["admin_user"], jenkins_env["admin_token"]))
+    try:
+        res = _run(jk.list_jobs(["name"]))
+        assert isinstance(res, list)
+    finally:
+        jk.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
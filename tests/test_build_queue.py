@@ -4,7 +4,249 @@ from .utils import async_assert, clean_job
 from requests.exceptions import HTTPError
 from pyjen.jenkins import Jenkins
 from pyjen.queue_item import QueueItem
+from pyjen.queue import Queue
 from pyjen.plugins.freestylejob import FreestyleJob
+from pyjen.job import Job
+from pyjen.build import Build
+from pyjen.utils.jenkins_api import JenkinsAPI
+from pyjen.utils.poller import Poller, Backoff
+from pyjen.exceptions import WaitTimeoutError
+
+
+def _mock_server(jobs):
+    """Generates a REST API connection to a server with several jobs
+
+    :param dict jobs:
+        maps the name of each job to a list of (build number, queue ID) pairs
+        describing its build history, newest first
+    """
+    queries = list()
+
+    def get_response(url, **kwargs):
+        queries.append(url)
+        if "/queue/" in url:
+            return queue_response
+        job_name = url.split("/job/")[1].split("/")[0]
+        builds = [{
+            "number": number,
+            "queueId": queue_id,
+            "url": "https://jenkins.server/job/{0}/{1}/".format(job_name, number),
+        } for number, queue_id in jobs[job_name]]
+        retval = MagicMock()
+        if url.endswith("}"):
+            # Only the most recent builds are searched by ranged queries
+            builds = builds[:2]
+        retval.json.return_value = {"allBuilds": builds}
+        return retval
+
+    queue_response = MagicMock()
+    queue_response.json.return_value = {"_class": "hudson.model.Queue", "items": [
+        {"id": queue_id, "url": "queue/item/{0}/".format(queue_id), "task": {
+            "_class": "hudson.model.FreeStyleProject",
+            "name": job_name,
+            "url": "https://jenkins.server/job/{0}/".format(job_name)}}
+        for job_name in sorted(jobs) for _, queue_id in jobs[job_name]]}
+
+    mock_transport = MagicMock()
+    mock_transport.get.side_effect = get_response
+    return JenkinsAPI("https://jenkins.server", None, True, mock_transport), queries
+
+
+def test_find_builds_by_queue_ids():
+    api, queries = _mock_server({"A": [(5, 105), (4, 104), (3, 103)]})
+    job = Job(api.clone("https://jenkins.server/job/A/"))
+
+    res = job.find_builds_by_queue_ids([105, 104])
+    assert sorted(res.keys()) == [104, 105]
+    assert res[105].number == 5
+    assert len(queries) == 1
+    assert "tree=allBuilds[number,url,queueId]{0,52}" in queries[0]
+
+    # Falls back to the full history for older builds
+    assert job.find_build_by_queue_id(103).number == 3
+    assert job.find_build_by_queue_id(999) is None
+    assert "tree=allBuilds[number,url,queueId]" in queries[-1]
+
+
+def test_resolve_builds_across_jobs():
+    api, queries = _mock_server({
+        "A": [(2, 12), (1, 11)],
+        "B": [(7, 13)],
+    })
+    job_a = Job(api.clone("https://jenkins.server/job/A/"))
+    job_b = Job(api.clone("https://jenkins.server/job/B/"))
+    items = [
+        QueueItem(api.clone("https://jenkins.server/queue/item/11"), job_a),
+        QueueItem(api.clone("https://jenkins.server/queue/item/13"), job_b),
+        QueueItem(api.clone("https://jenkins.server/queue/item/12"), job_a),
+        QueueItem(api.clone("https://jenkins.server/queue/item/14"), job_b),
+    ]
+
+    res = QueueItem.resolve_builds(items)
+
+    assert [cur_build.number if cur_build else None for cur_build in res] == [1, 7, 2, None]
+    # one query per job, plus the fallback search for the missing item
+    assert len(queries) == 3
+
+
+def test_resolve_builds_from_queue_listing():
+    api, queries = _mock_server({
+        "A": [(2, 12), (1, 11)],
+        "B": [(7, 13)],
+    })
+    items = Queue(api.clone("https://jenkins.server/queue/")).items
+
+    # The jobs are known from the listing even once its data goes stale
+    api.context.invalidate()
+    res = QueueItem.resolve_builds(items)
+
+    assert [cur_build.number for cur_build in res] == [2, 1, 7]
+    assert len([cur_query for cur_query in queries if "/queue/" in cur_query]) == 1
+    assert len(queries) == 3
+
+
+def _mock_responses(responses):
+    """Generates a REST API connection returning a sequence of responses"""
+    mock_transport = MagicMock()
+    mock_responses = list()
+    for cur_data in responses:
+        cur_response = MagicMock()
+        cur_response.json.return_value = cur_data
+        mock_responses.append(cur_response)
+    mock_transport.get.side_effect = mock_responses
+    return JenkinsAPI("https://jenkins.server", None, True, mock_transport)
+
+
+class _FastPoller(Poller):
+    def submit(self, check, timeout=None, backoff=None):
+        return super(_FastPoller, self).submit(
+            check, timeout, Backoff(initial_delay=0.001, max_delay=0.01))
+
+
+def test_wait_for_build():
+    queued = {"_class": "hudson.model.Queue$WaitingItem"}
+    started = {
+        "_class": "hudson.model.Queue$LeftItem",
+        "executable": {"number": 3, "url": "https://jenkins.server/job/A/3/"},
+    }
+    api = _mock_responses([queued, queued, started])
+    item = QueueItem(api.clone("https://jenkins.server/queue/item/12"))
+
+    bld = item.wait_for_build(timeout=5, poller=_FastPoller())
+    assert bld.number == 3
+    assert api.context.transport.get.call_count == 3
+
+
+def test_wait_for_build_cancelled():
+    api = _mock_responses([{"_class": "hudson.model.Queue$LeftItem", "cancelled": True}])
+    item = QueueItem(api.clone("https://jenkins.server/queue/item/12"))
+    assert item.wait_for_build_async(poller=_FastPoller()).result(5) is None
+
+
+def test_wait_for_build_timeout():
+    api = _mock_responses([{"_class": "hudson.model.Queue$WaitingItem"}] * 1000)
+    item = QueueItem(api.clone("https://jenkins.server/queue/item/12"))
+    with pytest.raises(WaitTimeoutError):
+        item.wait_for_build(timeout=0.05, poller=_FastPoller())
+
+
+def test_wait_for_completion():
+    api = _mock_responses([{"building": True}, {"building": False, "result": "SUCCESS"}])
+    bld = Build(api.clone("https://jenkins.server/job/A/3/", {"building": True}))
+
+    future = bld.wait_for_completion_async(timeout=5, poller=_FastPoller())
+    assert future.result(5) is bld
+    assert bld.result == "SUCCESS"
+
+
+def test_queue_snapshot():
+    job_a = {"_class": "hudson.model.FreeStyleProject", "name": "A", "url": "https://jenkins.server/job/A/"}
+    job_b = {"_class": "hudson.model.FreeStyleProject", "name": "B", "url": "https://jenkins.server/job/B/"}
+    items = [
+        {"_class": "hudson.model.Queue$BuildableItem", "id": 1, "url": "queue/item/1/", "task": job_a,
+         "why": u"Waiting for next available executor on \u2018linux\u2019",
+         "blocked": False, "buildable": True, "stuck": False, "inQueueSince": 2000},
+        {"_class": "hudson.model.Queue$BuildableItem", "id": 2, "url": "queue/item/2/", "task": job_b,
+         "why": u"There are no nodes with the label \u2018windows\u2019",
+         "blocked": False, "buildable": True, "stuck": True, "inQueueSince": 1000},
+        {"_class": "hudson.model.Queue$BlockedItem", "id": 3, "url": "queue/item/3/", "task": job_a,
+         "why": "Build #4 is already in progress",
+         "blocked": True, "buildable": False, "stuck": False, "inQueueSince": 3000},
+    ]
+    api = _mock_responses([{"_class": "hudson.model.Queue", "items": items}])
+    queue = Queue(api.clone("https://jenkins.server/queue"))
+
+    snapshot = queue.snapshot()
+    assert len(snapshot) == 3
+    assert [cur_item.label for cur_item in snapshot] == ["linux", "windows", None]
+    assert snapshot.items[2].reason == "Build #4 is already in progress"
+    assert snapshot.items[0].job.name == "A"
+
+    # Aggregations are answered from the listing even once its data is stale
+    api.context.invalidate()
+    assert [cur_item.id for cur_item in snapshot.by_label["linux"]] == [1]
+    assert [cur_item.id for cur_item in snapshot.by_job["https://jenkins.server/job/A/"]] == [1, 3]
+    assert [cur_item.id for cur_item in snapshot.stuck_items] == [2]
+    assert [cur_item.id for cur_item in snapshot.blocked_items] == [3]
+    assert len(snapshot.buildable_items) == 2
+    assert snapshot.oldest_item.id == 2
+
+    # Everything was answered from the single listing of the queue
+    mock_get = api.context.transport.get
+    assert mock_get.call_count == 1
+    assert "tree=items[_class,url,id,why," in mock_get.call_args[0][0]
+
+
+def test_queue_snapshot_unknown_queue_time():
+    items = [
+        {"id": 1, "url": "queue/item/1/"},
+        {"id": 2, "url": "queue/item/2/", "inQueueSince": 2000},
+        {"id": 3, "url": "queue/item/3/", "inQueueSince": None},
+    ]
+    api = _mock_responses([{"items": items}])
+    snapshot = Queue(api.clone("https://jenkins.server/queue")).snapshot()
+    assert snapshot.oldest_item.id == 2
+
+    api = _mock_responses([{"items": [items[0]]}])
+    assert Queue(api.clone("https://jenkins.server/queue")).snapshot().oldest_item is None
+
+
+def test_queue_snapshot_by_job_without_task_url():
+    placeholder_class = \
+        "org.jenkinsci.plugins.workflow.support.steps.ExecutorStepExecution$PlaceholderTask"
+    items = [
+        {"id": 1, "url": "queue/item/1/", "task": {
+            "_class": "hudson.model.FreeStyleProject", "url": "https://jenkins.server/job/A/"}},
+        {"id": 2, "url": "queue/item/2/", "task": {"_class": placeholder_class}},
+        {"id": 3, "url": "queue/item/3/"},
+    ]
+    api = _mock_responses([{"items": items}])
+    snapshot = Queue(api.clone("https://jenkins.server/queue")).snapshot()
+
+    by_job = snapshot.by_job
+    assert list(by_job.keys()) == ["https://jenkins.server/job/A/", None]
+    assert [cur_item.id for cur_item in by_job[None]] == [2, 3]
+
+
+def test_queue_items_placeholder_task():
+    placeholder_class = \
+        "org.jenkinsci.plugins.workflow.support.steps.ExecutorStepExecution$PlaceholderTask"
+    items = [
+        {"id": 1, "url": "queue/item/1/", "task": {
+            "_class": "hudson.model.FreeStyleProject", "name": "A",
+            "url": "https://jenkins.server/job/A/"}},
+        {"id": 2, "url": "queue/item/2/", "task": {
+            "_class": placeholder_class, "name": "part of P #3",
+            "url": "https://jenkins.server/job/P/3/"}},
+        {"id": 3, "url": "queue/item/3/", "task": {"_class": placeholder_class}},
+    ]
+    api = _mock_responses([{"_class": "hudson.model.Queue", "items": items}])
+
+    res = Queue(api.clone("https://jenkins.server/queue")).items
+
+    assert [cur_item.id for cur_item in res] == [1, 2, 3]
+    assert res[0].job.name == "A"
+    api.context.transport.get.assert_called_once()
 
 
 def test_waiting_build_queue(jenkins_env):
@@ -0,0 +1,211 @@
+import re
+import pytest
+from mock import MagicMock
+from pyjen.build import Build
+from pyjen.job import Job
+from pyjen.utils.build_store import BuildStore
+from pyjen.utils.jenkins_api import JenkinsAPI
+
+BUILD_URL = "https://jenkins.server/job/MyJob/3/"
+
+
+def _build_data(building=False):
+    return {
+        "id": "3",
+        "number": 3,
+        "result": None if building else "SUCCESS",
+        "building": building,
+        "timestamp": 1500000000000,
+        "duration": 1000,
+        "estimatedDuration": 1000,
+        "description": None,
+        "artifacts": [],
+        "changeSet": {"items": [], "kind": None},
+    }
+
+
+def _make_build(store, data, console="log output"):
+    mock_transport = MagicMock()
+
+    def get_response(url, **kwargs):
+        retval = MagicMock()
+        retval.json.return_value = data
+        retval.text = console
+        return retval
+    mock_transport.get.side_effect = get_response
+
+    api = JenkinsAPI("https://jenkins.server", None, True, mock_transport)
+    api.context.build_store = store
+    return Build(api.clone(BUILD_URL)), mock_transport
+
+
+def test_store_round_trip(tmpdir):
+    path = str(tmpdir.join("builds.db"))
+    store = BuildStore(path)
+    assert store.put_data(BUILD_URL, _build_data())
+    store.put_console(BUILD_URL, "log output")
+    store.close()
+
+    store = BuildStore(path)
+    assert BUILD_URL in store
+    assert len(store) == 1
+    assert store.get_data(BUILD_URL) == _build_data()
+    assert store.get_console(BUILD_URL) == "log output"
+
+    store.delete(BUILD_URL)
+    assert BUILD_URL not in store
+    assert store.get_console(BUILD_URL) is None
+
+
+def test_store_rejects_incomplete_builds():
+    store = BuildStore(":memory:")
+    assert not store.put_data(BUILD_URL, _build_data(building=True))
+    assert not store.put_data(BUILD_URL, {"number": 3, "building": False})
+    data = _build_data()
+    del data["changeSet"]
+    assert not store.put_data(BUILD_URL, data)
+    assert len(store) == 0
+
+
+def test_store_pipeline_build():
+    store = BuildStore(":memory:")
+    data = _build_data()
+    del data["changeSet"]
+    data["_class"] = "org.jenkinsci.plugins.workflow.job.WorkflowRun"
+    data["changeSets"] = [{"items": [], "kind": "git"}]
+
+    build, _ = _make_build(store, data)
+    assert build.result == "SUCCESS"
+    assert store.get_data(BUILD_URL) == data
+
+    # Subsequent queries are answered from the store
+    build, mock_transport = _make_build(store, data)
+    assert build.result == "SUCCESS"
+    mock_transport.get.assert_not_called()
+
+
+def test_finished_build_loaded_once():
+    store = BuildStore(":memory:")
+    bld, mock_transport = _make_build(store, _build_data())
+
+    assert bld.number == 3
+    assert bld.result == "SUCCESS"
+    assert bld.duration == 1000
+    assert bld.console_output == "log output"
+    assert bld.console_output == "log output"
+    assert mock_transport.get.call_count == 2
+
+    # A new session reuses the stored data without contacting the server
+    bld2, mock_transport2 = _make_build(store, _build_data())
+    assert bld2.result == "SUCCESS"
+    assert bld2.console_output == "log output"
+    mock_transport2.get.assert_not_called()
+
+
+def test_running_build_bypasses_store():
+    store = BuildStore(":memory:")
+    bld, mock_transport = _make_build(store, _build_data(building=True))
+
+    assert bld.is_building
+    assert bld.console_output == "log output"
+    assert len(store) == 0
+    assert store.get_console(BUILD_URL) is None
+
+
+
+class FakeHistory(object):
+    """Simulates the build history of a job on the server"""
+    JOB_URL = "https://jenkins.server/job/MyJob/"
+
+    def __init__(self, numbers, running=()):
+        self.numbers = sorted(numbers, reverse=True)
+        self.running = set(running)
+        self.queries = list()
+
+    def build(self, number):
+        return {
+            "number": number,
+            "url": self.JOB_URL + str(number) + "/",
+            "building": number in self.running,
+            "result": None if number in self.running else "SUCCESS",
+        }
+
+    def get(self, url, **kwargs):
+        query = url.split("?", 1)[1]
+        self.queries.append(query)
+        retval = MagicMock()
+        if query.startswith("tree=firstBuild"):
+            first = min(self.numbers) if self.numbers else None
+            retval.json.return_value = {
+                "firstBuild": None if first is None else {"number": first}}
+            return retval
+
+        builds = [self.build(cur_number) for cur_number in self.numbers]
+        match = re.search(r"\{(\d*),(\d*)\}$", query)
+        if match:
+            builds = builds[int(match.group(1) or 0):int(match.group(2) or len(builds))]
+        retval.json.return_value = {"allBuilds": builds}
+        return retval
+
+    def job(self):
+        mock_transport = MagicMock()
+        mock_transport.get.side_effect = self.get
+        api = JenkinsAPI("https://jenkins.server", None, True, mock_transport)
+        return Job(api.clone(self.JOB_URL))
+
+
+def test_sync_builds_incremental():
+    store = BuildStore(":memory:")
+    history = FakeHistory(range(1, 251))
+    job = history.job()
+
+    res = job.sync_builds(store, page_size=100)
+    assert res["added"] == list(range(1, 251))
+    assert res["removed"] == []
+    assert res["high_water_mark"] == 250
+    assert [cur_build.number for cur_build in job.stored_builds(store)] == list(range(250, 0, -1))
+
+    # Only the first page is loaded when a few new builds are added
+    history.numbers = list(range(253, 0, -1))
+    history.queries = list()
+    res = job.sync_builds(store, page_size=100)
+    assert res["added"] == [251, 252, 253]
+    assert len([cur_query for cur_query in history.queries if "{" in cur_query]) == 1
+
+
+def test_sync_builds_running_build_resynced():
+    store = BuildStore(":memory:")
+    history = FakeHistory(range(1, 11), running=[9])
+    job = history.job()
+
+    res = job.sync_builds(store)
+    assert res["high_water_mark"] == 8
+    assert 9 not in store.get_build_numbers(FakeHistory.JOB_URL)
+    assert 10 in store.get_build_numbers(FakeHistory.JOB_URL)
+
+    history.running = set()
+    res = job.sync_builds(store)
+    assert res["added"] == [9]
+    assert res["high_water_mark"] == 10
+
+
+def test_sync_builds_detects_deletion_and_rotation():
+    store = BuildStore(":memory:")
+    history = FakeHistory(range(1, 21))
+    job = history.job()
+    job.sync_builds(store)
+
+    # builds 1-5 rotated out, build 12 deleted
+    history.numbers = [cur_number for cur_number in range(6, 21) if cur_number != 12]
+    history.queries = list()
+    res = job.sync_builds(store)
+    assert res["removed"] == [1, 2, 3, 4, 5]
+    assert "tree=allBuilds[number]" not in history.queries
+
+    res = job.sync_builds(store, check_deletions=True)
+    assert res["removed"] == [12]
+    assert store.get_build_numbers(FakeHistory.JOB_URL) == set(history.numbers)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,131 @@
+import threading
+import time
+import pytest
+from mock import MagicMock, PropertyMock, patch
+from pyjen.exceptions import BulkOperationError
+from pyjen.utils.bulk import run_bulk, BulkResult
+from pyjen.view import View
+
+
+def test_run_bulk_empty():
+    res = run_bulk(lambda item: item, [])
+    assert isinstance(res, BulkResult)
+    assert len(res) == 0
+    assert res.ok
+
+
+def test_run_bulk_results_in_order():
+    items = list(range(20))
+    res = run_bulk(lambda item: item * 2, items, max_workers=4)
+    assert res.ok
+    assert len(res) == 20
+    assert res.succeeded == [(item, item * 2) for item in items]
+    assert res.failed == []
+    res.raise_on_failure()
+
+
+def test_run_bulk_partial_failure():
+    def operation(item):
+        if item % 2:
+            raise ValueError(item)
+        return item
+
+    res = run_bulk(operation, range(6))
+    assert not res.ok
+    assert len(res) == 6
+    assert [item for item, _ in res.succeeded] == [0, 2, 4]
+    assert [item for item, _ in res.failed] == [1, 3, 5]
+    assert all(isinstance(err, ValueError) for _, err in res.failed)
+    assert "3 of 6" in str(res)
+
+    with pytest.raises(BulkOperationError) as err:
+        res.raise_on_failure()
+    assert err.value.result is res
+    assert "3 of 6" in str(err.value)
+
+
+def test_run_bulk_bounded_concurrency():
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def operation(item):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.05)
+        with lock:
+            state["active"] -= 1
+
+    res = run_bulk(operation, range(12), max_workers=3)
+    assert res.ok
+    assert 1 < state["peak"] <= 3
+
+
+def _mock_jobs(count):
+    retval = list()
+    for i in range(count):
+        cur_job = MagicMock()
+        cur_job.name = "job{0}".format(i)
+        cur_job.config_xml = "<project>{0}</project>".format(i)
+        retval.append(cur_job)
+    return retval
+
+
+def test_view_bulk_disable():
+    jobs = _mock_jobs(5)
+    jobs[2].disable.side_effect = RuntimeError("denied")
+    with patch.object(View, "_bulk_jobs", new_callable=PropertyMock) as bulk_jobs:
+        bulk_jobs.return_value = jobs
+        res = View(MagicMock()).disable_all_jobs(max_workers=2, raise_on_error=False)
+
+    assert len(res) == 5
+    assert len(res.succeeded) == 4
+    assert res.failed[0][0] is jobs[2]
+    for cur_job in jobs:
+        cur_job.disable.assert_called_once_with()
+
+
+def test_view_bulk_disable_raises():
+    jobs = _mock_jobs(3)
+    jobs[1].disable.side_effect = RuntimeError("denied")
+    with patch.object(View, "_bulk_jobs", new_callable=PropertyMock) as bulk_jobs:
+        bulk_jobs.return_value = jobs
+        with pytest.raises(BulkOperationError) as err:
+            View(MagicMock()).disable_all_jobs()
+
+    assert err.value.result.failed[0][0] is jobs[1]
+    for cur_job in jobs:
+        cur_job.disable.assert_called_once_with()
+
+
+def test_view_bulk_clone():
+    jobs = _mock_jobs(3)
+    with patch.object(View, "_bulk_jobs", new_callable=PropertyMock) as bulk_jobs:
+        bulk_jobs.return_value = jobs
+        res = View(MagicMock()).clone_all_jobs("{0}_copy", disable=False)
+
+    assert res.ok
+    for cur_job in jobs:
+        cur_job.clone.assert_called_once_with(cur_job.name + "_copy", False)
+
+
+def test_view_bulk_update_configs():
+    jobs = _mock_jobs(3)
+
+    def transform(xml):
+        if "1" in xml:
+            return None
+        return xml.replace("project", "flow")
+
+    with patch.object(View, "_bulk_jobs", new_callable=PropertyMock) as bulk_jobs:
+        bulk_jobs.return_value = jobs
+        res = View(MagicMock()).update_all_configs(transform)
+
+    assert res.ok
+    assert [result for _, result in res.succeeded] == [True, False, True]
+    assert jobs[0].config_xml == "<flow>0</flow>"
+    assert jobs[1].config_xml == "<project>1</project>"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,176 @@
+import threading
+import pytest
+from mock import MagicMock, patch
+from pyjen.utils.cache import ResponseCache, ReadCache
+from pyjen.utils.transport import Transport
+
+
+def _response(status_code=200, headers=None, content="data"):
+    retval = MagicMock()
+    retval.status_code = status_code
+    retval.headers = headers or dict()
+    retval.content = content
+    return retval
+
+
+def test_cache_revalidates_with_etag():
+    with patch("pyjen.utils.transport.requests") as req:
+        session = req.Session.return_value
+        original = _response(headers={"ETag": '"abc"'})
+        session.get.side_effect = [original, _response(304)]
+
+        cache = ResponseCache()
+        transport = Transport(cache=cache)
+        assert transport.get("http://server/api/json", auth=("user", "pw")) is original
+        assert transport.get("http://server/api/json", auth=("user", "pw")) is original
+
+        assert cache.hits == 1
+        assert cache.misses == 1
+        second_headers = session.get.call_args_list[1][1]["headers"]
+        assert second_headers["If-None-Match"] == '"abc"'
+
+
+def test_cache_revalidates_with_last_modified():
+    with patch("pyjen.utils.transport.requests") as req:
+        session = req.Session.return_value
+        stamp = "Wed, 21 Oct 2015 07:28:00 GMT"
+        original = _response(headers={"Last-Modified": stamp})
+        updated = _response(headers={"Last-Modified": stamp}, content="new")
+        session.get.side_effect = [original, updated]
+
+        cache = ResponseCache()
+        transport = Transport(cache=cache)
+        transport.get("http://server/config.xml")
+        assert transport.get("http://server/config.xml") is updated
+
+        assert cache.hits == 0
+        assert cache.misses == 2
+        assert session.get.call_args_list[1][1]["headers"]["If-Modified-Since"] == stamp
+
+
+def test_cache_skips_responses_without_validators():
+    with patch("pyjen.utils.transport.requests") as req:
+        session = req.Session.return_value
+        session.get.return_value = _response()
+
+        cache = ResponseCache()
+        transport = Transport(cache=cache)
+        transport.get("http://server/api/json")
+        transport.get("http://server/api/json")
+
+        assert len(cache) == 0
+        assert "If-None-Match" not in session.get.call_args[1]["headers"]
+
+
+def test_cache_lru_eviction():
+    cache = ResponseCache(max_entries=2)
+    for key in ["a", "b"]:
+        cache.process(key, _response(headers={"ETag": key}))
+
+    # Touch "a" so "b" becomes the least recently used entry
+    cache.process("a", _response(304))
+    cache.process("c", _response(headers={"ETag": "c"}))
+
+    assert len(cache) == 2
+    assert cache.validators("a") == {"If-None-Match": "a"}
+    assert cache.validators("b") == dict()
+    assert cache.validators("c") == {"If-None-Match": "c"}
+
+
+def test_cache_reloads_when_evicted_mid_request():
+    with patch("pyjen.utils.transport.requests") as req:
+        session = req.Session.return_value
+        full = _response(headers={"ETag": "x"})
+        session.get.side_effect = [_response(304), full]
+
+        transport = Transport(cache=ResponseCache())
+        assert transport.get("http://server/api/json") is full
+        assert session.get.call_count == 2
+
+
+def test_cache_clear():
+    cache = ResponseCache()
+    cache.process("a", _response(headers={"ETag": "a"}))
+    cache.process("a", _response(304))
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.hits == 0
+    assert cache.misses == 0
+
+
+def test_read_cache_hit_within_ttl():
+    cache = ReadCache(ttl=60)
+    loader = MagicMock(return_value={"number": 1})
+    for _ in range(5):
+        assert cache.get("url", 0, loader) == {"number": 1}
+    loader.assert_called_once()
+    assert cache.hits == 4
+    assert cache.misses == 1
+
+
+def test_read_cache_expires():
+    cache = ReadCache(ttl=5)
+    loader = MagicMock(return_value={"number": 1})
+    with patch("pyjen.utils.cache.time") as mock_time:
+        mock_time.time.return_value = 100
+        cache.get("url", 0, loader)
+        mock_time.time.return_value = 106
+        cache.get("url", 0, loader)
+    assert loader.call_count == 2
+
+
+def test_read_cache_invalidated_by_generation():
+    cache = ReadCache(ttl=60)
+    loader = MagicMock(return_value={"color": "blue"})
+    cache.get("url", 0, loader)
+    cache.get("url", 1, loader)
+    assert loader.call_count == 2
+
+
+def test_read_cache_errors_not_cached():
+    cache = ReadCache(ttl=60)
+    loader = MagicMock(side_effect=[RuntimeError("boom"), {"number": 1}])
+    with pytest.raises(RuntimeError):
+        cache.get("url", 0, loader)
+    assert cache.get("url", 0, loader) == {"number": 1}
+    assert len(cache) == 1
+
+
+def test_read_cache_single_flight():
+    cache = ReadCache(ttl=0)
+    started = threading.Event()
+    release = threading.Event()
+    calls = list()
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"number": 1}
+
+    results = list()
+
+    def reader():
+        results.append(cache.get("url", 0, loader))
+
+    leader = threading.Thread(target=reader)
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=reader) for _ in range(4)]
+    for cur_thread in followers:
+        cur_thread.start()
+    while cache.coalesced < 4:
+        pass
+    release.set()
+    for cur_thread in [leader] + followers:
+        cur_thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [{"number": 1}] * 5
+    assert cache.coalesced == 4
+    # A TTL of 0 only coalesces concurrent requests; nothing is retained
+    assert len(cache) == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
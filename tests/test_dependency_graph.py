@@ -0,0 +1,209 @@
+import pytest
+from collections import OrderedDict
+from mock import MagicMock
+from pyjen.dependency_graph import DependencyGraph
+from pyjen.exceptions import DependencyCycleError
+from pyjen.plugins.freestylejob import FreestyleJob
+from pyjen.utils.jenkins_api import JenkinsAPI
+
+ROOT = "https://jenkins.server/"
+JOB_CLASS = "hudson.model.FreeStyleProject"
+
+
+def _url(path):
+    return ROOT + "".join("job/{0}/".format(cur_part) for cur_part in path.split("/"))
+
+
+def _inventory(edges, extra_jobs=None):
+    """Generates inventory data describing jobs with dependencies
+
+    :param list edges: (upstream path, downstream path) pairs
+    """
+    paths = list()
+    for cur_edge in edges:
+        for cur_path in cur_edge:
+            if cur_path not in paths:
+                paths.append(cur_path)
+    paths.extend(extra_jobs or list())
+
+    def project(path):
+        return {"_class": JOB_CLASS, "name": path.split("/")[-1], "url": _url(path)}
+
+    retval = OrderedDict()
+    for cur_path in paths:
+        retval[cur_path] = dict(
+            project(cur_path),
+            upstreamProjects=[project(up) for up, down in edges if down == cur_path],
+            downstreamProjects=[project(down) for up, down in edges if up == cur_path])
+    return retval
+
+
+def _graph(edges, extra_jobs=None):
+    api = JenkinsAPI(ROOT, None, True, MagicMock())
+    return DependencyGraph(api, _inventory(edges, extra_jobs))
+
+
+def _names(jobs):
+    return sorted(cur_job.name for cur_job in jobs)
+
+
+def test_direct_dependencies():
+    graph = _graph([("lib", "app"), ("lib", "tools"), ("app", "deploy")])
+    assert len(graph) == 4
+    assert _names(graph.downstream("lib")) == ["app", "tools"]
+    assert _names(graph.upstream("deploy")) == ["app"]
+    assert graph.upstream("lib") == list()
+    assert "lib" in graph
+    assert "missing" not in graph
+    with pytest.raises(KeyError):
+        graph.upstream("missing")
+
+
+def test_transitive_dependencies():
+    # A diamond with a shared ancestor
+    graph = _graph([("base", "left"), ("base", "right"), ("left", "top"), ("right", "top")])
+    assert _names(graph.all_upstream("top")) == ["base", "left", "right"]
+    assert _names(graph.all_downstream("base")) == ["left", "right", "top"]
+    assert graph.depends_on("top", "base")
+    assert not graph.depends_on("base", "top")
+    assert graph.transitive_closure()["left"] == ["top"]
+
+
+def test_lookup_by_job_object():
+    graph = _graph([("folder/lib", "app")])
+    lib = graph.upstream("app")[0]
+    assert _names(graph.downstream(lib)) == ["app"]
+    assert lib in graph
+
+
+def test_topological_order():
+    graph = _graph([("c", "d"), ("a", "b"), ("b", "c"), ("a", "c")], extra_jobs=["lonely"])
+    order = [cur_job.name for cur_job in graph.topological_order()]
+    assert sorted(order) == ["a", "b", "c", "d", "lonely"]
+    for up, down in [("a", "b"), ("b", "c"), ("c", "d"), ("a", "c")]:
+        assert order.index(up) < order.index(down)
+    assert graph.cycles == list()
+
+
+def test_cycles():
+    graph = _graph([("a", "b"), ("b", "c"), ("c", "a"), ("c", "d"), ("e", "e")])
+    assert sorted(graph.cycles) == [["a", "b", "c"], ["e"]]
+    assert _names(graph.all_downstream("a")) == ["a", "b", "c", "d"]
+    assert _names(graph.all_upstream("d")) == ["a", "b", "c"]
+    assert _names(graph.all_downstream("e")) == ["e"]
+    with pytest.raises(DependencyCycleError) as err:
+        graph.topological_order()
+    assert "a, b, c" in str(err.value)
+
+
+def test_deep_chain():
+    # Deeper than the default recursion limit
+    edges = [("job{0}".format(i), "job{0}".format(i + 1)) for i in range(3000)]
+    graph = _graph(edges)
+    assert len(graph.all_downstream("job0")) == 3000
+    assert graph.topological_order()[0].name == "job0"
+
+
+def test_closures_reuse_earlier_queries():
+    graph = _graph([("a", "b"), ("b", "c"), ("c", "b"), ("c", "d"), ("a", "e"), ("e", "d")])
+    # Dependencies learned for jobs queried first are reused for later ones
+    assert _names(graph.all_downstream("c")) == ["b", "c", "d"]
+    assert _names(graph.all_downstream("e")) == ["d"]
+    assert _names(graph.all_downstream("a")) == ["b", "c", "d", "e"]
+    assert _names(graph.all_upstream("d")) == ["a", "b", "c", "e"]
+    assert graph.depends_on("d", "a")
+    assert not graph.depends_on("e", "b")
+
+    closure = graph.transitive_closure()
+    assert sorted(closure) == sorted(graph.paths)
+    for cur_path in graph.paths:
+        assert sorted(closure[cur_path]) == _names(graph.all_downstream(cur_path))
+
+
+def test_load_single_crawl():
+    data = _inventory([("lib", "app")])
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"jobs": list(data.values())}
+    mock_transport = MagicMock()
+    mock_transport.get.return_value = mock_response
+    api = JenkinsAPI(ROOT, None, True, mock_transport)
+
+    graph = DependencyGraph.load(api)
+    assert graph.paths == ["lib", "app"]
+    assert _names(graph.downstream("lib")) == ["app"]
+    assert mock_transport.get.call_count == 1
+    assert "upstreamProjects[_class,url,name],downstreamProjects[_class,url,name]" in \
+        mock_transport.get.call_args[0][0]
+
+
+def test_freestyle_upstream_walk_handles_cycles():
+    data = _inventory([("b", "a"), ("a", "b"), ("c", "b")])
+    by_url = dict((cur_data["url"], cur_data) for cur_data in data.values())
+    queries = list()
+
+    def get_response(url, **kwargs):
+        queries.append(url)
+        retval = MagicMock()
+        job_data = by_url[url.split("api/json")[0]]
+        retval.json.return_value = {"upstreamProjects": job_data["upstreamProjects"]}
+        return retval
+
+    mock_transport = MagicMock()
+    mock_transport.get.side_effect = get_response
+    api = JenkinsAPI(ROOT, None, True, mock_transport)
+    job = FreestyleJob(api.clone(_url("a")))
+
+    assert _names(job.all_upstream_jobs) == ["b", "c"]
+    # every job is queried exactly once
+    assert len(queries) == 3
+
+
+def _serve_jobs(data):
+    """Generates a REST API connection serving the full data of several jobs"""
+    by_url = dict((cur_data["url"], cur_data) for cur_data in data.values())
+    queries = list()
+
+    def get_response(url, **kwargs):
+        queries.append(url)
+        retval = MagicMock()
+        retval.json.return_value = by_url[url.split("api/json")[0]]
+        return retval
+
+    mock_transport = MagicMock()
+    mock_transport.get.side_effect = get_response
+    return JenkinsAPI(ROOT, None, True, mock_transport), queries
+
+
+def test_walk_from_graph_job():
+    data = _inventory([("lib", "app"), ("app", "deploy")])
+    api, queries = _serve_jobs(data)
+    graph = DependencyGraph(api, data)
+
+    app = graph.downstream("lib")[0]
+    assert _names(app.upstream_jobs) == ["lib"]
+    assert _names(app.downstream_jobs) == ["deploy"]
+    assert queries == []
+
+    deploy = graph.downstream("app")[0]
+    assert _names(deploy.all_upstream_jobs) == ["app", "lib"]
+
+
+def test_walk_from_job_hydrated_with_urls_only():
+    data = _inventory([("lib", "app"), ("app", "deploy")])
+    api, queries = _serve_jobs(data)
+    hydrated = OrderedDict(
+        (path, dict(cur_data,
+                    upstreamProjects=[{"url": cur["url"]} for cur in cur_data["upstreamProjects"]],
+                    downstreamProjects=[{"url": cur["url"]} for cur in cur_data["downstreamProjects"]]))
+        for path, cur_data in data.items())
+    graph = DependencyGraph(api, hydrated)
+
+    # Related jobs described by their URL alone are reloaded from the server
+    app = graph.downstream("lib")[0]
+    assert _names(app.upstream_jobs) == ["lib"]
+    assert queries == [_url("app") + "api/json"]
+    assert _names(graph.downstream("app")[0].all_upstream_jobs) == ["app", "lib"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
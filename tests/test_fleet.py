@@ -0,0 +1,237 @@
+import pytest
+from mock import MagicMock, patch
+from pyjen.fleet import NodeFleet, UtilizationSampler, LabelIndex
+from pyjen.jenkins import Jenkins
+from pyjen.node import Node
+from pyjen.utils.poller import Backoff
+from pyjen.utils.jenkins_api import JenkinsAPI
+
+ROOT = "https://jenkins.server/"
+
+
+def _computer(name, num_executors, busy, offline=False, labels=None):
+    executors = list()
+    for index in range(num_executors):
+        executor = {"idle": index >= busy}
+        if index < busy:
+            executor["currentExecutable"] = {"url": "{0}job/{1}/{2}/".format(ROOT, name, index)}
+        executors.append(executor)
+    return {
+        "_class": "hudson.slaves.SlaveComputer",
+        "displayName": name,
+        "offline": offline,
+        "idle": busy == 0,
+        "numExecutors": num_executors,
+        "executors": executors,
+        "assignedLabels": [{"name": name}] + [{"name": cur_label} for cur_label in labels or list()],
+    }
+
+
+def _mock_api(*responses):
+    mock_transport = MagicMock()
+    mock_responses = list()
+    for cur_data in responses:
+        cur_response = MagicMock()
+        cur_response.json.return_value = cur_data
+        mock_responses.append(cur_response)
+    mock_transport.get.side_effect = mock_responses
+    return JenkinsAPI(ROOT, None, True, mock_transport)
+
+
+def _fleet_data():
+    return {"computer": [
+        _computer("master", 2, 1),
+        _computer("agent1", 4, 3, labels=["linux"]),
+        _computer("agent2", 4, 4, offline=True, labels=["linux"]),
+    ]}
+
+
+def test_fleet_snapshot():
+    api = _mock_api(_fleet_data())
+    snapshot = NodeFleet(api.clone(ROOT + "computer/")).snapshot()
+
+    assert len(snapshot) == 3
+    assert [cur_node.name for cur_node in snapshot.offline_nodes] == ["agent2"]
+    assert snapshot.total_executors == 6
+    assert snapshot.busy_executors == 4
+    assert snapshot.idle_executors == 2
+    assert snapshot.utilization == pytest.approx(4.0 / 6)
+    assert len(snapshot.running_build_urls) == 8
+
+    agent = snapshot.nodes[1]
+    assert agent.labels == ["agent1", "linux"]
+    assert agent.busy_executors == 3
+    assert agent.number_of_executors == 4
+    assert agent.is_idle is False
+
+    # Everything was answered from the single listing of the fleet
+    mock_get = api.context.transport.get
+    assert mock_get.call_count == 1
+    query = mock_get.call_args[0][0]
+    assert query.startswith(ROOT + "computer/api/json?tree=computer[_class,displayName,")
+    assert "executors[_class,url,idle,currentExecutable[_class,url]]" in query
+
+
+def test_jenkins_nodes_hydrated():
+    with patch("pyjen.jenkins.JenkinsAPI") as mock_api_class:
+        api = _mock_api(_fleet_data())
+        mock_api_class.return_value = api
+        jk = Jenkins(ROOT, ("user", "pw"))
+        nodes = jk.nodes
+
+    assert [cur_node.name for cur_node in nodes] == ["master", "agent1", "agent2"]
+    assert [cur_node.is_offline for cur_node in nodes] == [False, False, True]
+    assert api.context.transport.get.call_count == 1
+
+
+def test_node_busy_executors_without_listing():
+    api = _mock_api(
+        {"displayName": "agent1", "executors": [{}, {}]},
+        {"executors": [{"idle": False}, {"idle": True}]})
+    node = Node(api.clone(ROOT + "computer/agent1"))
+    assert node.busy_executors == 1
+
+
+def test_label_index():
+    api = _mock_api(_fleet_data())
+    index = NodeFleet(api.clone(ROOT + "computer/")).label_index()
+
+    assert index.labels == ["agent1", "agent2", "linux", "master"]
+    assert [cur_node.name for cur_node in index.nodes_with_label("linux")] == ["agent1", "agent2"]
+    # agent2 is offline, so its executors aren't counted
+    assert index.total_executors("linux") == 4
+    assert index.busy_executors("linux") == 3
+    assert index.free_executors("linux") == 1
+    assert index.free_executors("windows") == 0
+    assert index.nodes_with_label("windows") == list()
+    assert "master" in index
+
+
+def test_label_index_incremental_refresh():
+    fleet = MagicMock()
+    index = LabelIndex(fleet)
+
+    api = _mock_api(_fleet_data(), {"computer": [
+        _computer("master", 2, 1),
+        _computer("agent1", 4, 1, labels=["linux", "x64"]),
+        _computer("agent3", 2, 0, labels=["linux"]),
+    ]})
+    node_fleet = NodeFleet(api.clone(ROOT + "computer/"))
+    fleet.snapshot.side_effect = [node_fleet.snapshot(), node_fleet.snapshot()]
+
+    assert index.refresh() == set(["master", "agent1", "agent2"])
+    assert index.refresh() == set(["agent1", "agent2", "agent3"])
+
+    assert index.labels == ["agent1", "agent3", "linux", "master", "x64"]
+    assert index.total_executors("linux") == 6
+    assert index.busy_executors("linux") == 1
+    assert index.free_executors("x64") == 3
+    assert "agent2" not in index
+
+
+def test_label_index_stale_snapshot():
+    api = _mock_api(_fleet_data())
+    fleet = NodeFleet(api.clone(ROOT + "computer/"))
+    snapshot = fleet.snapshot()
+
+    # The index is populated from the data loaded by the snapshot, even once
+    # it is stale, rather than querying each node
+    api.context.invalidate()
+    index = LabelIndex(fleet)
+    assert index.update(snapshot) == set(["master", "agent1", "agent2"])
+    assert index.total_executors("linux") == 4
+    assert index.busy_executors("linux") == 3
+    assert api.context.transport.get.call_count == 1
+
+
+def test_fleet_wait_for_idle():
+    api = _mock_api(
+        {"computer": [_computer("master", 2, 2), _computer("agent1", 2, 1)]},
+        {"computer": [_computer("master", 2, 2), _computer("agent1", 2, 1)]},
+        {"computer": [_computer("master", 2, 1), _computer("agent1", 2, 0)]},
+        {"computer": [_computer("master", 2, 0), _computer("agent1", 2, 0)]})
+    fleet = NodeFleet(api.clone(ROOT + "computer/"))
+    progress = MagicMock()
+    backoff = Backoff(initial_delay=1, max_delay=30, jitter=0)
+
+    with patch("pyjen.fleet.time.sleep") as mock_sleep:
+        summary = fleet.wait_for_idle(progress=progress, backoff=backoff)
+
+    assert summary.idle
+    assert summary.checks == 4
+    assert summary.running_builds == list()
+    assert progress.call_count == 4
+    # Backs off while nothing changes, then starts over once builds finish
+    assert [cur_call[0][0] for cur_call in mock_sleep.call_args_list] == [1, 2, 1]
+
+
+def test_fleet_wait_for_idle_timeout():
+    busy = {"computer": [_computer("master", 2, 1)]}
+    busy["computer"][0]["oneOffExecutors"] = [
+        {"currentExecutable": {"url": ROOT + "job/pipeline/3/"}}]
+    api = _mock_api(*[busy] * 10)
+    fleet = NodeFleet(api.clone(ROOT + "computer/"))
+
+    with patch("pyjen.fleet.time") as mock_time:
+        mock_time.time.side_effect = [100, 100, 100, 105, 105, 110, 110, 111]
+        summary = fleet.wait_for_idle(timeout=10, backoff=Backoff(initial_delay=5, jitter=0))
+
+    assert not summary.idle
+    assert summary.checks == 3
+    assert summary.elapsed == 11
+    assert sorted(repr(cur_build) for cur_build in summary.running_builds) == [
+        ROOT + "job/master/0/", ROOT + "job/pipeline/3/"]
+    # The last delay is cut short at the deadline
+    assert [cur_call[0][0] for cur_call in mock_time.sleep.call_args_list] == [5, 5]
+    assert "2 builds still running" in str(summary)
+
+
+def test_jenkins_drain():
+    with patch("pyjen.jenkins.JenkinsAPI") as mock_api_class:
+        mock_api_class.return_value = _mock_api({"computer": [_computer("master", 2, 0)]})
+        jk = Jenkins(ROOT, ("user", "pw"))
+        with patch.object(Jenkins, "prepare_shutdown") as mock_prepare:
+            summary = jk.drain(timeout=60)
+
+    mock_prepare.assert_called_once_with()
+    assert summary.idle
+    assert summary.checks == 1
+
+
+def test_sampler_ring_buffer():
+    fleet = MagicMock()
+    snapshots = list()
+    for busy in range(5):
+        snapshot = MagicMock()
+        snapshot.timestamp = busy
+        snapshot.total_executors = 4
+        snapshot.busy_executors = busy
+        snapshot.offline_nodes = list()
+        snapshots.append(snapshot)
+    fleet.snapshot.side_effect = snapshots
+
+    sampler = UtilizationSampler(fleet, capacity=3)
+    for _ in range(5):
+        sampler.sample()
+
+    assert len(sampler) == 3
+    assert [cur_sample.busy_executors for cur_sample in sampler.samples] == [2, 3, 4]
+    assert sampler.peak_utilization == 1.0
+    assert sampler.average_utilization == pytest.approx(0.75)
+
+
+def test_sampler_background_thread():
+    api = _mock_api(*[_fleet_data()] * 100)
+    fleet = NodeFleet(api.clone(ROOT + "computer/"))
+    with fleet.sampler(interval=0.001, capacity=2) as sampler:
+        assert sampler.running
+        while len(sampler) < 2:
+            pass
+    assert not sampler.running
+    assert len(sampler) == 2
+    assert sampler.samples[-1].busy_executors == 4
+    assert sampler.samples[-1].offline_nodes == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
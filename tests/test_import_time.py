@@ -0,0 +1,46 @@
+"""Guards against regressions in the time needed to import the PyJen library"""
+import sys
+import json
+import subprocess
+import pytest
+
+# Upper bound, in seconds, on the time needed to import the main PyJen APIs
+# and build the plugin index in a fresh interpreter. Intentionally generous
+# to avoid false alarms on slow CI machines, while still catching expensive
+# dependencies like pkg_resources sneaking back onto the import path.
+MAX_IMPORT_TIME = 2.0
+
+IMPORT_SCRIPT = """
+import json
+import sys
+import time
+start = time.time()
+import pyjen.jenkins
+from pyjen.utils.plugin_api import get_all_plugins
+get_all_plugins()
+duration = time.time() - start
+print(json.dumps({
+    "duration": duration,
+    "modules": sorted(sys.modules.keys()),
+}))
+"""
+
+
+def _run_import_script():
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_SCRIPT])
+    return json.loads(output.decode("utf-8"))
+
+
+def test_no_heavy_imports():
+    res = _run_import_script()
+    assert "pkg_resources" not in res["modules"]
+    assert "tqdm" not in res["modules"]
+
+
+def test_import_time():
+    res = _run_import_script()
+    assert res["duration"] < MAX_IMPORT_TIME
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
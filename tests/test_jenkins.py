@@ -18,15 +18,202 @@ def test_not_connected():
 
 
 def test_failed_connection_check():
-    with patch("pyjen.utils.jenkins_api.requests") as req:
+    with patch("pyjen.utils.transport.requests") as req:
         mock_response = MagicMock()
         mock_response.headers = None
-        req.get.return_value = mock_response
+        req.Session.return_value.get.return_value = mock_response
 
         jk = Jenkins("https://0.0.0.0")
         assert not jk.connected
 
-        req.get.assert_called_once()
+        req.Session.return_value.get.assert_called_once()
+
+
+def test_jobs_hydrated_from_listing():
+    mock_transport = MagicMock()
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"jobs": [
+        {
+            "_class": "hudson.model.FreeStyleProject",
+            "name": "Job" + str(i),
+            "url": "https://jenkins.server/job/Job" + str(i),
+            "color": "red",
+            "lastBuild": {"number": 3, "url": "https://jenkins.server/job/Job" + str(i) + "/3/"},
+        } for i in range(5)
+    ]}
+    mock_transport.get.return_value = mock_response
+
+    jk = Jenkins("https://jenkins.server", ("user", "pw"), transport=mock_transport)
+    for cur_job in jk.jobs:
+        assert isinstance(cur_job, FreestyleJob)
+        assert cur_job.name.startswith("Job")
+        assert cur_job.is_failing
+        assert cur_job.last_build.number == 3
+
+    mock_transport.get.assert_called_once()
+
+
+def test_list_jobs_tree_query():
+    mock_transport = MagicMock()
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"jobs": [{
+        "_class": "hudson.model.FreeStyleProject",
+        "url": "https://jenkins.server/job/MyJob",
+        "name": "MyJob",
+    }]}
+    mock_transport.get.return_value = mock_response
+
+    jk = Jenkins("https://jenkins.server", ("user", "pw"), transport=mock_transport)
+    res = jk.list_jobs(["name"], end=1)
+
+    assert len(res) == 1
+    assert res[0].name == "MyJob"
+    mock_transport.get.assert_called_once()
+    url = mock_transport.get.call_args[0][0]
+    assert url.endswith("api/json?tree=jobs[_class,url,name]{,1}")
+
+
+def test_job_inventory_expands_deep_folders():
+    folder_class = "com.cloudbees.hudson.plugins.folder.Folder"
+    job_class = "hudson.model.FreeStyleProject"
+    root_url = "https://jenkins.server/"
+    deep_url = root_url + "job/top/job/deep/"
+
+    def make_response(url):
+        retval = MagicMock()
+        if url.startswith(deep_url):
+            retval.json.return_value = {"jobs": [
+                {"_class": job_class, "name": "leaf", "url": deep_url + "job/leaf/"},
+            ]}
+        else:
+            retval.json.return_value = {"jobs": [
+                {"_class": folder_class, "name": "top", "url": root_url + "job/top/", "jobs": [
+                    {"_class": job_class, "name": "a", "url": root_url + "job/top/job/a/"},
+                    {"_class": folder_class, "name": "deep", "url": deep_url},
+                ]},
+                {"_class": job_class, "name": "b", "url": root_url + "job/b/"},
+            ]}
+        return retval
+
+    mock_transport = MagicMock()
+    mock_transport.get.side_effect = lambda url, **kwargs: make_response(url)
+
+    jk = Jenkins("https://jenkins.server", ("user", "pw"), transport=mock_transport)
+    res = jk.job_inventory(depth=2)
+
+    assert list(res.keys()) == ["top", "top/a", "top/deep", "top/deep/leaf", "b"]
+    assert isinstance(res["top"], FolderJob)
+    assert isinstance(res["top/deep/leaf"], FreestyleJob)
+    assert res["top/deep/leaf"].name == "leaf"
+    assert mock_transport.get.call_count == 2
+    first_url = mock_transport.get.call_args_list[0][0][0]
+    assert first_url.endswith(
+        "api/json?tree=jobs[_class,url,name,jobs[_class,url,name]]")
+
+
+def test_job_inventory_expands_unsupported_containers():
+    org_class = "jenkins.branch.OrganizationFolder"
+    job_class = "hudson.model.FreeStyleProject"
+    other_class = "com.example.UnsupportedProject"
+    root_url = "https://jenkins.server/"
+    org_url = root_url + "job/org/"
+    other_url = root_url + "job/other/"
+
+    def make_response(url):
+        retval = MagicMock()
+        if url.startswith(org_url):
+            retval.json.return_value = {"jobs": [
+                {"_class": job_class, "name": "repo", "url": org_url + "job/repo/"},
+            ]}
+        elif url.startswith(other_url):
+            # Not a container after all
+            retval.json.return_value = {"_class": other_class}
+        else:
+            retval.json.return_value = {"jobs": [
+                {"_class": org_class, "name": "org", "url": org_url},
+                {"_class": other_class, "name": "other", "url": other_url},
+            ]}
+        return retval
+
+    mock_transport = MagicMock()
+    mock_transport.get.side_effect = lambda url, **kwargs: make_response(url)
+
+    jk = Jenkins("https://jenkins.server", ("user", "pw"), transport=mock_transport)
+    res = jk.job_inventory(depth=1)
+
+    assert list(res.keys()) == ["org", "org/repo", "other"]
+    assert mock_transport.get.call_count == 3
+
+
+def test_metrics_single_request():
+    mock_transport = MagicMock()
+    mock_response = MagicMock()
+    colors = ["red", "disabled", "yellow", "blue", "red"]
+    mock_response.json.return_value = {"jobs": [
+        {
+            "_class": "hudson.model.FreeStyleProject",
+            "name": "Job" + str(i),
+            "url": "https://jenkins.server/job/Job" + str(i),
+            "color": cur_color,
+            "healthReport": [{"description": "Build stability: ok", "score": 20 * i}],
+        } for i, cur_color in enumerate(colors)
+    ]}
+    mock_transport.get.return_value = mock_response
+
+    jk = Jenkins("https://jenkins.server", ("user", "pw"), transport=mock_transport)
+    res = jk.metrics
+
+    assert res["jobs_count"] == 5
+    assert res["broken_jobs_count"] == 2
+    assert res["disabled_jobs_count"] == 1
+    assert res["unstable_jobs_count"] == 1
+    assert [cur_job.name for cur_job in res["broken_jobs"]] == ["Job0", "Job4"]
+    assert res["average_build_health"] == 40
+    mock_transport.get.assert_called_once()
+    url = mock_transport.get.call_args[0][0]
+    assert url.endswith(
+        "api/json?tree=jobs[_class,url,name,color,"
+        "healthReport[_class,url,description,score]]")
+
+
+def test_list_jobs_last_build():
+    def make_response(url):
+        retval = MagicMock()
+        build = {"number": 3, "result": "SUCCESS"}
+        # Nested objects are only returned with the fields they were queried with
+        if "lastBuild[_class,url," in url:
+            build.update({
+                "_class": "hudson.model.FreeStyleBuild",
+                "url": "https://jenkins.server/job/Job0/3/"})
+        retval.json.return_value = {"jobs": [{
+            "_class": "hudson.model.FreeStyleProject",
+            "url": "https://jenkins.server/job/Job0/",
+            "name": "Job0",
+            "color": "blue",
+            "lastBuild": build,
+        }]}
+        return retval
+
+    mock_transport = MagicMock()
+    mock_transport.get.side_effect = lambda url, **kwargs: make_response(url)
+
+    jk = Jenkins("https://jenkins.server", ("user", "pw"), transport=mock_transport)
+    res = jk.list_jobs(["name", "color", "lastBuild[number,result]"])
+    last_build = res[0].last_build
+
+    assert last_build.number == 3
+    assert last_build.result == "SUCCESS"
+    assert repr(last_build) == "https://jenkins.server/job/Job0/3/"
+    mock_transport.get.assert_called_once()
+
+
+def test_list_jobs_with_fields(jenkins_env):
+    jk = Jenkins(jenkins_env["url"], (jenkins_env["admin_user"], jenkins_env["admin_token"]))
+    expected_name = "test_list_jobs_with_fields"
+    jb = jk.create_job(expected_name, FreestyleJob)
+    with clean_job(jb):
+        res = jk.list_jobs(["name", "color"])
+        assert expected_name in [cur_job.name for cur_job in res]
 
 
 def test_get_version(jenkins_env):
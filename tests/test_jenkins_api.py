@@ -0,0 +1,182 @@
+import pytest
+from mock import MagicMock, patch
+from pyjen.utils.jenkins_api import JenkinsContext
+from pyjen.utils.jenkins_api import JenkinsAPI
+from pyjen.utils.transport import Transport
+from pyjen.utils.cache import ReadCache
+
+
+def test_clone_shares_transport():
+    mock_transport = MagicMock()
+    api = JenkinsAPI("https://jenkins.server", None, True, mock_transport)
+    job_api = api.clone("https://jenkins.server/job/MyJob")
+    build_api = job_api.clone("https://jenkins.server/job/MyJob/1")
+
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"number": 1}
+    mock_transport.get.return_value = mock_response
+
+    assert build_api.get_api_data() == {"number": 1}
+    mock_transport.get.assert_called_once()
+    assert build_api.root_url == "https://jenkins.server/"
+
+
+def _mock_server_transport(post_codes=(200,)):
+    """Generates a mock transport that simulates a Jenkins v2 server
+
+    :param post_codes:
+        sequence of HTTP status codes to return from successive post calls
+    """
+    headers_response = MagicMock()
+    headers_response.headers = {"x-jenkins": "2.173"}
+    crumb_response = MagicMock()
+    crumb_response.status_code = 200
+    crumb_response.json.return_value = {
+        "crumbRequestField": "Jenkins-Crumb",
+        "crumb": "abcd"
+    }
+
+    def get_response(url, **kwargs):
+        if url.endswith("crumbIssuer/api/json"):
+            return crumb_response
+        return headers_response
+
+    post_responses = list()
+    for cur_code in post_codes:
+        temp = MagicMock()
+        temp.status_code = cur_code
+        post_responses.append(temp)
+
+    mock_transport = MagicMock()
+    mock_transport.get.side_effect = get_response
+    mock_transport.post.side_effect = post_responses
+    return mock_transport
+
+
+def test_clones_share_server_context():
+    mock_transport = _mock_server_transport(post_codes=[200] * 3)
+    api = JenkinsAPI("https://jenkins.server", None, True, mock_transport)
+
+    for i in range(3):
+        job_api = api.clone("https://jenkins.server/job/Job" + str(i))
+        job_api.post(job_api.url + "disable")
+        assert job_api.context is api.context
+
+    # One query for the server headers, one for the crumb, then one post for
+    # each job
+    assert mock_transport.get.call_count == 2
+    assert mock_transport.post.call_count == 3
+    assert api.jenkins_version == (2, 173)
+
+
+def test_post_refreshes_expired_crumb():
+    mock_transport = _mock_server_transport(post_codes=[403, 200])
+    api = JenkinsAPI("https://jenkins.server", None, True, mock_transport)
+
+    api.post(api.url + "quietDown")
+
+    assert mock_transport.post.call_count == 2
+    # headers + original crumb + refreshed crumb
+    assert mock_transport.get.call_count == 3
+
+
+def test_hydrated_data():
+    mock_transport = MagicMock()
+    api = JenkinsAPI("https://jenkins.server", None, True, mock_transport)
+    job_data = {"name": "MyJob", "color": "blue"}
+    job_api = api.clone("https://jenkins.server/job/MyJob", job_data)
+
+    assert job_api.get_api_data(keys=["name", "color"]) == job_data
+    mock_transport.get.assert_not_called()
+
+    # Keys not included in the hydrated data must be loaded from the server
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"lastBuild": None}
+    mock_transport.get.return_value = mock_response
+    assert job_api.get_api_data(keys=["lastBuild"]) == {"lastBuild": None}
+    mock_transport.get.assert_called_once()
+
+
+def test_hydrated_data_stale_after_post():
+    mock_transport = _mock_server_transport()
+    api = JenkinsAPI("https://jenkins.server", None, True, mock_transport)
+    job1 = api.clone("https://jenkins.server/job/Job1", {"color": "blue"})
+    job2 = api.clone("https://jenkins.server/job/Job2", {"color": "blue"})
+
+    job2.post(job2.url + "disable")
+
+    mock_transport.get.reset_mock(side_effect=True)
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"color": "disabled"}
+    mock_transport.get.return_value = mock_response
+    # The post operation may have changed the state of any job on the server
+    # so the data used to hydrate both jobs must be discarded
+    assert job1.get_api_data(keys=["color"]) == {"color": "disabled"}
+    assert job2.get_api_data(keys=["color"]) == {"color": "disabled"}
+    assert mock_transport.get.call_count == 2
+
+
+def test_hydrated_data_expires():
+    mock_transport = MagicMock()
+    context = JenkinsContext(
+        "https://jenkins.server", None, True, mock_transport, max_data_age=0)
+    api = JenkinsAPI("https://jenkins.server", None, None, context=context)
+    job_api = api.clone("https://jenkins.server/job/MyJob", {"name": "MyJob"})
+
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"name": "MyJob"}
+    mock_transport.get.return_value = mock_response
+    with patch("pyjen.utils.jenkins_api.time") as mock_time:
+        mock_time.time.return_value = 1e10
+        job_api.get_api_data(keys=["name"])
+    mock_transport.get.assert_called_once()
+
+
+def test_transport_pool_settings():
+    with patch("pyjen.utils.transport.HTTPAdapter") as adapter:
+        with patch("pyjen.utils.transport.requests") as req:
+            Transport(pool_connections=2, pool_maxsize=25, pool_block=True)
+
+            adapter.assert_called_once_with(
+                pool_connections=2, pool_maxsize=25, pool_block=True)
+            session = req.Session.return_value
+            assert session.mount.call_count == 2
+
+
+def test_transport_disable_keep_alive():
+    with patch("pyjen.utils.transport.requests") as req:
+        req.Session.return_value.headers = dict()
+        Transport(keep_alive=False)
+        assert req.Session.return_value.headers["Connection"] == "close"
+
+
+
+def test_read_cache_shared_by_clones():
+    mock_transport = _mock_server_transport()
+    server_responses = mock_transport.get.side_effect
+    build_response = MagicMock()
+    build_response.json.return_value = {"number": 1, "result": "SUCCESS"}
+
+    def get_response(url, **kwargs):
+        if "/job/" in url:
+            return build_response
+        return server_responses(url, **kwargs)
+    mock_transport.get.side_effect = get_response
+
+    api = JenkinsAPI("https://jenkins.server", None, True, mock_transport)
+    api.context.read_cache = ReadCache(ttl=60)
+    build1 = api.clone("https://jenkins.server/job/MyJob/1")
+    build2 = api.clone("https://jenkins.server/job/MyJob/1")
+    for cur_key in ["number", "result", "duration"]:
+        build1.get_api_data(keys=[cur_key])
+        build2.get_api_data(keys=[cur_key])
+    assert mock_transport.get.call_count == 1
+
+    # Mutating operations invalidate the cache
+    build1.post(build1.url + "submitDescription")
+    calls_after_post = mock_transport.get.call_count
+    build2.get_api_data()
+    assert mock_transport.get.call_count == calls_after_post + 1
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
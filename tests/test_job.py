@@ -1,5 +1,7 @@
+import re
 import pytest
 import timeit
+from mock import MagicMock
 from datetime import datetime
 from datetime import timedelta
 import xml.etree.ElementTree as ElementTree
@@ -10,6 +12,126 @@ from pyjen.build import Build
 from pyjen.plugins.buildtriggerpublisher import BuildTriggerPublisher
 from pyjen.plugins.shellbuilder import ShellBuilder
 from pyjen.plugins.nullscm import NullSCM
+from pyjen.job import Job
+from pyjen.utils.jenkins_api import JenkinsAPI
+
+
+def _mock_build_history(count, hours_apart=1):
+    """Generates a job whose builds started at regular intervals
+
+    Build N started N hours after the epoch of the test.
+    """
+    epoch = datetime(2020, 1, 1)
+    history = [{
+        "number": number,
+        "url": "https://jenkins.server/job/MyJob/{0}/".format(number),
+        "timestamp": int(((epoch - datetime(1970, 1, 1)).total_seconds() +
+                          number * hours_apart * 3600) * 1000),
+    } for number in range(count, 0, -1)]
+    queries = list()
+
+    def get_response(url, **kwargs):
+        query = url.split("?", 1)[1]
+        queries.append(query)
+        builds = history
+        match = re.search(r"\{(\d*),(\d*)\}$", query)
+        if match:
+            builds = history[int(match.group(1)):int(match.group(2))]
+        retval = MagicMock()
+        retval.json.return_value = {"allBuilds": builds}
+        return retval
+
+    mock_transport = MagicMock()
+    mock_transport.get.side_effect = get_response
+    api = JenkinsAPI("https://jenkins.server", None, True, mock_transport)
+    job = Job(api.clone("https://jenkins.server/job/MyJob/"))
+    return job, history, queries
+
+
+def test_builds_in_time_range_deep_history():
+    job, history, queries = _mock_build_history(10000)
+    start = datetime.fromtimestamp(history[-5001]["timestamp"] * 0.001)
+    end = datetime.fromtimestamp(history[-4990]["timestamp"] * 0.001)
+
+    builds = job.get_builds_in_time_range(start, end)
+
+    assert [cur_build.number for cur_build in builds] == list(range(4990, 5002)[::-1])
+    assert len(queries) < 40
+
+
+def test_builds_in_time_range_recent_history():
+    job, history, queries = _mock_build_history(50)
+    start = datetime.fromtimestamp(history[9]["timestamp"] * 0.001)
+    end = datetime.now() + timedelta(days=365 * 100)
+
+    res = job.iter_builds_in_time_range(start, end, page_size=20)
+    assert next(res).number == 50
+    assert len(queries) == 1
+    assert [cur_build.number for cur_build in res] == list(range(49, 40, -1))
+
+
+def test_builds_in_time_range_before_history():
+    job, history, queries = _mock_build_history(500)
+    end = datetime.fromtimestamp(history[-1]["timestamp"] * 0.001) - timedelta(hours=1)
+
+    assert job.get_builds_in_time_range(end - timedelta(days=1), end) == []
+
+
+def test_iter_builds_stops_early():
+    job, history, queries = _mock_build_history(1000)
+    res = job.iter_builds(["result"], page_size=10)
+    numbers = [next(res).number for _ in range(15)]
+
+    assert numbers == list(range(1000, 985, -1))
+    assert len(queries) == 2
+    assert queries[1].endswith("tree=allBuilds[number,url,result]{10,20}")
+
+
+def test_iter_builds_all():
+    job, history, queries = _mock_build_history(25)
+    numbers = [cur_build.number for cur_build in job.iter_builds(page_size=10)]
+    assert numbers == list(range(25, 0, -1))
+    assert len(queries) == 3
+
+
+def test_get_builds_by_numbers_single_request():
+    job, history, queries = _mock_build_history(500)
+    res = job.get_builds_by_numbers([10, 499, 1000, 250])
+
+    assert [cur_build.number if cur_build else None for cur_build in res] == [10, 499, None, 250]
+    assert res[1].number == 499
+    assert queries == ["tree=allBuilds[number,url]"]
+    assert job.get_build_by_number(1).number == 1
+    assert len(queries) == 1
+
+
+def test_get_builds_by_numbers_incremental_update():
+    job, history, queries = _mock_build_history(100)
+    assert job.get_build_by_number(101) is None
+
+    history[0:0] = [{
+        "number": number,
+        "url": "https://jenkins.server/job/MyJob/{0}/".format(number),
+        "timestamp": 0,
+    } for number in (103, 102, 101)]
+    assert job.get_build_by_number(101).number == 101
+    assert queries[-1].endswith("{0,50}")
+    assert len(queries) == 2
+
+
+def test_instantiate_without_class():
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"_class": "hudson.model.FreeStyleProject"}
+    mock_transport = MagicMock()
+    mock_transport.get.return_value = mock_response
+    api = JenkinsAPI("https://jenkins.server", None, True, mock_transport)
+
+    job_url = "https://jenkins.server/job/MyJob/"
+    job = Job.instantiate({"url": job_url}, api)
+
+    assert isinstance(job, FreestyleJob)
+    assert repr(job) == job_url
+    assert mock_transport.get.call_args[0][0] == job_url + "api/json?tree=_class"
 
 
 def test_create_freestyle_job(jenkins_env):
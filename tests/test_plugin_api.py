@@ -1,13 +1,21 @@
 import pytest
 from mock import patch, MagicMock
 from .utils import count_plugins
-from pyjen.utils.plugin_api import find_plugin, get_all_plugins
+from pyjen.utils.plugin_api import find_plugin, get_all_plugins, PLUGIN_REGISTRY
 from pyjen.view import View
 from pyjen.job import Job
 
 
+@pytest.fixture(autouse=True)
+def clean_registry():
+    """Makes sure plugins mocked by one test don't leak into other tests"""
+    PLUGIN_REGISTRY.reload()
+    yield
+    PLUGIN_REGISTRY.reload()
+
+
 def test_unsupported_plugin(caplog):
-    with patch("pyjen.utils.plugin_api.iter_entry_points") as entry_points:
+    with patch("pyjen.utils.plugin_api._load_entry_points") as entry_points:
         mock_plugin_class = MagicMock(spec=[])
         mock_ep = MagicMock()
         mock_ep.load.return_value = mock_plugin_class
@@ -19,7 +27,7 @@ def test_unsupported_plugin(caplog):
 
 
 def test_one_supported_plugin(caplog):
-    with patch("pyjen.utils.plugin_api.iter_entry_points") as entry_points:
+    with patch("pyjen.utils.plugin_api._load_entry_points") as entry_points:
         expected_plugin_name = "some_plugin"
         mock_plugin_class = MagicMock()
         mock_plugin_class.get_jenkins_plugin_name.return_value = expected_plugin_name
@@ -36,7 +44,7 @@ def test_one_supported_plugin(caplog):
 
 
 def test_multiple_supported_plugin(caplog):
-    with patch("pyjen.utils.plugin_api.iter_entry_points") as entry_points:
+    with patch("pyjen.utils.plugin_api._load_entry_points") as entry_points:
         expected_plugin_name = "some_plugin"
         mock_plugin_class1 = MagicMock()
         mock_plugin_class1.get_jenkins_plugin_name.return_value = expected_plugin_name
@@ -57,6 +65,30 @@ def test_multiple_supported_plugin(caplog):
         assert "multiple plugins detected" in caplog.text
 
 
+def test_plugin_scan_cached():
+    with patch("pyjen.utils.plugin_api._load_entry_points") as entry_points:
+        expected_plugin_name = "some_plugin"
+        mock_plugin_class = MagicMock()
+        mock_plugin_class.get_jenkins_plugin_name.return_value = expected_plugin_name
+
+        mock_ep = MagicMock()
+        mock_ep.load.return_value = mock_plugin_class
+
+        entry_points.return_value = [mock_ep]
+
+        for i in range(5):
+            assert find_plugin(expected_plugin_name) == mock_plugin_class
+            assert find_plugin("other_plugin") is None
+        assert get_all_plugins() == [mock_plugin_class]
+
+        entry_points.assert_called_once()
+        mock_ep.load.assert_called_once()
+
+        PLUGIN_REGISTRY.reload()
+        assert find_plugin(expected_plugin_name) == mock_plugin_class
+        assert entry_points.call_count == 2
+
+
 def test_list_plugins():
     res = get_all_plugins()
     assert res is not None
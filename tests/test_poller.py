@@ -0,0 +1,91 @@
+import threading
+import pytest
+from mock import MagicMock, patch
+from pyjen.exceptions import WaitTimeoutError
+from pyjen.utils.poller import Backoff, Poller
+
+
+def _fast_backoff():
+    return Backoff(initial_delay=0.001, max_delay=0.01, jitter=0)
+
+
+def test_backoff_grows_exponentially():
+    backoff = Backoff(initial_delay=1, max_delay=5, factor=2, jitter=0)
+    delays = [backoff.next_delay() for _ in range(5)]
+    assert delays == [1, 2, 4, 5, 5]
+    assert backoff.attempts == 5
+
+
+def test_backoff_jitter():
+    backoff = Backoff(initial_delay=4, max_delay=100, jitter=0.25)
+    with patch("pyjen.utils.poller.random") as mock_random:
+        mock_random.uniform.return_value = -1
+        assert backoff.next_delay() == 3
+        mock_random.uniform.assert_called_once_with(-1, 1)
+
+
+def test_poller_completes_future():
+    check = MagicMock(side_effect=[(False, None), (False, None), (True, "done")])
+    poller = Poller()
+    future = poller.submit(check, timeout=5, backoff=_fast_backoff())
+    assert future.result(5) == "done"
+    assert check.call_count == 3
+
+
+def test_poller_multiplexes_waits():
+    poller = Poller()
+    counts = dict()
+    lock = threading.Lock()
+
+    def make_check(index):
+        def check():
+            with lock:
+                counts[index] = counts.get(index, 0) + 1
+                return counts[index] > index % 3, index
+        return check
+
+    futures = [poller.submit(make_check(i), 5, _fast_backoff()) for i in range(50)]
+    assert [cur_future.result(5) for cur_future in futures] == list(range(50))
+    assert len(poller) == 0
+
+
+def test_poller_timeout():
+    poller = Poller()
+    check = MagicMock(return_value=(False, None))
+    future = poller.submit(check, timeout=0.05, backoff=_fast_backoff())
+    with pytest.raises(WaitTimeoutError):
+        future.result(5)
+    assert check.call_count > 1
+
+
+def test_poller_check_error():
+    poller = Poller()
+    future = poller.submit(MagicMock(side_effect=RuntimeError("boom")), 5)
+    with pytest.raises(RuntimeError):
+        future.result(5)
+
+
+def test_poller_cancelled_wait_dropped():
+    started = threading.Event()
+    release = threading.Event()
+    calls = list()
+
+    def check():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return False, None
+
+    poller = Poller()
+    future = poller.submit(check, backoff=_fast_backoff())
+    started.wait(5)
+    future.cancel()
+    release.set()
+    other = poller.submit(MagicMock(return_value=(True, 1)))
+    assert other.result(5) == 1
+    assert future.cancelled()
+    assert len(calls) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
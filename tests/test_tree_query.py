@@ -0,0 +1,70 @@
+import pytest
+from pyjen.exceptions import InvalidParameterError
+from pyjen.utils.tree_query import compile_tree_query, compile_nested_tree_query, \
+    format_fields, format_range
+
+
+def test_format_simple_fields():
+    assert format_fields(["name", "color"]) == "name,color"
+
+
+def test_format_nested_fields():
+    fields = ["name", {"lastBuild": ["number", "result"]}]
+    assert format_fields(fields) == "name,lastBuild[number,result]"
+
+
+def test_format_verbatim_nested_fields():
+    fields = ["name", "lastBuild[number,result]"]
+    assert format_fields(fields) == "name,lastBuild[number,result]"
+
+
+def test_format_range():
+    assert format_range() == ""
+    assert format_range(0, 10) == "{0,10}"
+    assert format_range(start=5) == "{5,}"
+    assert format_range(end=5) == "{,5}"
+
+
+def test_format_invalid_range():
+    with pytest.raises(InvalidParameterError):
+        format_range(10, 5)
+
+
+def test_compile_query():
+    res = compile_tree_query("jobs", ["name", "lastBuild[number,result]"], 0, 10)
+    assert res == "tree=jobs[_class,url,name,lastBuild[_class,url,number,result]]{0,10}"
+
+
+def test_compile_query_nested_required_fields():
+    fields = ["name", "lastBuild[url,number]", {"builds": ["number", "changeSet[items[msg]]"]},
+              "task[_class,url,name]"]
+    res = compile_tree_query("jobs", fields)
+    assert res == "tree=jobs[_class,url,name,lastBuild[_class,url,number]," \
+                  "builds[_class,url,number,changeSet[_class,url,items[_class,url,msg]]]," \
+                  "task[_class,url,name]]"
+
+
+def test_compile_nested_query_nested_required_fields():
+    res = compile_nested_tree_query("jobs", ["lastBuild[number]{0,1}"], 2)
+    assert res == "tree=jobs[_class,url,lastBuild[_class,url,number]{0,1}," \
+                  "jobs[_class,url,lastBuild[_class,url,number]{0,1}]]"
+
+
+def test_compile_query_no_duplicate_required_fields():
+    res = compile_tree_query("builds", ["url", "result"], required=["number", "url"])
+    assert res == "tree=builds[number,url,result]"
+
+
+def test_compile_nested_query():
+    assert compile_nested_tree_query("jobs", ["name"], 1) == "tree=jobs[_class,url,name]"
+    res = compile_nested_tree_query("jobs", ["name"], 3)
+    assert res == "tree=jobs[_class,url,name,jobs[_class,url,name,jobs[_class,url,name]]]"
+
+
+def test_compile_nested_query_invalid_depth():
+    with pytest.raises(InvalidParameterError):
+        compile_nested_tree_query("jobs", ["name"], 0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
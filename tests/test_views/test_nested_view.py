@@ -1,4 +1,5 @@
 from pyjen.jenkins import Jenkins
+from mock import MagicMock
 import pytest
 from pyjen.plugins.nestedview import NestedView
 from pyjen.plugins.listview import ListView
@@ -192,5 +193,81 @@ def test_rename_view(jenkins_env):
             assert tmp_view[0].name == expected_name
 
 
+
+def test_view_metrics_aggregate_single_request():
+    root_url = "https://jenkins.server/view/parent/"
+    job_data = {
+        "_class": "hudson.model.FreeStyleProject",
+        "name": "shared",
+        "url": "https://jenkins.server/job/shared/",
+        "color": "red",
+        "healthReport": [],
+    }
+    mock_api = MagicMock()
+    mock_api.clone.side_effect = lambda url, data=None: MagicMock(
+        url=url, get_api_data=MagicMock(return_value=data))
+    mock_api.get_api_data.return_value = {"views": [
+        {"_class": "hudson.model.ListView", "url": root_url + "view/a/", "jobs": [job_data]},
+        {"_class": "hudson.model.ListView", "url": root_url + "view/b/", "jobs": [job_data]},
+    ]}
+
+    res = NestedView(mock_api).view_metrics
+
+    assert res["jobs_count"] == 1
+    assert res["broken_jobs_count"] == 1
+    mock_api.get_api_data.assert_called_once()
+
+
+def test_view_metrics_recursive_uses_nested_payload():
+    root_url = "https://jenkins.server/view/parent/"
+    folder_url = "https://jenkins.server/job/folder/"
+
+    def job_data(name, color):
+        return {
+            "_class": "hudson.model.FreeStyleProject",
+            "name": name,
+            "url": "https://jenkins.server/job/{0}/".format(name),
+            "color": color,
+            "healthReport": [],
+        }
+
+    folder_data = {
+        "_class": "com.cloudbees.hudson.plugins.folder.Folder",
+        "name": "folder",
+        "url": folder_url,
+        "healthReport": [],
+    }
+
+    def clone(url, data=None):
+        if data is None:
+            assert url == folder_url
+            data = {"jobs": [job_data("inner", "red")]}
+        return MagicMock(url=url, get_api_data=MagicMock(return_value=data),
+                         clone=MagicMock(side_effect=clone))
+
+    mock_api = MagicMock()
+    mock_api.clone.side_effect = clone
+    mock_api.get_api_data.return_value = {"views": [
+        {"_class": "hudson.plugins.nested_view.NestedView", "url": root_url + "view/n/",
+         "views": [
+             {"_class": "hudson.model.ListView", "url": root_url + "view/n/view/a/",
+              "jobs": [job_data("deep", "blue")]},
+         ]},
+        {"_class": "hudson.model.ListView", "url": root_url + "view/b/",
+         "jobs": [folder_data, job_data("top", "disabled")]},
+    ]}
+
+    res = NestedView(mock_api).get_metrics(recursive=True)
+
+    # The folder itself is not included in the metrics
+    assert res["jobs_count"] == 3
+    assert [cur_job.name for cur_job in res["broken_jobs"]] == ["inner"]
+    assert res["disabled_jobs_count"] == 1
+    mock_api.get_api_data.assert_called_once()
+    query = mock_api.get_api_data.call_args[1]["query_params"]
+    assert query.startswith("tree=views[_class,url,jobs[")
+    assert ",views[_class,url,jobs[" in query
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,174 @@
+import threading
+import time
+import pytest
+from mock import MagicMock
+from pyjen.build import Build
+from pyjen.queue_item import QueueItem
+from pyjen.utils.jenkins_api import JenkinsAPI
+from pyjen.watch import WatchService
+
+ROOT = "https://jenkins.server/"
+JOB_CLASS = "hudson.model.FreeStyleProject"
+
+
+class FakeServer(object):
+    """Fake REST API serving a build queue and the builds of several jobs"""
+    def __init__(self):
+        self.queries = list()
+        self.queue = list()
+        self.items = dict()
+        # maps job names to lists of build records, newest first
+        self.builds = dict()
+        # names of the jobs whose builds can't be listed
+        self.failing_jobs = set()
+        self.lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        with self.lock:
+            self.queries.append(url)
+            retval = MagicMock()
+            retval.json.return_value = self._data(url)
+            return retval
+
+    def _data(self, url):
+        if url.startswith(ROOT + "queue/api/json"):
+            return {"items": list(self.queue)}
+        if "/queue/item/" in url:
+            return self.items[int(url.split("/queue/item/")[1].split("/")[0])]
+        job_name = url.split("/job/")[1].split("/")[0]
+        if job_name in self.failing_jobs:
+            raise RuntimeError("Failed to list builds of " + job_name)
+        builds = [dict(cur_build, url="{0}job/{1}/{2}/".format(ROOT, job_name, cur_build["number"]))
+                  for cur_build in self.builds[job_name]]
+        if "]{0," in url:
+            builds = builds[:int(url.split("]{0,")[1].split("}")[0])]
+        return {"allBuilds": builds}
+
+
+def _service(server):
+    transport = MagicMock()
+    transport.get.side_effect = server.get
+    api = JenkinsAPI(ROOT, None, True, transport)
+    return api, WatchService(api, interval=0.01)
+
+
+def test_watch_builds_one_listing_per_job():
+    server = FakeServer()
+    server.builds["A"] = [
+        {"number": 5, "building": True, "result": None},
+        {"number": 4, "building": False, "result": "FAILURE"},
+        {"number": 3, "building": True, "result": None},
+    ]
+    server.builds["B"] = [{"number": 7, "building": False, "result": "SUCCESS"}]
+    api, watcher = _service(server)
+
+    builds = [Build(api.clone("{0}job/{1}/{2}/".format(ROOT, job, number)))
+              for job, number in [("A", 3), ("A", 4), ("A", 5), ("B", 7)]]
+    # Block the first refresh until all watches have been registered
+    with server.lock:
+        futures = [watcher.watch_build(cur_build) for cur_build in builds]
+        assert watcher.watch_build(builds[0]) is futures[0]
+
+    assert futures[1].result(5).result == "FAILURE"
+    assert futures[3].result(5).result == "SUCCESS"
+
+    with server.lock:
+        server.builds["A"][0] = {"number": 5, "building": False, "result": "SUCCESS"}
+        server.builds["A"][2] = {"number": 3, "building": False, "result": "ABORTED"}
+    assert [cur_future.result(5).result for cur_future in futures] == \
+        ["ABORTED", "FAILURE", "SUCCESS", "SUCCESS"]
+
+    # Builds are only ever refreshed through the listings of their jobs
+    assert all("tree=allBuilds[" in cur_query for cur_query in server.queries)
+    assert ROOT + "job/A/api/json?tree=allBuilds[_class,url,number,building,result]{0,13}" \
+        in server.queries
+
+
+def test_watch_deleted_build():
+    server = FakeServer()
+    server.builds["A"] = [{"number": 2, "building": False, "result": "SUCCESS"}]
+    api, watcher = _service(server)
+
+    future = watcher.watch_build(Build(api.clone(ROOT + "job/A/1/")))
+    assert future.result(5) is None
+
+
+def test_watch_build_listing_failure():
+    server = FakeServer()
+    server.builds["A"] = [{"number": 1, "building": False, "result": "SUCCESS"}]
+    server.failing_jobs.add("A")
+    api, watcher = _service(server)
+
+    future = watcher.watch_build(Build(api.clone(ROOT + "job/A/1/")))
+    # The build remains watched after failing to list the builds of its job
+    while len(server.queries) < 2:
+        time.sleep(0.001)
+    assert not future.done()
+
+    with server.lock:
+        server.failing_jobs.clear()
+    assert future.result(5).result == "SUCCESS"
+
+
+def test_watch_queue_items():
+    server = FakeServer()
+    server.queue = [
+        {"id": 11, "task": {"_class": JOB_CLASS, "url": ROOT + "job/A/"}},
+        {"id": 12, "task": {"_class": JOB_CLASS, "url": ROOT + "job/A/"}},
+    ]
+    server.items[12] = {
+        "_class": "hudson.model.Queue$LeftItem",
+        "cancelled": True,
+        "task": {"_class": JOB_CLASS, "url": ROOT + "job/A/"},
+    }
+    server.builds["A"] = list()
+    api, watcher = _service(server)
+
+    callback = MagicMock()
+    with server.lock:
+        started = watcher.watch_queue_item(
+            QueueItem(api.clone(ROOT + "queue/item/11/")), callback)
+        cancelled = watcher.watch_queue_item(
+            QueueItem(api.clone(ROOT + "queue/item/12/")))
+
+    # Let the queue be refreshed once while both items are still queued
+    while not server.queries:
+        time.sleep(0.001)
+    with server.lock:
+        server.queue = list()
+        server.builds["A"] = [{"number": 1, "building": True, "result": None, "queueId": 11}]
+
+    assert started.result(5).number == 1
+    assert cancelled.result(5) is None
+    callback.assert_called_once_with(started)
+    # The started item is resolved from its job's build history, without
+    # querying the item itself
+    assert not any("/queue/item/11/" in cur_query for cur_query in server.queries)
+
+
+def test_watch_queue_item_seeded_job():
+    server = FakeServer()
+    server.items[21] = {"_class": "hudson.model.Queue$LeftItem", "cancelled": False}
+    server.builds["A"] = list()
+    api, watcher = _service(server)
+    job = MagicMock()
+    job.find_builds_by_queue_ids.return_value = {21: None}
+
+    with server.lock:
+        future = watcher.watch_queue_item(QueueItem(api.clone(ROOT + "queue/item/21/"), job))
+
+    # The item left the queue before it was first refreshed, but its build
+    # is still looked up in the job it was started from
+    while job.find_builds_by_queue_ids.call_count < 20:
+        time.sleep(0.001)
+    job.find_builds_by_queue_ids.return_value = {21: "build"}
+    assert future.result(5) == "build"
+
+    # Whether the item was cancelled is checked with a growing delay rather
+    # than on every refresh
+    item_queries = [cur_query for cur_query in server.queries if "/queue/item/21/" in cur_query]
+    assert 1 <= len(item_queries) < 10
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])